@@ -1,19 +1,34 @@
+import os
+
 import uvicorn
 from mangum import Mangum
 from pixelum_core.loggers.loggers import get_module_logger
 
 from src.config import config
-from src import Application
+from src import WARM_UP_ON_INIT, Application
 
 config.LOGGER = get_module_logger()
 logger = config.LOGGER
 logger.info("Starting server...")
 
-fast_app = Application(config).app
+application = Application(config)
+fast_app = application.app
 logger.info("Starting FastAPI server...")
 
-handler = Mangum(fast_app, lifespan="off")
+mangum_handler = Mangum(fast_app, lifespan="off")
 logger.info("Attached Mangum handler...")
 
+if WARM_UP_ON_INIT and os.getenv("AWS_LAMBDA_FUNCTION_NAME"):
+    application.warm_up()
+
+
+def handler(event, context):
+    # Scheduled pings only keep the container warm, they never reach FastAPI
+    if application.is_warm_up_event(event):
+        return application.warm_up()
+
+    return mangum_handler(event, context)
+
+
 if __name__ == "__main__":
     uvicorn.run(fast_app, port=8000)
@@ -0,0 +1 @@
+"""Benchmarks and load tests. Run them from the repository root with `python -m benchmarks.<name>`."""
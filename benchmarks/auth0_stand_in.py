@@ -0,0 +1,159 @@
+import datetime
+import ipaddress
+import json
+import os
+import ssl
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Tuple
+
+import jwt
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import ExtendedKeyUsageOID, NameOID
+
+SIGNING_KEY_ID = "stand-in"
+
+
+def _certificate(subject: str, public_key, issuer: str, issuer_key, ca: bool) -> x509.Certificate:
+    now = datetime.datetime.now(datetime.timezone.utc)
+    builder = (
+        x509.CertificateBuilder()
+        .subject_name(x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, subject)]))
+        .issuer_name(x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, issuer)]))
+        .public_key(public_key)
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(hours=1))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .add_extension(x509.BasicConstraints(ca=ca, path_length=None), critical=True)
+        .add_extension(x509.SubjectKeyIdentifier.from_public_key(public_key), critical=False)
+        .add_extension(x509.AuthorityKeyIdentifier.from_issuer_public_key(issuer_key.public_key()), critical=False)
+    )
+
+    if ca:
+        builder = builder.add_extension(
+            x509.KeyUsage(True, False, False, False, False, True, True, False, False), critical=True
+        )
+    else:
+        builder = builder.add_extension(
+            x509.SubjectAlternativeName([x509.DNSName("localhost"), x509.IPAddress(ipaddress.ip_address("127.0.0.1"))]),
+            critical=False,
+        ).add_extension(x509.ExtendedKeyUsage([ExtendedKeyUsageOID.SERVER_AUTH]), critical=False)
+
+    return builder.sign(issuer_key, hashes.SHA256())
+
+
+def _write_certificates(directory: str) -> Tuple[str, str, str]:
+    """Issue a throwaway CA and a localhost certificate signed by it. Returns the CA, certificate and key paths."""
+    ca_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    ca = _certificate("Auth0 stand-in CA", ca_key.public_key(), "Auth0 stand-in CA", ca_key, ca=True)
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    certificate = _certificate("localhost", key.public_key(), "Auth0 stand-in CA", ca_key, ca=False)
+
+    paths = tuple(os.path.join(directory, name) for name in ("ca.pem", "certificate.pem", "key.pem"))
+    with open(paths[0], "wb") as file_object:
+        file_object.write(ca.public_bytes(serialization.Encoding.PEM))
+    with open(paths[1], "wb") as file_object:
+        file_object.write(certificate.public_bytes(serialization.Encoding.PEM))
+    with open(paths[2], "wb") as file_object:
+        file_object.write(
+            key.private_bytes(
+                serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+            )
+        )
+    return paths
+
+
+class Auth0StandIn:
+    """
+    A local HTTPS stand-in for an Auth0 tenant. It serves the JWKS, the client
+    credentials exchange and any management API call, counts the requests per
+    path and signs access tokens the JWKS verifies.
+
+    The app talks to https://{AUTH0_DOMAIN}, so `start` trusts the stand-in's CA
+    through REQUESTS_CA_BUNDLE and SSL_CERT_FILE. Start it before anything that
+    reads those variables is imported.
+    """
+
+    def __init__(self) -> None:
+        self.signing_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        self.requests: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._directory = tempfile.TemporaryDirectory()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+
+    @property
+    def domain(self) -> str:
+        return f"localhost:{self._server.server_address[1]}"
+
+    @property
+    def token_exchanges(self) -> int:
+        return self.requests.get("/oauth/token", 0)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.requests.clear()
+
+    def sign(self, claims: dict) -> str:
+        """Sign an access token with the key the stand-in's JWKS publishes."""
+        return jwt.encode(claims, self.signing_key, algorithm="RS256", headers={"kid": SIGNING_KEY_ID})
+
+    def _jwks(self) -> dict:
+        jwk = json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(self.signing_key.public_key()))
+        return {"keys": [{**jwk, "kid": SIGNING_KEY_ID, "use": "sig", "alg": "RS256"}]}
+
+    def _handler(self):
+        stand_in = self
+
+        class Auth0Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _respond(self):
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                path = self.path.split("?")[0]
+                with stand_in._lock:
+                    stand_in.requests[path] = stand_in.requests.get(path, 0) + 1
+
+                if path == "/.well-known/jwks.json":
+                    document = stand_in._jwks()
+                elif path == "/oauth/token":
+                    document = {"access_token": f"management-{time.time_ns()}", "expires_in": 86400, "token_type": "Bearer"}
+                elif path == "/api/v2/users" and self.command == "POST":
+                    document = {"user_id": f"auth0|stand-in-{time.time_ns()}", "email": "stand-in@example.com"}
+                elif path == "/api/v2/tickets/password-change":
+                    document = {"ticket": f"https://{stand_in.domain}/lo/reset"}
+                else:
+                    document = {"user_id": "auth0|stand-in", "email": "stand-in@example.com", "permissions": []}
+
+                body = json.dumps(document).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_GET = do_POST = do_PATCH = do_DELETE = _respond
+
+            def log_message(self, *args):
+                pass
+
+        return Auth0Handler
+
+    def start(self) -> "Auth0StandIn":
+        ca_path, certificate_path, key_path = _write_certificates(self._directory.name)
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(certificate_path, key_path)
+        self._server.socket = context.wrap_socket(self._server.socket, server_side=True)
+
+        os.environ["REQUESTS_CA_BUNDLE"] = ca_path
+        os.environ["SSL_CERT_FILE"] = ca_path
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._directory.cleanup()
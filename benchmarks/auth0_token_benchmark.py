@@ -0,0 +1,72 @@
+import argparse
+import asyncio
+import os
+
+from benchmarks.auth0_stand_in import Auth0StandIn
+
+
+async def _invite(auth0_client, index: int) -> None:
+    # The management calls of inviting a sub-user
+    user = await auth0_client.create_user(f"token-benchmark-{index}@example.com")
+    await auth0_client.add_user_permissions(user["user_id"], [])
+    await auth0_client.send_sub_user_invitation(user["user_id"])
+
+
+async def _run(name: str, stand_in: Auth0StandIn, auth0_client, token_authentication, requests: int) -> None:
+    stand_in.reset()
+
+    await asyncio.gather(*(_invite(auth0_client, index) for index in range(requests)))
+    invite_exchanges = stand_in.token_exchanges
+
+    # The user lookup of a first login, run from the auth dependency's threads
+    await asyncio.gather(
+        *(asyncio.to_thread(token_authentication.get_user_details, "auth0|stand-in") for _ in range(requests))
+    )
+    lookup_exchanges = stand_in.token_exchanges - invite_exchanges
+
+    print(
+        f"{name}: {invite_exchanges / requests:.2f} token exchanges per invitation, "
+        f"{lookup_exchanges / requests:.2f} per first-login user lookup over {requests} requests each"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Count the Auth0 client credentials exchanges per request, before and after the management token cache, against a local Auth0 stand-in."
+    )
+    parser.add_argument("--requests", type=int, default=20, help="The number of concurrent requests of each kind")
+    args = parser.parse_args()
+
+    stand_in = Auth0StandIn().start()
+    # The Auth0 client reads its configuration on import
+    os.environ["AUTH0_DOMAIN"] = stand_in.domain
+    os.environ["AUTH0_MGMT_CLIENT_ID"] = "token-benchmark"
+    os.environ["AUTH0_MGMT_CLIENT_SECRET"] = "token-benchmark"
+
+    from src.lib.token_authentication import TokenAuthentication
+    from src.models.auth0 import ManagementTokenCache, auth0_client
+
+    class ExchangeEveryCall(ManagementTokenCache):
+        # How tokens were fetched before the cache, a client credentials exchange per call
+        def cached_token(self):
+            return None
+
+        def get_token(self):
+            self._exchange()
+            return self._token
+
+    token_cache = auth0_client.token_cache
+    token_authentication = TokenAuthentication()
+
+    try:
+        auth0_client.token_cache = ExchangeEveryCall(stand_in.domain, "token-benchmark", "token-benchmark")
+        asyncio.run(_run("before (exchange per call)", stand_in, auth0_client, token_authentication, args.requests))
+
+        auth0_client.token_cache = token_cache
+        asyncio.run(_run("after (shared token cache)", stand_in, auth0_client, token_authentication, args.requests))
+    finally:
+        stand_in.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import argparse
+import os
+import statistics
+import time
+
+from benchmarks.auth0_stand_in import Auth0StandIn
+
+BENCHMARK_USER_ID = "auth-benchmark"
+
+
+def _percentile(samples: list, percentile: float) -> float:
+    return sorted(samples)[min(len(samples) - 1, int(len(samples) * percentile))]
+
+
+def _report(name: str, samples: list) -> None:
+    print(
+        f"{name}: p50 {_percentile(samples, 0.5) * 1000:.2f}ms, "
+        f"p99 {_percentile(samples, 0.99) * 1000:.2f}ms, "
+        f"mean {statistics.mean(samples) * 1000:.2f}ms over {len(samples)} requests"
+    )
+
+
+def _measure(require_any_user, credentials, requests: int, before_each=None) -> list:
+    samples = []
+    for _ in range(requests):
+        if before_each:
+            before_each()
+        start = time.perf_counter()
+        require_any_user(credentials)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=(
+            "Measure the p50/p99 overhead the auth dependency adds to a request with its verified token "
+            "and user metadata caches cold and warm, against a local Auth0 stand-in and DynamoDB Local."
+        )
+    )
+    parser.add_argument("--requests", type=int, default=1000, help="The number of requests per run")
+    args = parser.parse_args()
+
+    if not os.getenv("DYNAMODB_HOST"):
+        raise SystemExit("Set DYNAMODB_HOST to a DynamoDB Local endpoint, e.g. http://localhost:8000")
+
+    stand_in = Auth0StandIn().start()
+    # The auth module reads its configuration on import
+    os.environ["AUTH0_DOMAIN"] = stand_in.domain
+    os.environ["AUTH0_AUDIENCE"] = "auth-benchmark"
+    os.environ["AUTH0_CLIENT_ID"] = "auth-benchmark"
+    os.environ.setdefault("AUTH0_MGMT_CLIENT_ID", "auth-benchmark")
+    os.environ.setdefault("AUTH0_MGMT_CLIENT_SECRET", "auth-benchmark")
+
+    from fastapi.security import HTTPAuthorizationCredentials
+
+    from src.lib.token_authentication import TokenAuthentication, signing_key_cache, verified_token_cache
+    from src.models.dynamo.user_metadata import UserMetadataModel, user_metadata_cache
+
+    if not UserMetadataModel.exists():
+        UserMetadataModel.create_table(read_capacity_units=5, write_capacity_units=5, wait=True)
+    UserMetadataModel(BENCHMARK_USER_ID, email="auth-benchmark@example.com", permissions=[]).synchronous_save()
+
+    now = int(time.time())
+    token = stand_in.sign(
+        {
+            "sub": f"auth0|{BENCHMARK_USER_ID}",
+            "aud": "auth-benchmark",
+            "iss": f"https://{stand_in.domain}/",
+            "azp": "auth-benchmark",
+            "iat": now,
+            "exp": now + 3600,
+        }
+    )
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+    require_any_user = TokenAuthentication().require_any_user
+    signing_key_cache.warm()
+
+    def _clear_caches():
+        # How every request ran before the caches, a full JWT verification and a DynamoDB read
+        verified_token_cache.clear()
+        user_metadata_cache.clear()
+
+    try:
+        _report("cold", _measure(require_any_user, credentials, args.requests, _clear_caches))
+        require_any_user(credentials)
+        _report("warm", _measure(require_any_user, credentials, args.requests))
+        print(f"verified tokens: {verified_token_cache.stats()}, user metadata: {user_metadata_cache.stats()}")
+    finally:
+        stand_in.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+import argparse
+import hashlib
+import json
+import os
+import statistics
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def _sqs_handler(connections: list):
+    class SQSHandler(BaseHTTPRequestHandler):
+        # Keep connections alive so a shared client can reuse them
+        protocol_version = "HTTP/1.1"
+
+        def setup(self):
+            super().setup()
+            connections.append(self.client_address)
+
+        def do_POST(self):
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+
+            # Answer SendMessage, botocore checks the digest of the body it sent
+            body = json.dumps(
+                {
+                    "MessageId": str(uuid.uuid4()),
+                    "MD5OfMessageBody": hashlib.md5(request.get("MessageBody", "").encode()).hexdigest(),
+                }
+            ).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-amz-json-1.0")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return SQSHandler
+
+
+def start_sqs_stand_in(connections: list) -> ThreadingHTTPServer:
+    """Serve SQS SendMessage on a local port."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _sqs_handler(connections))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _run(name: str, send, requests: int, connections: list) -> None:
+    samples = []
+    connections.clear()
+
+    for index in range(requests):
+        start = time.perf_counter()
+        send(json.dumps({"job": index}))
+        samples.append(time.perf_counter() - start)
+
+    samples.sort()
+    print(
+        f"{name}: p50 {samples[len(samples) // 2] * 1000:.2f}ms, "
+        f"p99 {samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1000:.2f}ms, "
+        f"mean {statistics.mean(samples) * 1000:.2f}ms, {len(connections)} connections opened"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure the per-request overhead of SQS calls with the shared AWS client registry on and off."
+    )
+    parser.add_argument("--requests", type=int, default=200, help="The number of requests per run")
+    args = parser.parse_args()
+
+    connections: list = []
+    server = start_sqs_stand_in(connections)
+    endpoint_url = f"http://127.0.0.1:{server.server_address[1]}"
+    queue_url = f"{endpoint_url}/000000000000/benchmark"
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "benchmark")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "benchmark")
+
+    import boto3
+
+    from src.lib.aws_clients import AWS_REGION, get_aws_client
+
+    def _client_per_call(body: str):
+        # How the services called AWS before the registry, a new client per call
+        sqs = boto3.client("sqs", region_name=AWS_REGION, endpoint_url=endpoint_url)
+        sqs.send_message(QueueUrl=queue_url, MessageBody=body)
+
+    def _shared_client(body: str):
+        get_aws_client("sqs", endpoint_url=endpoint_url).send_message(QueueUrl=queue_url, MessageBody=body)
+
+    try:
+        _run("registry off (client per call)", _client_per_call, args.requests, connections)
+        _run("registry on (shared client)", _shared_client, args.requests, connections)
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+import argparse
+import asyncio
+import os
+import random
+import time
+
+from benchmarks.openai_benchmark import start_fake_completions_server
+
+CONTEXT_TOKENS = 128000
+
+
+def build_transcript(turns: list, tokens: int, seed: int) -> str:
+    """Build a synthetic meeting transcript of about `tokens` tokens out of shuffled, timestamped speaker turns."""
+    from src.lib.transcript_chunker import CHARS_PER_TOKEN
+
+    rng = random.Random(seed)
+    lines = []
+    length = 0
+    seconds = 0
+
+    while length < tokens * CHARS_PER_TOKEN:
+        seconds += rng.randint(5, 90)
+        line = f"[{seconds // 3600:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}] {rng.choice(turns)}"
+        lines.append(line)
+        length += len(line) + 2
+
+    return "\n\n".join(lines)
+
+
+async def _single_request(client, transcript: str, number_of_tickets: int) -> str:
+    # How every transcript was generated before chunking, the whole of it in one request
+    from openai import BadRequestError
+
+    start = time.perf_counter()
+    try:
+        await client.create_tickets(transcript, number_of_tickets)
+    except BadRequestError:
+        return "context window exceeded"
+    return f"{time.perf_counter() - start:.2f}s"
+
+
+async def _chunked(client, transcript: str, number_of_tickets: int) -> str:
+    from src.lib.enums import PlatformEnum
+    from src.lib.transcript_chunker import chunk_transcript
+    from src.services.ticket import CHUNKED_GENERATION_THRESHOLD_TOKENS, generate_tickets_chunked_async
+
+    # The same steps stream_tickets_to_table takes for a long transcript
+    start = time.perf_counter()
+    ticket_prompt = client.build_ticket_prompt(
+        transcript, number_of_tickets, token_budget=CHUNKED_GENERATION_THRESHOLD_TOKENS
+    )
+    tickets = await generate_tickets_chunked_async(
+        client, ticket_prompt.transcript, number_of_tickets, PlatformEnum.JIRA, ticket_prompt
+    )
+    elapsed = time.perf_counter() - start
+
+    accounting = ticket_prompt.accounting
+    return (
+        f"{elapsed:.2f}s over {len(chunk_transcript(ticket_prompt.transcript))} chunks, "
+        f"{len(tickets['tickets'])} tickets, {accounting['total_tokens']} tokens "
+        f"({accounting['trimmed_tokens']} trimmed)"
+    )
+
+
+async def _benchmark(turns: list, sizes: list, number_of_tickets: int, seed: int) -> None:
+    from src.models.openai import close_openai_clients, get_async_openai_client
+
+    client = get_async_openai_client()
+
+    for tokens in sizes:
+        transcript = build_transcript(turns, tokens, seed)
+        print(f"{tokens // 1000}k tokens:")
+        print(f"  before (single request): {await _single_request(client, transcript, number_of_tickets)}")
+        print(f"  after (chunked map-reduce): {await _chunked(client, transcript, number_of_tickets)}")
+
+    await close_openai_clients()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=(
+            "Measure the latency and token use of long transcript generations, sent whole and chunked, "
+            "over synthetic transcripts against a local fake completions server."
+        )
+    )
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[5000, 20000, 50000, 100000, 200000], help="The transcript sizes in tokens"
+    )
+    parser.add_argument("--tickets", type=int, default=10, help="The number of tickets per generation")
+    parser.add_argument("--latency", type=float, default=0.5, help="Seconds the fake server takes per completion")
+    parser.add_argument(
+        "--seconds-per-1k-tokens", type=float, default=0.02, help="Seconds the fake server adds per thousand prompt tokens"
+    )
+    parser.add_argument("--transcript", default="example_transcription.txt", help="The transcript to draw speaker turns from")
+    parser.add_argument("--seed", type=int, default=0, help="The seed of the synthetic transcripts")
+    args = parser.parse_args()
+
+    server = start_fake_completions_server(args.latency, args.seconds_per_1k_tokens, CONTEXT_TOKENS)
+    # The clients and the rate limit governor read their configuration on import
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    os.environ["OPENAI_API_KEY"] = "benchmark"
+    os.environ.setdefault("OPENAI_REQUESTS_PER_MINUTE", "1000000")
+    os.environ.setdefault("OPENAI_TOKENS_PER_MINUTE", "1000000000")
+
+    from src.lib.transcript_chunker import SPEAKER_TURN_PATTERN, split_turns
+
+    with open(args.transcript) as transcript:
+        # Only the speaker turns, not the header of the call
+        turns = [turn for turn in split_turns(transcript.read()) if SPEAKER_TURN_PATTERN.match(turn)]
+
+    try:
+        asyncio.run(_benchmark(turns, args.sizes, args.tickets, args.seed))
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
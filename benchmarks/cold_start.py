@@ -0,0 +1,92 @@
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+# Dependencies that should only be imported by the routes that use them
+LAZY_MODULES = ["openai", "stripe", "auth0.management", "auth0.authentication"]
+
+
+class LambdaContext:
+    function_name = "cold-start"
+    memory_limit_in_mb = 1024
+    invoked_function_arn = "arn:aws:lambda:us-west-2:000000000000:function:cold-start"
+    aws_request_id = "cold-start"
+
+
+def api_gateway_event(path: str) -> dict:
+    return {
+        "resource": "/{proxy+}",
+        "path": path,
+        "httpMethod": "GET",
+        "headers": {"Content-Type": "application/json"},
+        "multiValueHeaders": {},
+        "queryStringParameters": None,
+        "multiValueQueryStringParameters": None,
+        "pathParameters": {"proxy": path.lstrip("/")},
+        "requestContext": {
+            "resourcePath": "/{proxy+}",
+            "httpMethod": "GET",
+            "path": path,
+            "stage": "cold-start",
+            "identity": {"sourceIp": "127.0.0.1"},
+        },
+        "body": None,
+        "isBase64Encoded": False,
+    }
+
+
+def measure_once(path: str) -> dict:
+    """Import the Lambda entry point and send it one request, in this process."""
+    start = time.perf_counter()
+    import app
+
+    imported = time.perf_counter()
+    response = app.handler(api_gateway_event(path), LambdaContext())
+    responded = time.perf_counter()
+
+    return {
+        "import_ms": round((imported - start) * 1000, 1),
+        "first_response_ms": round((responded - imported) * 1000, 1),
+        "total_ms": round((responded - start) * 1000, 1),
+        "status_code": response.get("statusCode"),
+        "eagerly_imported": [module for module in LAZY_MODULES if module in sys.modules],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure the cold start of app.handler: the time to import it and to serve the first request under Mangum."
+    )
+    parser.add_argument("--path", default="/api/health", help="The path of the first request")
+    parser.add_argument("--runs", type=int, default=5, help="The number of fresh processes to measure")
+    parser.add_argument("--once", action="store_true", help="Measure in this process and print the result as json")
+    args = parser.parse_args()
+
+    if args.once:
+        print(json.dumps(measure_once(args.path)))
+        return
+
+    # Every run is a fresh interpreter, so nothing is already imported or cached
+    results = []
+    for _ in range(args.runs):
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.cold_start", "--once", "--path", args.path],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+
+    for key in ("import_ms", "first_response_ms", "total_ms"):
+        values = [result[key] for result in results]
+        print(f"{key}: median {statistics.median(values)}, min {min(values)}, max {max(values)}")
+
+    print(f"status codes: {sorted({result['status_code'] for result in results})}")
+    print(f"eagerly imported: {results[-1]['eagerly_imported'] or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+import argparse
+import asyncio
+import datetime
+import os
+import time
+
+from src.models.dynamo.ticket import Ticket
+from src.models.dynamo.user_metadata import UserMetadataModel
+from src.services.quota import GENERATIONS, consume_quota
+
+
+async def _ticker(lags: list, stop: asyncio.Event, interval: float = 0.005) -> None:
+    """Measure how late the event loop wakes up, which is how long other requests would stall."""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - start - interval)
+
+
+async def _blocking_get(document_id: str, created_datetime: str) -> Ticket:
+    # How the services read items before the async access layer
+    return Ticket.get(document_id, created_datetime)
+
+
+async def _run(name: str, get, keys: list, concurrency: int) -> None:
+    semaphore = asyncio.Semaphore(concurrency)
+    lags: list = []
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(_ticker(lags, stop))
+
+    async def _get(key):
+        async with semaphore:
+            return await get(*key)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(_get(key) for key in keys))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await ticker
+
+    print(
+        f"{name}: {len(keys) / elapsed:.0f} gets/s, "
+        f"max loop lag {max(lags, default=0) * 1000:.1f}ms, "
+        f"p50 loop lag {sorted(lags)[len(lags) // 2] * 1000 if lags else 0:.1f}ms"
+    )
+
+
+async def _check_quota(requests: int, quota: int) -> None:
+    """Spend a user's quota with many parallel requests and check none over-spend it."""
+    user = UserMetadataModel(f"benchmark-{time.time_ns()}", generations_count=quota)
+    await user.save()
+
+    results = await asyncio.gather(
+        *(consume_quota(UserMetadataModel(user.user_id), GENERATIONS) for _ in range(requests)),
+        return_exceptions=True,
+    )
+    charged = sum(1 for result in results if not isinstance(result, BaseException))
+    await user.refresh_async(consistent_read=True)
+
+    print(f"quota: {charged} of {requests} parallel requests charged, {user.generations_count} left of {quota}")
+    if charged != quota or user.generations_count != 0:
+        raise SystemExit("Quota was over-spent")
+
+
+def _seed_users(users: int, sub_users: int, parent_user_id: str) -> None:
+    """Fill the UserMetadata table with users, sub_users of which belong to one parent account."""
+    # The parent account is saved last, so it only exists once its table is filled
+    try:
+        UserMetadataModel.get(parent_user_id)
+        return
+    except UserMetadataModel.DoesNotExist:
+        pass
+
+    # Spread the sub-users through the table so a scan has to read all of it to find them
+    every = max(users // max(sub_users, 1), 1)
+    with UserMetadataModel.batch_write() as batch:
+        for index in range(users):
+            batch.save(
+                UserMetadataModel(
+                    f"benchmark-user-{index}",
+                    email=f"benchmark-user-{index}@example.com",
+                    parent_user_id=parent_user_id if index % every == 0 and index // every < sub_users else None,
+                )
+            )
+        batch.save(UserMetadataModel(parent_user_id))
+
+
+def _check_sub_accounts(users: int, sub_users: int, page_size: int) -> None:
+    """Compare finding the sub-users of an account by scanning the table and by the parent user index."""
+    parent_user_id = f"benchmark-parent-{users}-{sub_users}"
+    _seed_users(users, sub_users, parent_user_id)
+    parent = UserMetadataModel(parent_user_id)
+
+    start = time.perf_counter()
+    scan = UserMetadataModel.scan(UserMetadataModel.parent_user_id == parent_user_id)
+    scanned = [user.user_id for user in scan]
+    scan_elapsed = time.perf_counter() - start
+
+    async def _pages() -> list:
+        found, last_evaluated_key = [], None
+        while True:
+            page, last_evaluated_key = await parent.get_sub_accounts_page(page_size, last_evaluated_key)
+            found.extend(user.user_id for user in page)
+            if last_evaluated_key is None:
+                return found
+
+    start = time.perf_counter()
+    queried = asyncio.run(_pages())
+    query_elapsed = time.perf_counter() - start
+
+    print(
+        f"sub-accounts: scan read {scan.page_iter.total_scanned_count} users in {scan_elapsed * 1000:.0f}ms, "
+        f"index query read {len(queried)} sub-users in {query_elapsed * 1000:.0f}ms"
+    )
+    if sorted(scanned) != sorted(queried):
+        raise SystemExit("The parent user index returned different sub-users than the scan")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=(
+            "Compare blocking and offloaded DynamoDB reads from the event loop against DynamoDB Local, "
+            "check 100 parallel requests can't over-spend a quota, and compare listing sub-users by "
+            "scanning the user table and by the parent user index."
+        )
+    )
+    parser.add_argument("--items", type=int, default=50, help="The number of items to read from")
+    parser.add_argument("--requests", type=int, default=1000, help="The number of gets per run")
+    parser.add_argument("--concurrency", type=int, default=32, help="The most gets in flight")
+    parser.add_argument("--quota", type=int, default=10, help="The quota the parallel requests of the quota check compete for")
+    parser.add_argument("--users", type=int, default=100_000, help="The number of users in the sub-accounts check")
+    parser.add_argument("--sub-users", type=int, default=50, help="The number of sub-users of the parent account")
+    parser.add_argument("--page-size", type=int, default=25, help="The sub-users read per page")
+    args = parser.parse_args()
+
+    if not os.getenv("DYNAMODB_HOST"):
+        raise SystemExit("Set DYNAMODB_HOST to a DynamoDB Local endpoint, e.g. http://localhost:8000")
+
+    for model in (Ticket, UserMetadataModel):
+        if not model.exists():
+            model.create_table(read_capacity_units=5, write_capacity_units=5, wait=True)
+
+    created_datetime = datetime.datetime.now().isoformat()
+    items = [
+        Ticket(
+            document_id=f"benchmark-{index}",
+            created_datetime=created_datetime,
+            tickets=[],
+            original_prompt="benchmark",
+        )
+        for index in range(args.items)
+    ]
+    asyncio.run(Ticket.batch_write_async(items))
+
+    keys = [(f"benchmark-{index % args.items}", created_datetime) for index in range(args.requests)]
+
+    asyncio.run(_run("blocking", _blocking_get, keys, args.concurrency))
+    asyncio.run(_run("offloaded", Ticket.get_async, keys, args.concurrency))
+    asyncio.run(_check_quota(100, args.quota))
+    _check_sub_accounts(args.users, args.sub_users, args.page_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+MIB = 1024 * 1024
+
+
+def _peak_rss_mib() -> float:
+    # ru_maxrss is in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _s3_client():
+    import boto3
+
+    from src.lib.aws_clients import get_aws_config
+
+    return boto3.client("s3", endpoint_url=os.getenv("S3_ENDPOINT_URL"), config=get_aws_config("s3"))
+
+
+def upload_once(mode: str, path: str, bucket_name: str) -> dict:
+    """Upload a file once in this process and report its peak RSS and throughput."""
+    from src.lib.multipart_upload import MultipartUpload
+
+    s3_client = _s3_client()
+    key = f"benchmark/{mode}-{time.time_ns()}"
+    size = os.path.getsize(path)
+    rss_before = _peak_rss_mib()
+
+    start = time.perf_counter()
+    with open(path, "rb") as file_object:
+        if mode == "put":
+            # How every upload went out before multipart uploads
+            s3_client.put_object(Bucket=bucket_name, Key=key, Body=file_object)
+        else:
+            MultipartUpload(s3_client, bucket_name, key).upload(file_object)
+    elapsed = time.perf_counter() - start
+
+    s3_client.delete_object(Bucket=bucket_name, Key=key)
+
+    return {
+        "throughput": size / MIB / elapsed,
+        "peak_rss": _peak_rss_mib(),
+        "rss_growth": _peak_rss_mib() - rss_before,
+    }
+
+
+def _run(mode: str, path: str, bucket_name: str) -> dict:
+    # A fresh process per upload so one run's peak RSS doesn't hide the next one's
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.multipart_upload_benchmark", "--upload", mode, "--file", path, "--bucket", bucket_name],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def _write_file(directory: str, size_mib: int) -> str:
+    path = os.path.join(directory, f"{size_mib}mib.bin")
+    with open(path, "wb") as file_object:
+        for _ in range(size_mib):
+            file_object.write(os.urandom(MIB))
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure the peak RSS and throughput of S3 uploads against a local S3 stand-in such as MinIO."
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 50, 500], help="The file sizes in MiB")
+    parser.add_argument("--bucket", default="multipart-benchmark", help="The bucket to upload to")
+    parser.add_argument("--upload", choices=["put", "multipart"], help=argparse.SUPPRESS)
+    parser.add_argument("--file", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.upload:
+        print(json.dumps(upload_once(args.upload, args.file, args.bucket)))
+        return
+
+    s3_client = _s3_client()
+    try:
+        s3_client.create_bucket(Bucket=args.bucket)
+    except s3_client.exceptions.BucketAlreadyOwnedByYou:
+        pass
+
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            path = _write_file(directory, size)
+            for name, mode in [("before (single put_object)", "put"), ("after (multipart)", "multipart")]:
+                result = _run(mode, path, args.bucket)
+                print(
+                    f"{size} MiB {name}: {result['throughput']:.1f} MiB/s, "
+                    f"peak RSS {result['peak_rss']:.0f} MiB (+{result['rss_growth']:.0f} MiB during the upload)"
+                )
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from email.parser import BytesParser
+from email.policy import default as default_policy
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+from benchmarks.openai_benchmark import TICKETS
+
+
+class OpenAIBatchStandIn:
+    """
+    A local stand-in for the OpenAI files and batches endpoints bulk generations
+    use. Uploaded batches finish `completion_delay` seconds after they are
+    created, with a share of `failure_rate` of their requests failing. An
+    expiring stand-in only answers the first half of every batch, the way a batch
+    that runs out of its completion window returns the requests that did finish.
+
+    Point OPENAI_BASE_URL at `base_url` before the OpenAI client is created.
+    """
+
+    def __init__(
+        self,
+        completion_delay: float = 0.0,
+        failure_rate: float = 0.0,
+        expire: bool = False,
+        port: int = 0,
+        seed: Optional[int] = None,
+    ) -> None:
+        self.completion_delay = completion_delay
+        self.failure_rate = failure_rate
+        self.expire = expire
+        self.files: Dict[str, bytes] = {}
+        self.batches: Dict[str, dict] = {}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._server.daemon_threads = True
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}/v1"
+
+    def _add_file(self, content: bytes) -> str:
+        file_id = f"file-{uuid.uuid4().hex}"
+        with self._lock:
+            self.files[file_id] = content
+        return file_id
+
+    def _result(self, request: dict) -> dict:
+        result = {"id": f"batch_req_{uuid.uuid4().hex}", "custom_id": request["custom_id"], "error": None}
+
+        if self._rng.random() < self.failure_rate:
+            result["response"] = {
+                "status_code": 500,
+                "body": {"error": {"message": "The stand-in failed this request.", "type": "server_error"}},
+            }
+            return result
+
+        result["response"] = {
+            "status_code": 200,
+            "body": {
+                "id": f"chatcmpl-{uuid.uuid4().hex}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": request["body"].get("model"),
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": json.dumps(TICKETS)},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": {"prompt_tokens": 1000, "completion_tokens": 500, "total_tokens": 1500},
+            },
+        }
+        return result
+
+    def _create_batch(self, document: dict) -> dict:
+        requests: List[dict] = [
+            json.loads(line) for line in self.files[document["input_file_id"]].decode().splitlines() if line.strip()
+        ]
+        answered = requests[: len(requests) // 2] if self.expire else requests
+        results = [self._result(request) for request in answered]
+
+        output = [result for result in results if result["response"]["status_code"] == 200]
+        errors = [result for result in results if result["response"]["status_code"] != 200]
+        batch = {
+            "id": f"batch_{uuid.uuid4().hex}",
+            "object": "batch",
+            "endpoint": document["endpoint"],
+            "input_file_id": document["input_file_id"],
+            "completion_window": document["completion_window"],
+            "status": "validating",
+            "output_file_id": None,
+            "error_file_id": None,
+            "created_at": int(time.time()),
+            "metadata": document.get("metadata"),
+            "request_counts": {"total": len(requests), "completed": len(output), "failed": len(errors)},
+            # Kept until the batch finishes, never returned
+            "_finishes_at": time.monotonic() + self.completion_delay,
+            "_output": "\n".join(json.dumps(result) for result in output).encode(),
+            "_errors": "\n".join(json.dumps(result) for result in errors).encode(),
+        }
+
+        with self._lock:
+            self.batches[batch["id"]] = batch
+        return self._batch(batch["id"])
+
+    def _batch(self, batch_id: str) -> Optional[dict]:
+        with self._lock:
+            batch = self.batches.get(batch_id)
+        if batch is None:
+            return None
+
+        if batch["status"] == "validating" and time.monotonic() >= batch["_finishes_at"]:
+            batch["status"] = "expired" if self.expire else "completed"
+            batch["output_file_id"] = self._add_file(batch["_output"]) if batch["_output"] else None
+            batch["error_file_id"] = self._add_file(batch["_errors"]) if batch["_errors"] else None
+
+        return {key: value for key, value in batch.items() if not key.startswith("_")}
+
+    def _handler(self):
+        stand_in = self
+
+        class BatchHandler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _send(self, status: int, body: bytes, content_type: str = "application/json") -> None:
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _not_found(self) -> None:
+                self._send(404, json.dumps({"error": {"message": f"No such resource {self.path}."}}).encode())
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+                if self.path == "/v1/files":
+                    # The multipart form of the upload, parsed as a MIME message
+                    message = BytesParser(policy=default_policy).parsebytes(
+                        f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode() + body
+                    )
+                    upload = next(part for part in message.iter_parts() if part.get_filename())
+                    content = upload.get_payload(decode=True)
+                    document = {
+                        "id": stand_in._add_file(content),
+                        "object": "file",
+                        "bytes": len(content),
+                        "created_at": int(time.time()),
+                        "filename": upload.get_filename(),
+                        "purpose": "batch",
+                        "status": "processed",
+                    }
+                    self._send(200, json.dumps(document).encode())
+                elif self.path == "/v1/batches":
+                    self._send(200, json.dumps(stand_in._create_batch(json.loads(body))).encode())
+                else:
+                    self._not_found()
+
+            def do_GET(self):
+                path = self.path.split("?")[0]
+
+                if path.startswith("/v1/batches/"):
+                    batch = stand_in._batch(path.rsplit("/", 1)[1])
+                    if batch is None:
+                        self._not_found()
+                    else:
+                        self._send(200, json.dumps(batch).encode())
+                elif path.startswith("/v1/files/") and path.endswith("/content"):
+                    content = stand_in.files.get(path.split("/")[3])
+                    if content is None:
+                        self._not_found()
+                    else:
+                        self._send(200, content, "application/octet-stream")
+                else:
+                    self._not_found()
+
+            def log_message(self, *args):
+                pass
+
+        return BatchHandler
+
+    def start(self) -> "OpenAIBatchStandIn":
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Serve the OpenAI files and batches endpoints locally so bulk generations run without OpenAI."
+    )
+    parser.add_argument("--port", type=int, default=8089, help="The port to serve on")
+    parser.add_argument("--completion-delay", type=float, default=10.0, help="Seconds until a batch finishes")
+    parser.add_argument("--failure-rate", type=float, default=0.1, help="The share of requests that fail")
+    parser.add_argument("--expire", action="store_true", help="Expire every batch with half of its requests answered")
+    args = parser.parse_args()
+
+    stand_in = OpenAIBatchStandIn(args.completion_delay, args.failure_rate, args.expire, args.port).start()
+    print(f"Serving the OpenAI batch stand-in, set OPENAI_BASE_URL={stand_in.base_url}")
+
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        stand_in.stop()
+
+
+if __name__ == "__main__":
+    main()
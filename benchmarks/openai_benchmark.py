@@ -0,0 +1,159 @@
+import argparse
+import asyncio
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+TICKETS = {
+    "tickets": [
+        {"subject": f"Ticket {index}", "body": "Generated by the fake completions server", "estimationPoints": 3}
+        for index in range(10)
+    ]
+}
+
+
+def _prompt_tokens(request: dict) -> int:
+    # Roughly four characters per token, like the transcript chunker's estimate
+    return sum(len(message.get("content", "")) for message in request.get("messages", [])) // 4
+
+
+def _completions_handler(latency: float, seconds_per_1k_tokens: float, context_tokens: Optional[int]):
+    class CompletionsHandler(BaseHTTPRequestHandler):
+        # Keep connections alive so a pooled client can reuse them
+        protocol_version = "HTTP/1.1"
+
+        def _send(self, status: int, document: dict) -> None:
+            body = json.dumps(document).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            prompt_tokens = _prompt_tokens(request)
+
+            if context_tokens is not None and prompt_tokens + request.get("max_tokens", 0) > context_tokens:
+                self._send(
+                    400,
+                    {
+                        "error": {
+                            "message": f"This model's maximum context length is {context_tokens} tokens.",
+                            "type": "invalid_request_error",
+                            "code": "context_length_exceeded",
+                        }
+                    },
+                )
+                return
+
+            # Stand in for the time the model takes to read the prompt and generate
+            time.sleep(latency + seconds_per_1k_tokens * prompt_tokens / 1000)
+
+            self._send(
+                200,
+                {
+                    "id": "chatcmpl-benchmark",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": "gpt-4-turbo-preview",
+                    "choices": [
+                        {
+                            "index": 0,
+                            "message": {"role": "assistant", "content": json.dumps(TICKETS)},
+                            "finish_reason": "stop",
+                        }
+                    ],
+                    "usage": {
+                        "prompt_tokens": prompt_tokens,
+                        "completion_tokens": 500,
+                        "total_tokens": prompt_tokens + 500,
+                    },
+                },
+            )
+
+        def log_message(self, *args):
+            pass
+
+    return CompletionsHandler
+
+
+def start_fake_completions_server(
+    latency: float, seconds_per_1k_tokens: float = 0.0, context_tokens: Optional[int] = None
+) -> ThreadingHTTPServer:
+    """
+    Serve canned chat completions on a local port, each after `latency` seconds plus
+    `seconds_per_1k_tokens` per thousand prompt tokens. Prompts that don't fit in
+    `context_tokens` are rejected the way OpenAI rejects them.
+    """
+    server = ThreadingHTTPServer(
+        ("127.0.0.1", 0), _completions_handler(latency, seconds_per_1k_tokens, context_tokens)
+    )
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def _run(name: str, generate, generations: int, in_flight: int) -> None:
+    semaphore = asyncio.Semaphore(in_flight)
+
+    async def _generate():
+        async with semaphore:
+            return await generate()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(_generate() for _ in range(generations)))
+    elapsed = time.perf_counter() - start
+
+    print(f"{name} at {in_flight} in flight: {generations / elapsed:.1f} generations/s")
+
+
+async def _benchmark(prompt: str, generations: int, concurrency: list) -> None:
+    from src.models.openai import AsyncOpenAIClient, close_openai_clients, get_async_openai_client
+
+    async def _client_per_generation():
+        # How generations ran before the shared client, a fresh client and connection per generation
+        async with AsyncOpenAIClient() as client:
+            return await client.create_tickets(prompt, 10)
+
+    async def _async_generation():
+        return await get_async_openai_client().create_tickets(prompt, 10)
+
+    for in_flight in concurrency:
+        await _run("before (client per generation)", _client_per_generation, generations, in_flight)
+        await _run("after (shared async client)", _async_generation, generations, in_flight)
+
+    await close_openai_clients()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure ticket generations per second with 1, 8 and 32 generations in flight against a local fake completions server."
+    )
+    parser.add_argument("--generations", type=int, default=64, help="The number of generations per run")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32], help="The generations in flight")
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds the fake server takes per completion")
+    parser.add_argument("--transcript", default="example_transcription.txt", help="The transcript to send")
+    args = parser.parse_args()
+
+    server = start_fake_completions_server(args.latency)
+    # The clients and the rate limit governor read their configuration on import
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    os.environ["OPENAI_API_KEY"] = "benchmark"
+    os.environ.setdefault("OPENAI_REQUESTS_PER_MINUTE", "1000000")
+    os.environ.setdefault("OPENAI_TOKENS_PER_MINUTE", "1000000000")
+
+    with open(args.transcript) as transcript:
+        prompt = transcript.read()
+
+    try:
+        asyncio.run(_benchmark(prompt, args.generations, args.concurrency))
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
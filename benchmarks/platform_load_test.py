@@ -0,0 +1,113 @@
+import argparse
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+from requests.auth import HTTPBasicAuth
+
+
+def _platform_handler(latency: float, connections: list):
+    class PlatformHandler(BaseHTTPRequestHandler):
+        # Keep connections alive so a pooled client can reuse them
+        protocol_version = "HTTP/1.1"
+
+        def setup(self):
+            super().setup()
+            connections.append(self.client_address)
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            # Stand in for the time the platform takes to create the issue
+            time.sleep(latency)
+
+            body = json.dumps({"id": "10000", "key": "TRAN-1", "self": f"http://{self.headers['Host']}/issue/10000"}).encode()
+            self.send_response(201)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return PlatformHandler
+
+
+def start_mock_platform_server(latency: float, connections: list) -> ThreadingHTTPServer:
+    """Serve a Jira-like issue endpoint on a local port, each issue after `latency` seconds."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _platform_handler(latency, connections))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def _run(name: str, client, stories: int, in_flight: int, connections: list) -> None:
+    semaphore = asyncio.Semaphore(in_flight)
+    ticket_params = {"name": "Load test story", "description": "Created by the load test", "estimate": 3}
+
+    async def _create():
+        async with semaphore:
+            return await client.create_story(ticket_params)
+
+    connections.clear()
+    start = time.perf_counter()
+    await asyncio.gather(*(_create() for _ in range(stories)))
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"{name} at {in_flight} in flight: {stories / elapsed:.1f} stories/s, "
+        f"{len(connections)} connections opened"
+    )
+
+
+async def _load_test(server_url: str, stories: int, concurrency: list, connections: list) -> None:
+    from src.lib.http_transport import close_async_clients
+    from src.services.clients import Jira
+
+    class BlockingJira(Jira):
+        # How requests were sent before the shared transport, a blocking requests call per story
+        async def _request(self, method, path, body=None, headers=None, auth=None):
+            response = requests.request(
+                method,
+                await self._url(path),
+                headers=headers if headers else self.headers,
+                json=body,
+                auth=HTTPBasicAuth(self.email, self.token_auth)
+            )
+            response.raise_for_status()
+            return response
+
+    credentials = {"server": server_url, "email": "load-test@pixelum.ai", "token_auth": "load-test"}
+
+    for in_flight in concurrency:
+        await _run("before (blocking request per story)", BlockingJira(**credentials), stories, in_flight, connections)
+        await _run("after (shared async transport)", Jira(**credentials), stories, in_flight, connections)
+
+    await close_async_clients()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure concurrent create_story throughput against a local mock platform server."
+    )
+    parser.add_argument("--stories", type=int, default=100, help="The number of stories per run")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 5, 20], help="The stories in flight")
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds the mock server takes per story")
+    args = parser.parse_args()
+
+    connections: list = []
+    server = start_mock_platform_server(args.latency, connections)
+
+    try:
+        asyncio.run(
+            _load_test(f"http://127.0.0.1:{server.server_address[1]}", args.stories, args.concurrency, connections)
+        )
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,11 @@
+import os
+import sys
+import time
 from logging import Logger
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Tuple
 
 from src.lib.constants import ORIGINS
+from src.lib.http_transport import close_async_clients
 
 if TYPE_CHECKING:
     from src.config import Config
@@ -10,6 +14,11 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from pixelum_core.loggers.loggers import get_module_logger
 
+# The input of the KeepWarm schedule in template.yaml
+WARM_UP_EVENT_KEY = "warm_up"
+# Warm up while the Lambda initializes, before the snapshot when SnapStart is on
+WARM_UP_ON_INIT = os.getenv("WARM_UP_ON_INIT", "true").lower() == "true"
+
 
 class Application:
     def __init__(self, config: "Config"):
@@ -29,10 +38,92 @@ class Application:
         # Connect routers to the application
         self._connect_routers()
 
+        # Release pooled platform and OpenAI connections when uvicorn shuts down. Mangum runs
+        # with lifespan="off" on Lambda, so there the clients live as long as the container
+        self._app.add_event_handler("shutdown", close_async_clients)
+        self._app.add_event_handler("shutdown", self._close_openai_clients)
+
     @property
     def app(self) -> FastAPI:
         return self._app
 
+    @staticmethod
+    def is_warm_up_event(event: Any) -> bool:
+        """
+        Whether a Lambda event is a scheduled ping rather than an HTTP request.
+
+        Args:
+            event (Any): The Lambda event.
+
+        Returns:
+            bool: Whether the event should only warm the container up.
+        """
+        return isinstance(event, dict) and (
+            bool(event.get(WARM_UP_EVENT_KEY)) or event.get("source") == "aws.events"
+        )
+
+    def warm_up(self) -> Dict[str, Any]:
+        """
+        Do the work the first request on a new container would otherwise pay for:
+        fetch the JWKS signing keys, build the AWS clients and open pooled
+        connections to DynamoDB and S3. Running it again on a scheduled ping keeps
+        those connections from idling out. A failing step is logged and skipped so
+        warming up never stops the container from serving.
+
+        Returns:
+            Dict[str, Any]: The milliseconds each step took, or its error.
+        """
+        results: Dict[str, Any] = {}
+
+        for name, step in self._warm_up_steps():
+            start = time.perf_counter()
+            try:
+                step()
+                results[name] = round((time.perf_counter() - start) * 1000, 1)
+            except Exception as e:
+                self.logger.error(f"Warm-up step {name} failed: {e}")
+                results[name] = {"error": str(e)}
+
+        self.logger.info(f"Warmed up: {results}")
+        return results
+
+    @staticmethod
+    def _warm_up_steps() -> List[Tuple[str, Callable[[], Any]]]:
+        from botocore.exceptions import ClientError
+
+        from src.lib.aws_clients import get_aws_client
+        from src.lib.token_authentication import signing_key_cache
+        from src.models.dynamo.user_metadata import UserMetadataModel
+        from src.services.file_management import BUCKET_NAME, get_bucket
+
+        def _dynamodb() -> None:
+            # Every authenticated request reads UserMetadata, a miss is the cheapest read that opens its pool
+            try:
+                UserMetadataModel.get(WARM_UP_EVENT_KEY)
+            except UserMetadataModel.DoesNotExist:
+                pass
+
+        def _s3() -> None:
+            # Any response opens the pool, a missing key is answered without ListBucket access
+            try:
+                get_bucket().meta.client.head_object(Bucket=BUCKET_NAME, Key=WARM_UP_EVENT_KEY)
+            except ClientError:
+                pass
+
+        return [
+            ("jwks", signing_key_cache.warm),
+            ("sqs", lambda: get_aws_client("sqs")),
+            ("dynamodb", _dynamodb),
+            ("s3", _s3),
+        ]
+
+    @staticmethod
+    async def _close_openai_clients() -> None:
+        # Only close the OpenAI clients if a request loaded the SDK, never import it at shutdown
+        openai_models = sys.modules.get("src.models.openai")
+        if openai_models is not None:
+            await openai_models.close_openai_clients()
+
     def _connect_routers(self) -> None:
         import src.controllers as controllers
 
@@ -1,9 +1,9 @@
+import asyncio
 from logging import getLogger
 from typing import Dict
 
 from fastapi import APIRouter, Depends, File, UploadFile, Response
 from pixelum_core.api.authorized_api_handler import authorized_api_handler
-from pixelum_core.errors.custom_exceptions import FileUploadLimitReachedError
 
 from src.lib.token_authentication import TokenAuthentication
 from src.models.dynamo.documents import DocumentsModel
@@ -14,6 +14,7 @@ from src.services.file_management import (
     get_file_details_from_s3,
     get_all_files_from_documents,
 )
+from src.services.quota import FILE_UPLOADS, consume_quota, refund_quota
 
 router = APIRouter()
 logger = getLogger(__name__)
@@ -38,42 +39,30 @@ async def upload_file(
     Returns:
         Dict: The response containing the uploaded file details.
     """
-    logger.info(f"User has {user.file_uploads_count} file uploads remaining")
-    upload_count = 0
-
-    # First check if the user is a sub-user and get the parent user's file uploads count
-    if user.parent_user_id:
-        logger.info("User is a sub-user. Checking parent user's file uploads count")
-        upload_count = await user.get_parent_user_upload_count()
-    else:  # If the user is not a sub-user, get the user's file uploads count
-        upload_count = user.file_uploads_count
-
-    if upload_count == 0:
-        logger.error("User has reached the maximum number of file uploads.")
-        raise FileUploadLimitReachedError(
-            message="User has reached the maximum number of file uploads."
-        )
-
-    resp: dict = upload_file_to_s3(file)
-    user_id: str = user.user_id
-
-    for k, item in resp.get("files").items():
-        logger.info(f"item: {item}")
-        document: DocumentsModel = await DocumentsModel.initialize(
-            user_id=user_id,
-            document_id=item.get("name"),
-            document_type=item.get("extension"),
-            size=item.get("size", 0.0),
-            memo=f"Transcript with filename: {item.get('name')} and extension: {item.get('extension')}",
-        )
-
-        await document.save()
-
-    # Decrement the file uploads count for the user
-    logger.info("Decrementing the file uploads count for the user")
-    user.file_uploads_count -= 1
-    await user.save()
-    logger.info(f"User has {user.file_uploads_count} file uploads remaining")
+    # Charge the upload, to the parent account for sub-users
+    remaining: int = await consume_quota(user, FILE_UPLOADS)
+
+    try:
+        # Run the upload on a worker thread so large files don't block the event loop
+        resp: dict = await asyncio.to_thread(upload_file_to_s3, file)
+        user_id: str = user.user_id
+
+        for k, item in resp.get("files").items():
+            logger.info(f"item: {item}")
+            document: DocumentsModel = await DocumentsModel.initialize(
+                user_id=user_id,
+                document_id=item.get("name"),
+                document_type=item.get("extension"),
+                size=item.get("size", 0.0),
+                memo=f"Transcript with filename: {item.get('name')} and extension: {item.get('extension')}",
+            )
+
+            await document.save()
+    except Exception:
+        await refund_quota(user, FILE_UPLOADS)
+        raise
+
+    logger.info(f"User has {remaining} file uploads remaining")
 
     return resp
 
@@ -1,11 +1,19 @@
 from logging import getLogger
 from typing import Dict
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 from pixelum_core.api.authorized_api_handler import authorized_api_handler
 
+from src.lib.rate_limiter import openai_governor
+from src.lib.token_authentication import TokenAuthentication, signing_key_cache, verified_token_cache
+from src.models.auth0 import auth0_client
+from src.models.dynamo.user_metadata import UserMetadataModel, user_metadata_cache
+from src.services.generation_cache import generation_cache_stats
+
 router = APIRouter()
 logger = getLogger(__name__)
+token_authentication = TokenAuthentication()
+admin_user = token_authentication.require_user_with_permission("manage:admin")
 
 
 @router.get("/health", tags=["Health Check"])
@@ -16,3 +24,26 @@ async def check_health(
     This endpoint is for checking the health of the service.
     """
     return {"status": "healthy"}
+
+
+@router.get("/health/metrics", tags=["Health Check"])
+@authorized_api_handler(models_to_initialize=[UserMetadataModel])
+async def get_metrics(
+    _: UserMetadataModel = Depends(admin_user),
+) -> Dict:
+    """
+    This endpoint is for checking how often the in-process caches avoid network I/O
+    and how OpenAI requests are being throttled. It is restricted to admins since
+    it exposes the internals of the service.
+
+    Args:
+        _ (UserMetadataModel, optional): The admin making the request. Defaults to Depends(admin_user).
+    """
+    return {
+        "jwks_cache": signing_key_cache.stats(),
+        "verified_token_cache": verified_token_cache.stats(),
+        "user_metadata_cache": user_metadata_cache.stats(),
+        "auth0_management_token": auth0_client.token_cache.stats(),
+        "generation_cache": generation_cache_stats(),
+        "openai_rate_limit": openai_governor.stats(),
+    }
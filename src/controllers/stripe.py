@@ -3,7 +3,6 @@ from datetime import datetime
 from logging import getLogger
 from typing import Dict
 
-import stripe
 from fastapi import APIRouter, Depends
 from pixelum_core.api.authorized_api_handler import authorized_api_handler
 
@@ -28,6 +27,9 @@ async def process_payment(
     token: str,
     user: UserMetadataModel = Depends(granted_user)
 ) -> Dict:
+    # Stripe is only loaded by the payment routes
+    import stripe
+
     try:
         # Create a charge using the Stripe API
         charge = stripe.Charge.create(
@@ -1,17 +1,66 @@
+import asyncio
+import json
+import os
+import time
 import uuid
 from logging import getLogger
-from typing import Optional
+from typing import AsyncIterator, Optional
 
 from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
 from pixelum_core.api.authorized_api_handler import authorized_api_handler
-from pixelum_core.errors.custom_exceptions import TicketGenerationLimitReachedError
+from pixelum_core.errors.custom_exceptions import (
+    InvalidInput,
+    ResourceNotFoundException,
+)
 
 from src.lib.enums import EventEnum, PlatformEnum
 from src.lib.token_authentication import TokenAuthentication
+from src.models.dynamo.batch_generation import BatchGenerationModel
+from src.models.dynamo.generation_cache import GenerationCacheModel
+from src.models.dynamo.generation_job import GenerationJobModel
+from src.models.dynamo.generation_request import GenerationRequestModel
+from src.models.dynamo.quota_reservation import QuotaReservationModel
 from src.models.dynamo.ticket import SubTicket, Ticket
 from src.models.dynamo.user_metadata import UserMetadataModel
-from src.schemas.ticket import SubTicketGenerationSchema, TicketGenerationSchema, TicketList, TicketParamsSchema
-from src.services.ticket import get_subticket, get_tickets, invoke_ticket_generation_lambda
+from src.schemas.ticket import (
+    BatchGenerationSchema,
+    BatchGenerationStatusSchema,
+    BulkTicketPushResultSchema,
+    BulkTicketPushSchema,
+    GenerationJobStatusSchema,
+    SubTicketGenerationSchema,
+    TicketGenerationSchema,
+    TicketList,
+    TicketParamsSchema,
+)
+from src.services.batch_generation import (
+    BATCH_GENERATION_MAX_JOBS,
+    create_batch_generation,
+    get_batch_generation,
+)
+from src.services.generation_jobs import (
+    create_generation_job,
+    update_generation_job,
+    wait_for_generation_job,
+)
+from src.services.generation_requests import claim_generation_request, release_generation_request
+from src.services.quota import (
+    GENERATIONS,
+    consume_quota,
+    get_quota_owner_id,
+    refund_quota,
+    refund_quota_reservation,
+    reserve_quota,
+)
+from src.services.ticket import (
+    check_number_of_tickets,
+    get_generation_ticket_params,
+    get_subticket,
+    get_tickets,
+    enqueue_ticket_job,
+    push_tickets_to_platform,
+)
 
 router = APIRouter()
 logger = getLogger(__name__)
@@ -20,55 +69,107 @@ granted_user = token_authentication.require_user_with_permission(
     "manage:upload_transcripts"
 )
 
+TICKET_STREAM_POLL_INTERVAL = float(os.getenv("TICKET_STREAM_POLL_INTERVAL", 1.0))
+# API Gateway cuts REST responses off after 29 seconds and Mangum buffers the body,
+# so the ticket stream is a long-poll that has to end well before then
+API_GATEWAY_MAX_WAIT = 25.0
+TICKET_STREAM_TIMEOUT = min(float(os.getenv("TICKET_STREAM_TIMEOUT", API_GATEWAY_MAX_WAIT)), API_GATEWAY_MAX_WAIT)
+
 
 @router.post("/file/{file_name}/tickets", tags=["Ticket Management"])
-@authorized_api_handler()
+@authorized_api_handler(
+    models_to_initialize=[
+        GenerationRequestModel,
+        GenerationJobModel,
+        QuotaReservationModel,
+        # The worker reads and writes the generation cache for the jobs queued here
+        GenerationCacheModel,
+    ]
+)
 async def invoke_ticket_generation(
     file_name: str,
     number_of_tickets: Optional[int] = 10,
     platform: Optional[PlatformEnum] = PlatformEnum.JIRA,
+    bypass_cache: Optional[bool] = False,
     user: UserMetadataModel = Depends(granted_user),
 ) -> TicketGenerationSchema:
     """
-    This endpoint is for generating tickets from a transcript. It invokes a long
-    running lambda function to generate the tickets and returns the datetime when the
-    lambda was invoked. The tickets can be retrieved using the datetime returned.
+    This endpoint is for generating tickets from a transcript. It queues a job for
+    the ticket generation worker and returns the datetime of the generation. The
+    tickets can be retrieved using the datetime returned, and the progress of the
+    generation followed with /file/{file_name}/tickets/status. Identical requests for
+    the same transcript made while a generation is in flight return that
+    generation's datetime without queueing another job.
 
     Args:
         file_name (str): The name of the file to generate tickets from.
         number_of_tickets (Optional[int], optional): The number of tickets to generate. Defaults to 10.
         platform (Optional[PlatformEnum], optional): The platform to generate the tickets for. Defaults to PlatformEnum.JIRA.
+        bypass_cache (Optional[bool], optional): Whether to generate new tickets even if this transcript was already processed. Defaults to False.
         user (Dict, optional): The user making the request. Defaults to Depends(granted_user).
 
     Returns:
-        TicketGenerationSchema: The datetime when the lambda was invoked.
+        TicketGenerationSchema: The datetime of the generation.
     """
-    logger.info(f"User has {user.generations_count} ticket generations remaining")
-    generations_count = 0
+    check_number_of_tickets(number_of_tickets)
 
-    # First check if the user is a sub-user and get the parent user's ticket generations count
-    if user.parent_user_id:
-        logger.info("User is a sub-user. Checking parent user's ticket generations count")
-        generations_count = await user.get_parent_user_generations_count()
-    else:  # If the user is not a sub-user, get the user's ticket generations count
-        generations_count = user.generations_count
-
-    if generations_count == 0:
-        logger.error("User has reached the maximum number of ticket generations.")
-        raise TicketGenerationLimitReachedError(message="User has reached the maximum number of ticket generations.")
-
-    # Invoke the ticket generation lambda function
-    ticket_generation_datetime: str = await invoke_ticket_generation_lambda(
+    # Join an identical generation that is already in flight instead of paying for a new one,
+    # unless fresh tickets were asked for
+    generation_request, claimed = await claim_generation_request(
         document_id=file_name,
         user_id=user.user_id,
-        event=EventEnum.TICKET_GENERATION,
+        owner_id=get_quota_owner_id(user),
         number_of_tickets=number_of_tickets,
         platform=platform,
+        take_over=bypass_cache,
     )
 
-    # Decrement the generations count for the user
-    user.generations_count -= 1
-    await user.save()
+    if not claimed:
+        return {"ticket_generation_datetime": generation_request.generation_datetime}
+
+    # Reserve the generation, from the parent account for sub-users, until the worker settles it
+    try:
+        reservation: QuotaReservationModel = await reserve_quota(
+            user,
+            GENERATIONS,
+            document_id=file_name,
+            generation_datetime=generation_request.generation_datetime,
+        )
+    except Exception:
+        await release_generation_request(generation_request)
+        raise
+
+    # Record the generation and queue its job, settling the reservation and claim if either fails
+    try:
+        await create_generation_job(
+            document_id=file_name,
+            generation_datetime=generation_request.generation_datetime,
+            user_id=user.user_id,
+            owner_id=get_quota_owner_id(user),
+            number_of_tickets=number_of_tickets,
+        )
+
+        ticket_generation_datetime: str = await enqueue_ticket_job(
+            document_id=file_name,
+            user_id=user.user_id,
+            event=EventEnum.TICKET_GENERATION,
+            number_of_tickets=number_of_tickets,
+            platform=platform,
+            generation_datetime=generation_request.generation_datetime,
+            bypass_cache=bypass_cache,
+            quota_reservation_id=reservation.reservation_id,
+            generation_request_key=generation_request.request_key,
+        )
+    except Exception as e:
+        await refund_quota_reservation(reservation.reservation_id)
+        await release_generation_request(generation_request)
+        await update_generation_job(
+            file_name,
+            generation_request.generation_datetime,
+            status=GenerationJobModel.FAILED,
+            error=str(e) or type(e).__name__,
+        )
+        raise
 
     return {"ticket_generation_datetime": ticket_generation_datetime}
 
@@ -110,8 +211,114 @@ async def get_tickets_by_generation_time(
     return {"tickets": ticket_dict.get("tickets")}
 
 
-@router.post("/file/{file_name}/tickets/expand", tags=["Ticket Management"])
+@router.get("/file/{file_name}/tickets/status", tags=["Ticket Management"])
+@authorized_api_handler(models_to_initialize=[GenerationJobModel])
+async def get_ticket_generation_status(
+    file_name: str,
+    generation_datetime: str,
+    since_version: Optional[int] = None,
+    wait: Optional[float] = 0,
+    user: UserMetadataModel = Depends(granted_user),
+) -> GenerationJobStatusSchema:
+    """
+    This endpoint is for following the progress of a ticket generation. With wait
+    set it long polls, holding the request until the generation changes from
+    since_version or finishes, for at most wait seconds. The tickets themselves
+    are retrieved from /file/{file_name}/tickets once the status is succeeded.
+
+    Args:
+        file_name (str): The name of the file the tickets are generated from.
+        generation_datetime (str): The datetime of the generation.
+        since_version (Optional[int], optional): The last version the client saw. Defaults to the current version.
+        wait (Optional[float], optional): The most seconds to wait for a change. Defaults to 0.
+        user (Dict, optional): The user making the request. Defaults to Depends(granted_user).
+
+    Returns:
+        GenerationJobStatusSchema: The status of the generation.
+    """
+    generation_job: GenerationJobModel = await wait_for_generation_job(
+        document_id=file_name,
+        generation_datetime=generation_datetime,
+        owner_id=get_quota_owner_id(user),
+        since_version=since_version,
+        wait=wait or 0,
+    )
+
+    return await generation_job.to_serializable_dict()
+
+
+@router.get("/file/{file_name}/tickets/stream", tags=["Ticket Management"])
 @authorized_api_handler(models_to_initialize=[Ticket])
+async def stream_tickets_by_generation_time(
+    file_name: str,
+    generation_datetime: str,
+    since: Optional[int] = 0,
+    _: UserMetadataModel = Depends(granted_user),
+) -> StreamingResponse:
+    """
+    This endpoint is a long-poll for the tickets of a generation, formatted as
+    server-sent events. It waits until tickets past `since` have been written and
+    returns them, or returns once the generation is done. API Gateway buffers the
+    response and ends it after 29 seconds, so the wait is capped at
+    TICKET_STREAM_TIMEOUT (25 seconds at most). Clients reconnect with `since` set
+    to the count of the last event until they receive `complete`.
+
+    Events:
+        ticket: A ticket of the generation as json.
+        complete: The generation has finished, the stream ends.
+        pending: The generation is still running, reconnect with since=count.
+        timeout: No new tickets were written in time, reconnect with since=count.
+
+    Args:
+        file_name (str): The name of the file the tickets are generated from.
+        generation_datetime (str): The datetime when the lambda was invoked.
+        since (int, optional): The number of tickets already received. Defaults to 0.
+        _: Dict, optional): The user making the request. Defaults to Depends(granted_user).
+
+    Returns:
+        StreamingResponse: The text/event-stream of tickets.
+    """
+
+    async def _events() -> AsyncIterator[str]:
+        received_count = max(since or 0, 0)
+        sent_count = received_count
+        deadline = time.monotonic() + TICKET_STREAM_TIMEOUT
+
+        while time.monotonic() < deadline:
+            ticket: Optional[Ticket] = await get_tickets(
+                document_id=file_name, generation_datetime=generation_datetime
+            )
+
+            if ticket:
+                ticket_dict: dict = await ticket.to_serializable_dict()
+
+                for t in ticket_dict.get("tickets")[sent_count:]:
+                    t["id"] = uuid.uuid4().hex
+                    yield f"event: ticket\ndata: {json.dumps(t)}\n\n"
+                    sent_count += 1
+
+                if ticket_dict.get("is_complete"):
+                    yield f"event: complete\ndata: {json.dumps({'count': sent_count})}\n\n"
+                    return
+
+                # Hand the new tickets over now, the buffered response only reaches the client once it ends
+                if sent_count > received_count:
+                    yield f"event: pending\ndata: {json.dumps({'count': sent_count})}\n\n"
+                    return
+
+            await asyncio.sleep(TICKET_STREAM_POLL_INTERVAL)
+
+        yield f"event: timeout\ndata: {json.dumps({'count': sent_count})}\n\n"
+
+    return StreamingResponse(
+        _events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/file/{file_name}/tickets/expand", tags=["Ticket Management"])
+@authorized_api_handler(models_to_initialize=[Ticket, QuotaReservationModel])
 async def expand_ticket(
     file_name: str,
     generation_datetime: str,
@@ -129,32 +336,22 @@ async def expand_ticket(
     Returns:
         TicketList: The list of sub tickets generated from the transcript.
     """
-    logger.info(f"User has {user.generations_count} ticket generations remaining")
-    generations_count = 0
-
-    # First check if the user is a sub-user and get the parent user's ticket generations count
-    if user.parent_user_id:
-        logger.info("User is a sub-user. Checking parent user's ticket generations count")
-        generations_count = await user.get_parent_user_generations_count()
-    else:  # If the user is not a sub-user, get the user's ticket generations count
-        generations_count = user.generations_count
-
-    if generations_count == 0:
-        logger.error("User has reached the maximum number of ticket generations.")
-        raise TicketGenerationLimitReachedError(message="User has reached the maximum number of ticket generations.")
-
-    sub_ticket_id: str = await invoke_ticket_generation_lambda(
-        document_id=file_name,
-        user_id=user.user_id,
-        event=EventEnum.TICKET_EXPANSION,
-        number_of_tickets=3,  # TODO: Make this a query parameter
-        generation_datetime=generation_datetime,
-        ticket=body.model_dump(),
-    )
-
-    # Decrement the generations count for the user
-    user.generations_count -= 1
-    await user.save()
+    # Reserve the expansion, from the parent account for sub-users, until the worker settles it
+    reservation: QuotaReservationModel = await reserve_quota(user, GENERATIONS)
+
+    try:
+        sub_ticket_id: str = await enqueue_ticket_job(
+            document_id=file_name,
+            user_id=user.user_id,
+            event=EventEnum.TICKET_EXPANSION,
+            number_of_tickets=3,  # TODO: Make this a query parameter
+            generation_datetime=generation_datetime,
+            ticket=body.model_dump(),
+            quota_reservation_id=reservation.reservation_id,
+        )
+    except Exception:
+        await refund_quota_reservation(reservation.reservation_id)
+        raise
 
     return {"sub_ticket_id": sub_ticket_id}
 
@@ -208,3 +405,111 @@ async def create_ticket(
     ticket: dict = await platform_client.create_story(**ticket_params)
 
     return {"ticket": ticket}
+
+
+@router.post("/tickets/bulk", tags=["Ticket Management"])
+@authorized_api_handler(models_to_initialize=[Ticket])
+async def create_tickets_bulk(
+    platform: PlatformEnum,
+    body: BulkTicketPushSchema,
+    user: UserMetadataModel = Depends(granted_user),
+) -> BulkTicketPushResultSchema:
+    """
+    This endpoint is for creating many tickets in a platform at once, either every
+    ticket of a stored generation or an explicit list of tickets.
+
+    Args:
+        platform (PlatformEnum): The platform to create the tickets in.
+        body (BulkTicketPushSchema): The generation or list of tickets to create.
+        user (Dict, optional): The user making the request. Defaults to Depends(granted_user).
+
+    Returns:
+        BulkTicketPushResultSchema: The result of each ticket along with the created and failed counts.
+    """
+    if body.tickets:
+        tickets_params: list = [ticket.model_dump() for ticket in body.tickets]
+    elif body.document_id and body.generation_datetime:
+        tickets_params = await get_generation_ticket_params(
+            body.document_id, body.generation_datetime
+        )
+
+        if tickets_params is None:
+            raise ResourceNotFoundException(
+                "Generation not found.",
+                resource_name="Ticket",
+                resource_identifier=f"{body.document_id}/{body.generation_datetime}",
+            )
+    else:
+        raise InvalidInput(
+            "Either tickets or document_id and generation_datetime must be provided."
+        )
+
+    # Get the platform client for the user once for the whole push
+    platform_client = await user.get_platform_client(platform)
+
+    return await push_tickets_to_platform(platform_client, tickets_params)
+
+
+@router.post("/tickets/batch", tags=["Ticket Management"])
+@authorized_api_handler(models_to_initialize=[BatchGenerationModel])
+async def invoke_batch_ticket_generation(
+    body: BatchGenerationSchema,
+    user: UserMetadataModel = Depends(granted_user),
+) -> BatchGenerationStatusSchema:
+    """
+    This endpoint is for generating tickets from many transcripts at once. The
+    generations are submitted as one OpenAI batch that is processed off-peak, and
+    each generation's tickets are written to its own generation_datetime once the
+    batch has completed. Every transcript uses one ticket generation, given back
+    if its generation fails or the batch expires before it.
+
+    Args:
+        body (BatchGenerationSchema): The document, number of tickets and platform of each generation.
+        user (Dict, optional): The user making the request. Defaults to Depends(granted_user).
+
+    Returns:
+        BatchGenerationStatusSchema: The submitted bulk generation.
+    """
+    if len(body.jobs) > BATCH_GENERATION_MAX_JOBS:
+        raise InvalidInput(f"A bulk generation can have at most {BATCH_GENERATION_MAX_JOBS} jobs.")
+    for job in body.jobs:
+        check_number_of_tickets(job.number_of_tickets)
+
+    # Charge every generation at once, the bulk generation is refused if they aren't all covered.
+    # The generations that fail are refunded once the batch has finished
+    await consume_quota(user, GENERATIONS, len(body.jobs))
+
+    try:
+        batch_generation: BatchGenerationModel = await create_batch_generation(
+            user.user_id, get_quota_owner_id(user), [job.model_dump() for job in body.jobs]
+        )
+    except Exception:
+        await refund_quota(user, GENERATIONS, len(body.jobs))
+        raise
+
+    return await batch_generation.to_serializable_dict()
+
+
+@router.get("/tickets/batch/{batch_generation_id}", tags=["Ticket Management"])
+@authorized_api_handler(models_to_initialize=[BatchGenerationModel, Ticket])
+async def get_batch_ticket_generation(
+    batch_generation_id: str,
+    user: UserMetadataModel = Depends(granted_user),
+) -> BatchGenerationStatusSchema:
+    """
+    This endpoint is for checking on a bulk generation. Once its batch has
+    finished the tickets are written to the Ticket table and the outcome of every
+    generation is returned.
+
+    Args:
+        batch_generation_id (str): The ID of the bulk generation.
+        user (Dict, optional): The user making the request. Defaults to Depends(granted_user).
+
+    Returns:
+        BatchGenerationStatusSchema: The status of the bulk generation.
+    """
+    batch_generation: BatchGenerationModel = await get_batch_generation(
+        batch_generation_id, user.user_id
+    )
+
+    return await batch_generation.to_serializable_dict()
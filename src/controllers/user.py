@@ -1,5 +1,5 @@
 import os
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 from fastapi import APIRouter, Depends
 from pixelum_core.api.authorized_api_handler import authorized_api_handler
@@ -12,7 +12,7 @@ from src.lib.constants import SUBSCRIPTION_TIER_MAP
 from src.lib.token_authentication import TokenAuthentication
 from src.models.auth0 import auth0_client
 from src.models.dynamo.user_metadata import UserMetadataModel
-from src.schemas.user_metadata import UserMetadataReturnSchema
+from src.schemas.user_metadata import SubAccountPageSchema, UserMetadataReturnSchema
 from src.services.user import (
     create_and_send_user_invitation_email_ses,
     create_auth0_user,
@@ -21,6 +21,7 @@ from src.services.user import (
     get_auth0_user_permissions,
     remove_auth0_user_permissions,
     create_new_sub_user_invite_link,
+    get_sub_accounts_page,
     syncronous_get_user_metadata,
     update_users_permissions,
 )
@@ -211,3 +212,25 @@ async def invite_sub_user(
     _ = await create_and_send_user_invitation_email_ses(email, invite_link)
 
     return {"message": "User invited successfully"}
+
+
+@router.get("/user-metadata/sub-users", tags=["User Management"])
+@authorized_api_handler(models_to_initialize=[UserMetadataModel])
+async def list_sub_users(
+    limit: Optional[int] = 50,
+    cursor: Optional[str] = None,
+    user: UserMetadataModel = Depends(granted_user),
+) -> SubAccountPageSchema:
+    """
+    List the sub users of the user a page at a time, read from the parent user
+    index so only the user's own sub users are touched.
+
+    Args:
+        limit (Optional[int], optional): The most sub users to return. Defaults to 50.
+        cursor (Optional[str], optional): The cursor returned with the previous page. Defaults to None.
+        user (UserMetadataModel, optional): The parent user. Defaults to Depends(granted_user).
+
+    Returns:
+        SubAccountPageSchema: The sub users and the cursor of the next page.
+    """
+    return await get_sub_accounts_page(user, limit=limit, cursor=cursor)
@@ -96,6 +96,9 @@ async def get_user_metadata(
     Returns:
         Dict: The user metadata.
     """
+    # The user from authentication may come from the cache, report the current quota
+    await user.refresh_async(consistent_read=True)
+
     return await user.to_serializable_dict()
 
 
@@ -183,7 +186,7 @@ async def subscribe_to_service(
             user.generations_count = 1000000
             user.file_uploads_count = 100000
 
-    await user.save()
+    await user.save_changes()
 
     return await user.to_serializable_dict()
 
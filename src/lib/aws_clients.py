@@ -0,0 +1,125 @@
+import os
+import threading
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+import boto3
+from botocore.config import Config
+from pixelum_core.loggers.loggers import get_module_logger
+
+logger = get_module_logger()
+
+AWS_REGION = os.getenv("AWS_REGION", "us-west-2")
+AWS_MAX_ATTEMPTS = int(os.getenv("AWS_MAX_ATTEMPTS", 5))
+AWS_CONNECT_TIMEOUT = float(os.getenv("AWS_CONNECT_TIMEOUT", 5.0))
+AWS_READ_TIMEOUT = float(os.getenv("AWS_READ_TIMEOUT", 30.0))
+AWS_MAX_POOL_CONNECTIONS = int(os.getenv("AWS_MAX_POOL_CONNECTIONS", 10))
+
+# Services called from many threads at once get a larger connection pool
+SERVICE_MAX_POOL_CONNECTIONS: Dict[str, int] = {
+    "s3": int(os.getenv("AWS_S3_MAX_POOL_CONNECTIONS", 50)),
+    "sqs": int(os.getenv("AWS_SQS_MAX_POOL_CONNECTIONS", 20)),
+    "ses": int(os.getenv("AWS_SES_MAX_POOL_CONNECTIONS", 4)),
+}
+
+_session: Optional[boto3.session.Session] = None
+_clients: Dict[Hashable, Any] = {}
+_resources: Dict[Hashable, Any] = {}
+# Building a client isn't thread-safe and costs tens of milliseconds, do it once per key
+_lock = threading.Lock()
+
+
+def get_aws_config(service_name: str) -> Config:
+    """
+    Get the botocore config for a service: adaptive retries, TCP keep-alive and
+    a connection pool sized for the service.
+
+    Args:
+        service_name (str): The name of the AWS service.
+
+    Returns:
+        Config: The botocore config.
+    """
+    return Config(
+        region_name=AWS_REGION,
+        retries={"mode": "adaptive", "max_attempts": AWS_MAX_ATTEMPTS},
+        tcp_keepalive=True,
+        max_pool_connections=SERVICE_MAX_POOL_CONNECTIONS.get(service_name, AWS_MAX_POOL_CONNECTIONS),
+        connect_timeout=AWS_CONNECT_TIMEOUT,
+        read_timeout=AWS_READ_TIMEOUT,
+    )
+
+
+def _get_session() -> boto3.session.Session:
+    global _session
+
+    if _session is None:
+        _session = boto3.session.Session()
+    return _session
+
+
+def _cache_key(service_name: str, kwargs: dict) -> Tuple:
+    return (service_name, *sorted(kwargs.items()))
+
+
+def get_aws_client(service_name: str, **kwargs) -> Any:
+    """
+    Get the shared boto3 client for a service.
+
+    Clients are created once per service and arguments and reused for the life of
+    the process so requests share credentials and keep-alive connections.
+
+    Args:
+        service_name (str): The name of the AWS service.
+        **kwargs: Extra arguments for the client, such as explicit credentials.
+
+    Returns:
+        Any: The boto3 client.
+    """
+    key = _cache_key(service_name, kwargs)
+    client = _clients.get(key)
+
+    if client is None:
+        with _lock:
+            client = _clients.get(key)
+            if client is None:
+                logger.debug(f"Creating AWS client for {service_name}")
+                client = _get_session().client(
+                    service_name, config=get_aws_config(service_name), **kwargs
+                )
+                _clients[key] = client
+
+    return client
+
+
+def get_aws_resource(service_name: str, **kwargs) -> Any:
+    """
+    Get the shared boto3 resource for a service, created like get_aws_client.
+
+    Args:
+        service_name (str): The name of the AWS service.
+        **kwargs: Extra arguments for the resource.
+
+    Returns:
+        Any: The boto3 resource.
+    """
+    key = _cache_key(service_name, kwargs)
+    resource = _resources.get(key)
+
+    if resource is None:
+        with _lock:
+            resource = _resources.get(key)
+            if resource is None:
+                logger.debug(f"Creating AWS resource for {service_name}")
+                resource = _get_session().resource(
+                    service_name, config=get_aws_config(service_name), **kwargs
+                )
+                _resources[key] = resource
+
+    return resource
+
+
+def clear_aws_clients() -> None:
+    """Drop every shared client and resource, e.g. after the credentials changed."""
+    with _lock:
+        _clients.clear()
+        _resources.clear()
@@ -0,0 +1,100 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """
+    A thread-safe, size-bounded LRU cache whose entries expire.
+
+    Entries expire `ttl` seconds after they are set unless an explicit epoch
+    `expires_at` is given. When the cache is full the least recently used entry
+    is evicted.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: float = 60.0) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters: Dict[str, int] = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "invalidations": 0,
+        }
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Get a value from the cache.
+
+        Args:
+            key (Hashable): The key of the value.
+            default (Any, optional): Returned when the key is missing or expired. Defaults to None.
+
+        Returns:
+            Any: The cached value or the default.
+        """
+        with self._lock:
+            entry = self._data.get(key)
+
+            if entry is None or entry[1] <= time.time():
+                if entry is not None:
+                    del self._data[key]
+                self._counters["misses"] += 1
+                return default
+
+            self._data.move_to_end(key)
+            self._counters["hits"] += 1
+            return entry[0]
+
+    def set(
+        self,
+        key: Hashable,
+        value: Any,
+        ttl: Optional[float] = None,
+        expires_at: Optional[float] = None,
+    ) -> None:
+        """
+        Set a value in the cache.
+
+        Args:
+            key (Hashable): The key of the value.
+            value (Any): The value to cache.
+            ttl (float, optional): Seconds until the entry expires. Defaults to the cache ttl.
+            expires_at (float, optional): Epoch seconds when the entry expires. Takes
+                precedence over ttl when it is earlier.
+        """
+        expiry = time.time() + (self.ttl if ttl is None else ttl)
+        if expires_at is not None:
+            expiry = min(expiry, expires_at)
+
+        with self._lock:
+            self._data[key] = (value, expiry)
+            self._data.move_to_end(key)
+
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self._counters["evictions"] += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        """Remove a key from the cache if present."""
+        with self._lock:
+            if self._data.pop(key, None) is not None:
+                self._counters["invalidations"] += 1
+
+    def clear(self) -> None:
+        """Remove every entry from the cache."""
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the cache counters and current size."""
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["misses"]
+            return {
+                **self._counters,
+                "size": len(self._data),
+                "hit_rate": round(self._counters["hits"] / lookups, 3) if lookups else None,
+            }
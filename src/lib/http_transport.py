@@ -0,0 +1,72 @@
+import os
+from typing import Dict
+from urllib.parse import urlsplit
+
+import httpx
+from pixelum_core.loggers.loggers import get_module_logger
+
+logger = get_module_logger()
+
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", 20))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", 10))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", 60.0))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", 5.0))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", 30.0))
+
+try:
+    import h2  # noqa: F401
+
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+_clients: Dict[str, httpx.AsyncClient] = {}
+
+
+def _origin(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def get_async_client(url: str, http2: bool = False) -> httpx.AsyncClient:
+    """
+    Get the shared async HTTP client for the host of the given url.
+
+    Clients are created once per host and reused for the life of the process so
+    that requests to the same platform share a keep-alive connection pool. On
+    Lambda that is the life of the container, nothing closes them between
+    invocations.
+
+    Args:
+        url (str): Any url on the host to get the client for.
+        http2 (bool, optional): Whether to negotiate HTTP/2 with the host. Only used
+            when the `h2` package is installed. Defaults to False.
+
+    Returns:
+        httpx.AsyncClient: The client for the host.
+    """
+    origin = _origin(url)
+    client = _clients.get(origin)
+
+    if client is None or client.is_closed:
+        logger.debug(f"Creating HTTP client for {origin}")
+        client = httpx.AsyncClient(
+            http2=http2 and HTTP2_AVAILABLE,
+            limits=httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(HTTP_READ_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+        )
+        _clients[origin] = client
+
+    return client
+
+
+async def close_async_clients() -> None:
+    """Close every shared HTTP client and release its connections."""
+    for origin, client in list(_clients.items()):
+        logger.debug(f"Closing HTTP client for {origin}")
+        await client.aclose()
+    _clients.clear()
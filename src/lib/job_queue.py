@@ -0,0 +1,446 @@
+import asyncio
+import json
+import os
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+from pixelum_core.loggers.loggers import get_module_logger
+
+from src.lib.rate_limiter import backoff_delay
+
+logger = get_module_logger()
+
+JOB_VISIBILITY_TIMEOUT = int(os.getenv("JOB_VISIBILITY_TIMEOUT", 300))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", 3))
+JOB_WORKER_CONCURRENCY = int(os.getenv("JOB_WORKER_CONCURRENCY", 4))
+JOB_WORKER_BATCH_SIZE = int(os.getenv("JOB_WORKER_BATCH_SIZE", 10))
+JOB_WORKER_WAIT_SECONDS = int(os.getenv("JOB_WORKER_WAIT_SECONDS", 20))
+
+# The most messages SQS accepts in one send, receive or delete call
+SQS_BATCH_LIMIT = 10
+
+
+class Job:
+    """
+    A job received from a queue.
+
+    Args:
+        job_id (str): The ID of the job.
+        body (dict): The payload of the job.
+        receipt (str): The handle used to acknowledge or retry this receipt of the job.
+        attempts (int): How many times the job has been received, this receipt included.
+    """
+
+    def __init__(self, job_id: str, body: dict, receipt: str, attempts: int = 1) -> None:
+        self.job_id = job_id
+        self.body = body
+        self.receipt = receipt
+        self.attempts = attempts
+
+
+class JobQueue(ABC):
+    """
+    A durable queue of jobs. A received job is hidden from other consumers for
+    the visibility timeout and reappears unless it is acknowledged, so a worker
+    that dies mid-job doesn't lose it.
+    """
+
+    def enqueue(self, body: dict, delay: int = 0) -> str:
+        """
+        Add a job to the queue.
+
+        Args:
+            body (dict): The payload of the job.
+            delay (int, optional): Seconds before the job can be received. Defaults to 0.
+
+        Returns:
+            str: The ID of the job.
+        """
+        return self.enqueue_batch([body], delay)[0]
+
+    @abstractmethod
+    def enqueue_batch(self, bodies: List[dict], delay: int = 0) -> List[str]:
+        """
+        Add many jobs to the queue in as few calls as possible.
+
+        Args:
+            bodies (List[dict]): The payloads of the jobs.
+            delay (int, optional): Seconds before the jobs can be received. Defaults to 0.
+
+        Returns:
+            List[str]: The IDs of the jobs, in the order of the payloads.
+        """
+
+    @abstractmethod
+    def receive(self, max_jobs: int = SQS_BATCH_LIMIT, wait_seconds: int = 0) -> List[Job]:
+        """
+        Receive up to max_jobs jobs, waiting up to wait_seconds for the first one.
+
+        Args:
+            max_jobs (int, optional): The most jobs to receive.
+            wait_seconds (int, optional): Seconds to wait when the queue is empty. Defaults to 0.
+
+        Returns:
+            List[Job]: The received jobs.
+        """
+
+    @abstractmethod
+    def depth(self) -> int:
+        """Get the approximate number of jobs waiting or in flight."""
+
+    @abstractmethod
+    def ack(self, job: Job) -> None:
+        """Remove a finished job from the queue."""
+
+    @abstractmethod
+    def retry(self, job: Job, delay: float) -> None:
+        """Make a failed job visible again after delay seconds."""
+
+
+class InMemoryJobQueue(JobQueue):
+    """
+    A job queue held in process memory with the same visibility semantics as
+    SQS, for tests and local development.
+    """
+
+    def __init__(self, visibility_timeout: int = JOB_VISIBILITY_TIMEOUT) -> None:
+        self.visibility_timeout = visibility_timeout
+        # Each entry is [visible_at, job_id, body, receive_count]
+        self._jobs: Deque[list] = deque()
+        self._in_flight: Dict[str, list] = {}
+        self._condition = threading.Condition()
+
+    def depth(self) -> int:
+        with self._condition:
+            return len(self._jobs) + len(self._in_flight)
+
+    def _expire_in_flight(self, now: float) -> None:
+        for receipt, entry in list(self._in_flight.items()):
+            if entry[0] <= now:
+                del self._in_flight[receipt]
+                self._jobs.append(entry)
+
+    def enqueue_batch(self, bodies: List[dict], delay: int = 0) -> List[str]:
+        job_ids: List[str] = []
+        with self._condition:
+            for body in bodies:
+                job_id = str(uuid.uuid4())
+                # Round trip through json so jobs behave like they do on SQS
+                self._jobs.append([time.monotonic() + delay, job_id, json.loads(json.dumps(body)), 0])
+                job_ids.append(job_id)
+            self._condition.notify_all()
+        return job_ids
+
+    def receive(self, max_jobs: int = SQS_BATCH_LIMIT, wait_seconds: int = 0) -> List[Job]:
+        deadline = time.monotonic() + wait_seconds
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                self._expire_in_flight(now)
+
+                jobs: List[Job] = []
+                for entry in list(self._jobs):
+                    if len(jobs) >= max_jobs:
+                        break
+                    if entry[0] > now:
+                        continue
+                    self._jobs.remove(entry)
+                    entry[0] = now + self.visibility_timeout
+                    entry[3] += 1
+                    receipt = str(uuid.uuid4())
+                    self._in_flight[receipt] = entry
+                    jobs.append(Job(entry[1], entry[2], receipt, entry[3]))
+
+                if jobs or now >= deadline:
+                    return jobs
+                self._condition.wait(min(deadline - now, 0.1))
+
+    def ack(self, job: Job) -> None:
+        with self._condition:
+            self._in_flight.pop(job.receipt, None)
+
+    def retry(self, job: Job, delay: float) -> None:
+        with self._condition:
+            entry = self._in_flight.pop(job.receipt, None)
+            if entry is not None:
+                entry[0] = time.monotonic() + delay
+                self._jobs.append(entry)
+                self._condition.notify_all()
+
+
+class SQSJobQueue(JobQueue):
+    """
+    A job queue backed by an SQS queue.
+
+    Args:
+        queue_url (str): The URL of the queue.
+        sqs_client: A boto3 SQS client.
+    """
+
+    def __init__(self, queue_url: str, sqs_client: Any) -> None:
+        self.queue_url = queue_url
+        self._sqs = sqs_client
+
+    def enqueue_batch(self, bodies: List[dict], delay: int = 0) -> List[str]:
+        job_ids: List[str] = []
+
+        for start in range(0, len(bodies), SQS_BATCH_LIMIT):
+            entries = [
+                {"Id": str(index), "MessageBody": json.dumps(body), "DelaySeconds": int(delay)}
+                for index, body in enumerate(bodies[start:start + SQS_BATCH_LIMIT])
+            ]
+            response: dict = self._sqs.send_message_batch(QueueUrl=self.queue_url, Entries=entries)
+
+            if response.get("Failed"):
+                raise RuntimeError(f"Failed to enqueue jobs: {response['Failed']}")
+
+            message_ids = {entry["Id"]: entry["MessageId"] for entry in response.get("Successful", [])}
+            job_ids.extend(message_ids[entry["Id"]] for entry in entries)
+
+        return job_ids
+
+    def receive(self, max_jobs: int = SQS_BATCH_LIMIT, wait_seconds: int = 0) -> List[Job]:
+        response: dict = self._sqs.receive_message(
+            QueueUrl=self.queue_url,
+            MaxNumberOfMessages=max(1, min(max_jobs, SQS_BATCH_LIMIT)),
+            WaitTimeSeconds=wait_seconds,
+            AttributeNames=["ApproximateReceiveCount"],
+        )
+
+        return [
+            Job(
+                message["MessageId"],
+                json.loads(message["Body"]),
+                message["ReceiptHandle"],
+                int(message.get("Attributes", {}).get("ApproximateReceiveCount", 1)),
+            )
+            for message in response.get("Messages", [])
+        ]
+
+    def depth(self) -> int:
+        response: dict = self._sqs.get_queue_attributes(
+            QueueUrl=self.queue_url,
+            AttributeNames=["ApproximateNumberOfMessages", "ApproximateNumberOfMessagesNotVisible"],
+        )
+        return sum(int(value) for value in response.get("Attributes", {}).values())
+
+    def ack(self, job: Job) -> None:
+        self._sqs.delete_message(QueueUrl=self.queue_url, ReceiptHandle=job.receipt)
+
+    def retry(self, job: Job, delay: float) -> None:
+        self._sqs.change_message_visibility(
+            QueueUrl=self.queue_url, ReceiptHandle=job.receipt, VisibilityTimeout=int(delay)
+        )
+
+
+def create_job_queue(queue_url: Optional[str], sqs_client: Any = None) -> JobQueue:
+    """
+    Create the queue for a queue URL: an SQS queue when there is one, and an
+    in-memory queue for local development and tests when there isn't.
+
+    Args:
+        queue_url (str, optional): The URL of the SQS queue.
+        sqs_client (optional): The boto3 SQS client to use.
+
+    Returns:
+        JobQueue: The queue.
+
+    Raises:
+        RuntimeError: If no queue URL is configured on Lambda, where jobs kept in
+            memory would be lost with the execution environment.
+    """
+    if not queue_url:
+        if os.getenv("AWS_LAMBDA_FUNCTION_NAME"):
+            raise RuntimeError("No queue URL is configured, jobs can't be queued on Lambda without one")
+
+        logger.warning("No queue URL is configured, jobs are kept in memory")
+        return InMemoryJobQueue()
+
+    return SQSJobQueue(queue_url, sqs_client)
+
+
+JobHandler = Callable[[dict], Awaitable[Any]]
+# Run with the body of a job and its last error once the job has failed max_attempts times
+GiveUpHandler = Callable[[dict, Exception], Awaitable[Any]]
+
+
+class JobWorker:
+    """
+    Pulls jobs from a queue in batches and runs them with at most `concurrency`
+    in flight. A failed job is retried with backoff by shortening its visibility
+    timeout, and moved to the dead-letter queue once it has failed max_attempts times.
+
+    Args:
+        queue (JobQueue): The queue to pull jobs from.
+        handler (JobHandler): The coroutine run with the body of every job.
+        dead_letter_queue (JobQueue, optional): Where jobs that keep failing are moved.
+            Without one they are left to the queue's own redrive policy.
+        concurrency (int, optional): The most jobs run at once.
+        batch_size (int, optional): The most jobs pulled at once.
+        max_attempts (int, optional): How many times a job is tried before it is dead-lettered.
+        on_give_up (GiveUpHandler, optional): Run once a job has failed max_attempts times.
+    """
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        handler: JobHandler,
+        dead_letter_queue: Optional[JobQueue] = None,
+        concurrency: int = JOB_WORKER_CONCURRENCY,
+        batch_size: int = JOB_WORKER_BATCH_SIZE,
+        max_attempts: int = JOB_MAX_ATTEMPTS,
+        on_give_up: Optional[GiveUpHandler] = None,
+    ) -> None:
+        self.queue = queue
+        self.handler = handler
+        self.dead_letter_queue = dead_letter_queue
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.on_give_up = on_give_up
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._tasks: set = set()
+        self._counters: Dict[str, int] = {"succeeded": 0, "retried": 0, "dead_lettered": 0}
+
+    async def _give_up(self, job: Job, error: Exception) -> None:
+        if self.on_give_up is None:
+            return
+
+        try:
+            await self.on_give_up(job.body, error)
+        except Exception as give_up_error:
+            logger.error(f"Giving up on job {job.job_id} failed: {give_up_error!r}")
+
+    async def _run_job(self, job: Job) -> None:
+        try:
+            await self.handler(job.body)
+        except Exception as e:
+            logger.error(f"Job {job.job_id} failed on attempt {job.attempts}: {e!r}")
+
+            if job.attempts >= self.max_attempts:
+                await self._give_up(job, e)
+
+            if job.attempts >= self.max_attempts and self.dead_letter_queue is not None:
+                await asyncio.to_thread(
+                    self.dead_letter_queue.enqueue,
+                    {"job_id": job.job_id, "body": job.body, "attempts": job.attempts, "error": repr(e)},
+                )
+                await asyncio.to_thread(self.queue.ack, job)
+                self._counters["dead_lettered"] += 1
+            else:
+                await asyncio.to_thread(self.queue.retry, job, backoff_delay(job.attempts - 1))
+                self._counters["retried"] += 1
+        else:
+            await asyncio.to_thread(self.queue.ack, job)
+            self._counters["succeeded"] += 1
+        finally:
+            self._semaphore.release()
+
+    async def run_once(self, wait_seconds: int = 0) -> int:
+        """
+        Pull one batch of jobs, up to the free concurrency, and start running them.
+
+        Args:
+            wait_seconds (int, optional): Seconds to wait for jobs when the queue is empty.
+
+        Returns:
+            int: The number of jobs started.
+        """
+        await self._semaphore.acquire()
+        free_slots = 1
+        while free_slots < self.batch_size and not self._semaphore.locked():
+            await self._semaphore.acquire()
+            free_slots += 1
+
+        jobs: List[Job] = await asyncio.to_thread(self.queue.receive, free_slots, wait_seconds)
+
+        for _ in range(free_slots - len(jobs)):
+            self._semaphore.release()
+
+        for job in jobs:
+            task = asyncio.create_task(self._run_job(job))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+        return len(jobs)
+
+    async def run_event_source_batch(self, records: List[dict]) -> Dict[str, List[Dict[str, str]]]:
+        """
+        Run the jobs of a batch delivered by an SQS event source mapping, at most
+        `concurrency` at a time. Lambda deletes the messages of the jobs that
+        succeeded, a failed job is retried with backoff, and the queue's redrive
+        policy dead-letters it once it has been received max_attempts times.
+
+        Args:
+            records (List[dict]): The Records of the SQS event.
+
+        Returns:
+            Dict[str, List[Dict[str, str]]]: The batchItemFailures of the failed jobs,
+                for an event source mapping with ReportBatchItemFailures.
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def _run(record: dict) -> bool:
+            job = Job(
+                record["messageId"],
+                record.get("body"),
+                record["receiptHandle"],
+                int(record.get("attributes", {}).get("ApproximateReceiveCount", 1)),
+            )
+
+            async with semaphore:
+                try:
+                    job.body = json.loads(job.body)
+                    await self.handler(job.body)
+                    self._counters["succeeded"] += 1
+                    return True
+                except Exception as e:
+                    logger.error(f"Job {job.job_id} failed on attempt {job.attempts}: {e!r}")
+                    error: Exception = e
+
+                if job.attempts >= self.max_attempts:
+                    await self._give_up(job, error)
+                    self._counters["dead_lettered"] += 1
+                    return False
+
+                try:
+                    await asyncio.to_thread(self.queue.retry, job, backoff_delay(job.attempts - 1))
+                except Exception as retry_error:
+                    logger.error(f"Failed to delay the retry of job {job.job_id}: {retry_error!r}")
+                self._counters["retried"] += 1
+                return False
+
+        succeeded: List[bool] = await asyncio.gather(*(_run(record) for record in records))
+
+        return {
+            "batchItemFailures": [
+                {"itemIdentifier": record["messageId"]}
+                for record, ok in zip(records, succeeded)
+                if not ok
+            ]
+        }
+
+    async def drain(self) -> None:
+        """Wait for the jobs that are running to finish."""
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def run(self, stop_event: Optional[asyncio.Event] = None) -> None:
+        """
+        Pull and run jobs until stop_event is set, then wait for the running jobs.
+
+        Args:
+            stop_event (asyncio.Event, optional): Set to stop the worker.
+        """
+        logger.info(f"Job worker started with a concurrency of {self.concurrency}")
+        while stop_event is None or not stop_event.is_set():
+            await self.run_once(JOB_WORKER_WAIT_SECONDS)
+        await self.drain()
+
+    def stats(self) -> Dict[str, int]:
+        """Get the worker counters and the number of running jobs."""
+        return {**self._counters, "running": len(self._tasks)}
@@ -0,0 +1,175 @@
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import jwt
+from pixelum_core.loggers.loggers import get_module_logger
+
+logger = get_module_logger()
+
+JWKS_CACHE_TTL = float(os.getenv("JWKS_CACHE_TTL", 3600))
+# How long past the TTL a key may still be served while a refresh runs in the background
+JWKS_CACHE_STALE_TTL = float(os.getenv("JWKS_CACHE_STALE_TTL", 86400))
+# Minimum number of seconds between refetches triggered by an unknown kid
+JWKS_MIN_REFETCH_INTERVAL = float(os.getenv("JWKS_MIN_REFETCH_INTERVAL", 30))
+
+
+class SigningKeyCache:
+    """
+    Caches the JWKS signing keys by `kid`.
+
+    Keys younger than `ttl` are served straight from memory. Keys older than `ttl`
+    but within the stale window are still served while a single background thread
+    refreshes the key set, so a slow Auth0 never sits on the request path. The key
+    set is only fetched synchronously when the cache is empty, fully expired, or a
+    token arrives with a `kid` we have never seen, and that last case is rate
+    limited so forged tokens can't be used to hammer the JWKS endpoint.
+    """
+
+    def __init__(
+        self,
+        jwks_client: jwt.PyJWKClient,
+        ttl: float = JWKS_CACHE_TTL,
+        stale_ttl: float = JWKS_CACHE_STALE_TTL,
+        min_refetch_interval: float = JWKS_MIN_REFETCH_INTERVAL,
+    ) -> None:
+        self.jwks_client = jwks_client
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.min_refetch_interval = min_refetch_interval
+
+        self._keys: Dict[str, Any] = {}
+        self._fetched_at: float = 0.0
+        self._last_fetch_attempt: float = 0.0
+        self._lock = threading.Lock()
+        self._refreshing = False
+
+        self._counters: Dict[str, int] = {
+            "hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "refreshes": 0,
+            "background_refreshes": 0,
+            "refresh_errors": 0,
+            "rate_limited": 0,
+        }
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            self._counters[counter] += 1
+
+    def refresh(self) -> None:
+        """
+        Fetch the key set from the JWKS endpoint and replace the cached keys.
+
+        Raises:
+            jwt.PyJWKClientError: If the key set cannot be fetched.
+        """
+        self._last_fetch_attempt = time.monotonic()
+        try:
+            signing_keys = self.jwks_client.get_signing_keys(refresh=True)
+        except Exception:
+            self._count("refresh_errors")
+            raise
+
+        with self._lock:
+            self._keys = {key.key_id: key.key for key in signing_keys}
+            self._fetched_at = time.monotonic()
+            self._counters["refreshes"] += 1
+
+        logger.debug(f"Refreshed {len(signing_keys)} JWKS signing keys")
+
+    def _background_refresh(self) -> None:
+        try:
+            self.refresh()
+        except Exception as e:
+            logger.error(f"Background JWKS refresh failed: {e}")
+        finally:
+            self._refreshing = False
+
+    def _refresh_in_background(self) -> None:
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+            self._counters["background_refreshes"] += 1
+
+        threading.Thread(target=self._background_refresh, daemon=True).start()
+
+    def get_signing_key(self, token: str) -> Any:
+        """
+        Get the key that signed the token.
+
+        Args:
+            token (str): The JWT token.
+
+        Returns:
+            Any: The signing key.
+
+        Raises:
+            jwt.PyJWKClientError: If the key is unknown and can't be fetched.
+        """
+        kid: Optional[str] = jwt.get_unverified_header(token).get("kid")
+        age = time.monotonic() - self._fetched_at
+        key = self._keys.get(kid)
+
+        if key is not None and age < self.ttl:
+            self._count("hits")
+            return key
+
+        if key is not None and age < self.ttl + self.stale_ttl:
+            self._count("stale_hits")
+            self._refresh_in_background()
+            return key
+
+        self._count("misses")
+
+        if key is None and self._keys:
+            # The key set doesn't know this kid, only refetch if we haven't just done so
+            if time.monotonic() - self._last_fetch_attempt < self.min_refetch_interval:
+                self._count("rate_limited")
+                raise jwt.PyJWKClientError(f"Unable to find a signing key that matches: {kid}")
+
+        try:
+            self.refresh()
+        except Exception:
+            if key is not None:
+                # Auth0 is unavailable, fall back to the expired key rather than fail the request
+                logger.error("JWKS refresh failed, serving expired signing key")
+                return key
+            raise
+
+        key = self._keys.get(kid)
+        if key is None:
+            raise jwt.PyJWKClientError(f"Unable to find a signing key that matches: {kid}")
+
+        return key
+
+    def warm(self) -> bool:
+        """
+        Fetch the key set ahead of the first request, unless the cached keys are
+        still fresh.
+
+        Returns:
+            bool: Whether the key set was fetched.
+
+        Raises:
+            jwt.PyJWKClientError: If the key set cannot be fetched.
+        """
+        if self._keys and time.monotonic() - self._fetched_at < self.ttl:
+            return False
+
+        self.refresh()
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the cache counters along with the number and age of cached keys."""
+        with self._lock:
+            return {
+                **self._counters,
+                "keys": len(self._keys),
+                "age_seconds": (
+                    round(time.monotonic() - self._fetched_at, 1) if self._keys else None
+                ),
+            }
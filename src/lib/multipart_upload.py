@@ -0,0 +1,128 @@
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import BinaryIO, Dict, List, Optional, Set
+
+from pixelum_core.loggers.loggers import get_module_logger
+
+logger = get_module_logger()
+
+# S3 requires every part but the last to be at least 5 MiB
+MIN_PART_SIZE = 5 * 1024 * 1024
+DEFAULT_PART_SIZE = int(os.getenv("S3_MULTIPART_PART_SIZE", 8 * 1024 * 1024))
+DEFAULT_MAX_CONCURRENCY = int(os.getenv("S3_MULTIPART_MAX_CONCURRENCY", 4))
+# Files at or below this size go out as a single PUT
+DEFAULT_MULTIPART_THRESHOLD = int(
+    os.getenv("S3_MULTIPART_THRESHOLD", 16 * 1024 * 1024)
+)
+
+
+class MultipartUpload:
+    """
+    Streams a file object to S3 as a multipart upload.
+
+    Parts are read sequentially from the file object and uploaded concurrently
+    on a thread pool. At most `max_concurrency` parts are in flight at any time,
+    so memory use is bounded by roughly `part_size * (max_concurrency + 1)`
+    regardless of the size of the file. If any part fails the upload is aborted
+    so no orphaned parts are left behind in the bucket.
+    """
+
+    def __init__(
+        self,
+        s3_client,
+        bucket_name: str,
+        key: str,
+        part_size: int = DEFAULT_PART_SIZE,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    ) -> None:
+        self.s3_client = s3_client
+        self.bucket_name = bucket_name
+        self.key = key
+        self.part_size = max(part_size, MIN_PART_SIZE)
+        self.max_concurrency = max(max_concurrency, 1)
+        self.upload_id: Optional[str] = None
+
+    def _upload_part(self, part_number: int, data: bytes) -> Dict:
+        response = self.s3_client.upload_part(
+            Bucket=self.bucket_name,
+            Key=self.key,
+            UploadId=self.upload_id,
+            PartNumber=part_number,
+            Body=data,
+        )
+        logger.debug(f"Uploaded part {part_number} of {self.key} ({len(data)} bytes)")
+        return {"PartNumber": part_number, "ETag": response["ETag"]}
+
+    def _abort(self) -> None:
+        try:
+            self.s3_client.abort_multipart_upload(
+                Bucket=self.bucket_name, Key=self.key, UploadId=self.upload_id
+            )
+            logger.info(f"Aborted multipart upload {self.upload_id} for {self.key}")
+        except Exception as e:
+            logger.error(f"Failed to abort multipart upload {self.upload_id}: {e}")
+
+    def upload(self, file_object: BinaryIO) -> int:
+        """
+        Upload the file object to S3.
+
+        Args:
+            file_object (BinaryIO): The file object to read the parts from.
+
+        Returns:
+            int: The number of bytes uploaded.
+
+        Raises:
+            Exception: If any part fails to upload. The multipart upload is aborted first.
+        """
+        response = self.s3_client.create_multipart_upload(
+            Bucket=self.bucket_name, Key=self.key
+        )
+        self.upload_id = response["UploadId"]
+        logger.info(f"Started multipart upload {self.upload_id} for {self.key}")
+
+        parts: List[Dict] = []
+        in_flight: Set[Future] = set()
+        total_bytes = 0
+        part_number = 0
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+                while True:
+                    # Apply backpressure so only max_concurrency parts are held in memory
+                    if len(in_flight) >= self.max_concurrency:
+                        done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                        parts.extend(future.result() for future in done)
+
+                    data = file_object.read(self.part_size)
+                    if not data:
+                        break
+
+                    part_number += 1
+                    total_bytes += len(data)
+                    in_flight.add(executor.submit(self._upload_part, part_number, data))
+
+                parts.extend(future.result() for future in in_flight)
+
+            if not parts:
+                # S3 won't complete a multipart upload without parts, store an empty object instead
+                self._abort()
+                self.s3_client.put_object(Bucket=self.bucket_name, Key=self.key, Body=b"")
+                return 0
+
+            self.s3_client.complete_multipart_upload(
+                Bucket=self.bucket_name,
+                Key=self.key,
+                UploadId=self.upload_id,
+                MultipartUpload={
+                    "Parts": sorted(parts, key=lambda part: part["PartNumber"])
+                },
+            )
+        except BaseException:
+            self._abort()
+            raise
+
+        logger.info(
+            f"Completed multipart upload of {self.key}: {part_number} parts, {total_bytes} bytes"
+        )
+        return total_bytes
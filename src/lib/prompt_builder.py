@@ -0,0 +1,294 @@
+import math
+import os
+import re
+import threading
+from typing import List, Optional, TypedDict
+
+from pixelum_core.loggers.loggers import get_module_logger
+
+from src.lib.transcript_chunker import SPEAKER_TURN_PATTERN, estimate_tokens, split_turns
+
+try:
+    import tiktoken
+except ImportError:  # pragma: no cover - tiktoken is optional
+    tiktoken = None
+
+logger = get_module_logger()
+
+# Starting estimate of the completion tokens of one ticket, replaced by observed lengths
+TICKET_TOKENS_ESTIMATE = int(os.getenv("TICKET_TOKENS_ESTIMATE", 150))
+# Extra room per ticket so a longer than average ticket doesn't truncate the json
+TICKET_TOKENS_HEADROOM = float(os.getenv("TICKET_TOKENS_HEADROOM", 1.3))
+RESPONSE_OVERHEAD_TOKENS = 32
+MIN_COMPLETION_TOKENS = int(os.getenv("MIN_COMPLETION_TOKENS", 256))
+# The most completion tokens the ticket generation model can produce
+MAX_OUTPUT_TOKENS = int(os.getenv("OPENAI_MAX_OUTPUT_TOKENS", 4096))
+
+TIMESTAMP_PATTERN = re.compile(
+    r"^\s*\d+\s*$"  # WebVTT/SRT cue numbers
+    r"|\d{1,2}:\d{2}(?::\d{2})?(?:[.,]\d+)?\s*-->\s*\d{1,2}:\d{2}(?::\d{2})?(?:[.,]\d+)?"
+    r"|\[\d{1,2}:\d{2}(?::\d{2})?(?:[.,]\d+)?\]"
+    r"|\(\d{1,2}:\d{2}(?::\d{2})?\)",
+    re.MULTILINE,
+)
+FILLER_WORD_PATTERN = re.compile(
+    r"\b(?:u+m+|u+h+|e+r+m+|h+m+|mm-hmm|uh-huh|you know|i mean|sort of|kind of)\b[,.]?\s*",
+    re.IGNORECASE,
+)
+FILLER_TURN_PATTERN = re.compile(
+    r"^(?:\W*(?:hi|hello|hey|thanks|thank you|bye|goodbye|see you|ok|okay|yeah|yep|yes|no|right|sure|"
+    r"cool|great|awesome|perfect|sounds good|got it|mm-hmm|uh-huh|good morning|good afternoon|"
+    r"can you hear me|you're on mute|you are on mute|sorry|go ahead|one sec|one second)\W*)+$",
+    re.IGNORECASE,
+)
+
+
+class TokenAccounting(TypedDict):
+    """The token accounting of a single generation."""
+    transcript_tokens: int
+    trimmed_tokens: int
+    prompt_tokens: int
+    max_tokens: int
+    completion_tokens: Optional[int]
+    total_tokens: Optional[int]
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    """
+    Count the tokens of a piece of text, with the model's tokenizer when
+    tiktoken is installed and an estimate otherwise.
+
+    Args:
+        text (str): The text to count.
+        model (str, optional): The model the text is sent to.
+
+    Returns:
+        int: The number of tokens.
+    """
+    if tiktoken is not None:
+        try:
+            encoding = tiktoken.encoding_for_model(model) if model else tiktoken.get_encoding("cl100k_base")
+        except KeyError:
+            encoding = tiktoken.get_encoding("cl100k_base")
+        return len(encoding.encode(text))
+
+    return estimate_tokens(text)
+
+
+class TicketLengthTracker:
+    """
+    Tracks the average number of completion tokens a generated ticket takes,
+    as an exponential moving average over the generations of the process.
+    """
+
+    def __init__(self, initial: float = TICKET_TOKENS_ESTIMATE, smoothing: float = 0.2) -> None:
+        self._average = float(initial)
+        self._smoothing = smoothing
+        self._lock = threading.Lock()
+
+    @property
+    def average(self) -> float:
+        return self._average
+
+    def observe(self, completion_tokens: Optional[int], ticket_count: int) -> None:
+        """
+        Record the completion tokens of a generation.
+
+        Args:
+            completion_tokens (int, optional): The completion tokens reported by the model.
+            ticket_count (int): The number of tickets in the completion.
+        """
+        if not completion_tokens or ticket_count <= 0:
+            return
+
+        per_ticket = max(0, completion_tokens - RESPONSE_OVERHEAD_TOKENS) / ticket_count
+        with self._lock:
+            self._average += self._smoothing * (per_ticket - self._average)
+
+
+ticket_length_tracker = TicketLengthTracker()
+
+
+def max_tickets_per_completion(max_output_tokens: int = MAX_OUTPUT_TOKENS) -> int:
+    """
+    Get the most tickets a single completion can hold at the observed ticket length.
+
+    Args:
+        max_output_tokens (int, optional): The most completion tokens the model can produce.
+
+    Returns:
+        int: The number of tickets.
+    """
+    per_ticket = ticket_length_tracker.average * TICKET_TOKENS_HEADROOM
+    return max(1, math.floor((max_output_tokens - RESPONSE_OVERHEAD_TOKENS) / per_ticket))
+
+
+def size_max_tokens(number_of_tickets: int, max_output_tokens: int) -> int:
+    """
+    Size the completion budget for a number of tickets from the observed ticket length.
+
+    Args:
+        number_of_tickets (int): The number of tickets to generate.
+        max_output_tokens (int): The most completion tokens the model can produce.
+
+    Returns:
+        int: The max_tokens to request.
+
+    Raises:
+        ValueError: If the tickets don't fit in the model's output tokens. The
+            completion would be truncated, so the generation is refused instead.
+    """
+    wanted = math.ceil(
+        number_of_tickets * ticket_length_tracker.average * TICKET_TOKENS_HEADROOM
+    ) + RESPONSE_OVERHEAD_TOKENS
+
+    if wanted > max_output_tokens:
+        raise ValueError(
+            f"{number_of_tickets} tickets need about {wanted} tokens, more than the model's "
+            f"{max_output_tokens} output tokens. Generate at most "
+            f"{max_tickets_per_completion(max_output_tokens)} tickets at a time."
+        )
+
+    return max(MIN_COMPLETION_TOKENS, wanted)
+
+
+def _strip_timestamps(transcript: str) -> str:
+    transcript = TIMESTAMP_PATTERN.sub("", transcript)
+    return "\n".join(line.strip() for line in transcript.splitlines() if line.strip())
+
+
+def _strip_filler_words(transcript: str) -> str:
+    return "\n".join(
+        re.sub(r"[ \t]{2,}", " ", FILLER_WORD_PATTERN.sub("", line)).strip()
+        for line in transcript.splitlines()
+    )
+
+
+def _drop_filler_turns(transcript: str) -> str:
+    turns: List[str] = []
+    for turn in split_turns(transcript):
+        label = SPEAKER_TURN_PATTERN.match(turn)
+        content = turn[label.end():] if label else turn
+        if content.strip() and FILLER_TURN_PATTERN.match(content.strip()):
+            continue
+        turns.append(turn)
+    return "\n".join(turns)
+
+
+# Ordered from the least to the most lossy
+COMPRESSION_STEPS = (_strip_timestamps, _strip_filler_words, _drop_filler_turns)
+
+
+def compress_transcript(transcript: str, token_budget: int, model: Optional[str] = None) -> str:
+    """
+    Remove filler from a transcript, one step at a time, until it fits the token budget.
+    Timestamps go first, then filler words, then turns that are only greetings or
+    acknowledgements. A transcript that still doesn't fit is returned as compressed
+    as it gets.
+
+    Args:
+        transcript (str): The transcript to compress.
+        token_budget (int): The tokens the transcript should fit in.
+        model (str, optional): The model the transcript is sent to.
+
+    Returns:
+        str: The compressed transcript.
+    """
+    for step in COMPRESSION_STEPS:
+        if count_tokens(transcript, model) <= token_budget:
+            break
+        transcript = step(transcript)
+
+    return transcript
+
+
+class TicketPrompt:
+    """
+    A transcript fitted to a token budget, with the max_tokens to request for
+    its tickets and the token accounting of the generation.
+    """
+
+    def __init__(
+        self,
+        transcript: str,
+        number_of_tickets: int,
+        model: str,
+        instruction_tokens: int,
+        context_tokens: int,
+        max_output_tokens: int,
+        token_budget: Optional[int] = None,
+    ) -> None:
+        self.number_of_tickets = number_of_tickets
+        self.model = model
+        self.max_tokens = size_max_tokens(number_of_tickets, max_output_tokens)
+
+        transcript_tokens = count_tokens(transcript, model)
+        budget = context_tokens - self.max_tokens - instruction_tokens
+        if token_budget is not None:
+            budget = min(budget, token_budget)
+
+        self.transcript = (
+            compress_transcript(transcript, budget, model) if transcript_tokens > budget else transcript
+        )
+        prompt_tokens = count_tokens(self.transcript, model)
+        self.fitted_tokens = prompt_tokens
+        self._usage_recorded = False
+
+        self.accounting: TokenAccounting = {
+            "transcript_tokens": transcript_tokens,
+            "trimmed_tokens": transcript_tokens - prompt_tokens,
+            "prompt_tokens": prompt_tokens + instruction_tokens,
+            "max_tokens": self.max_tokens,
+            "completion_tokens": None,
+            "total_tokens": None,
+        }
+
+    def record_usage(self, usage, ticket_count: int) -> TokenAccounting:
+        """
+        Add the usage reported for a completion of this generation to the accounting
+        and feed the ticket length tracker. A chunked generation records the usage of
+        every completion it makes.
+
+        Args:
+            usage (CompletionUsage): The usage of the completion.
+            ticket_count (int): The number of tickets in the completion.
+
+        Returns:
+            TokenAccounting: The token accounting of the generation.
+        """
+        if usage is None:
+            return self.accounting
+
+        if not self._usage_recorded:
+            # Replace the estimates with the first reported usage
+            self.accounting["prompt_tokens"] = 0
+            self.accounting["completion_tokens"] = 0
+            self.accounting["total_tokens"] = 0
+            self._usage_recorded = True
+
+        self.accounting["prompt_tokens"] += usage.prompt_tokens
+        self.accounting["completion_tokens"] += usage.completion_tokens
+        self.accounting["total_tokens"] += usage.total_tokens
+        ticket_length_tracker.observe(usage.completion_tokens, ticket_count)
+
+        return self.accounting
+
+    def record_completion_text(self, text: str, ticket_count: int) -> TokenAccounting:
+        """
+        Count the tokens of a completion whose usage isn't reported, such as a
+        streamed one, and add them to the accounting. The prompt tokens stay an estimate.
+
+        Args:
+            text (str): The text of the completion.
+            ticket_count (int): The number of tickets in the completion.
+
+        Returns:
+            TokenAccounting: The token accounting of the generation.
+        """
+        completion_tokens = count_tokens(text, self.model)
+
+        self.accounting["completion_tokens"] = (self.accounting["completion_tokens"] or 0) + completion_tokens
+        self.accounting["total_tokens"] = self.accounting["prompt_tokens"] + self.accounting["completion_tokens"]
+        ticket_length_tracker.observe(completion_tokens, ticket_count)
+
+        return self.accounting
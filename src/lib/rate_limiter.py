@@ -0,0 +1,290 @@
+import asyncio
+import math
+import os
+import random
+import threading
+import time
+from typing import Any, Dict, Mapping, Optional
+
+from pixelum_core.errors.custom_exceptions import BaseException as PixelumException
+from pixelum_core.errors.custom_exceptions import _400RangeHTTPError
+from pixelum_core.loggers.loggers import get_module_logger
+
+logger = get_module_logger()
+
+OPENAI_REQUESTS_PER_MINUTE = int(os.getenv("OPENAI_REQUESTS_PER_MINUTE", 500))
+OPENAI_TOKENS_PER_MINUTE = int(os.getenv("OPENAI_TOKENS_PER_MINUTE", 300000))
+OPENAI_MAX_QUEUE_DEPTH = int(os.getenv("OPENAI_MAX_QUEUE_DEPTH", 100))
+OPENAI_MAX_QUEUE_WAIT = float(os.getenv("OPENAI_MAX_QUEUE_WAIT", 30.0))
+OPENAI_BACKOFF_BASE = float(os.getenv("OPENAI_BACKOFF_BASE", 1.0))
+OPENAI_BACKOFF_MAX = float(os.getenv("OPENAI_BACKOFF_MAX", 30.0))
+
+
+class RateLimitExceededError(_400RangeHTTPError, PixelumException):
+    """HTTP 429 Error, raised when a request is shed because a rate limit budget or queue is exhausted."""
+    status_code = 429
+
+    def __init__(self, message: Optional[str] = None, retry_after: Optional[float] = None, **kwargs: Any):
+        super().__init__(message, retry_after=retry_after, **kwargs)
+        self.retry_after = retry_after
+
+    def generate_http_response(self):
+        """Return the 429 response, telling the client when to retry."""
+        response = super().generate_http_response()
+        if self.retry_after is not None:
+            response["headers"]["Retry-After"] = str(math.ceil(self.retry_after))
+        return response
+
+
+def backoff_delay(
+    attempt: int,
+    base: float = OPENAI_BACKOFF_BASE,
+    cap: float = OPENAI_BACKOFF_MAX,
+    retry_after: Optional[float] = None,
+) -> float:
+    """
+    Get the delay before retrying a failed request, using exponential backoff with full jitter.
+
+    Args:
+        attempt (int): The number of the retry, starting at 0.
+        base (float, optional): The delay of the first retry.
+        cap (float, optional): The maximum delay.
+        retry_after (float, optional): The delay the server asked for. Used as a lower bound.
+
+    Returns:
+        float: The seconds to wait before retrying.
+    """
+    delay = random.uniform(0, min(cap, base * 2 ** attempt))
+
+    if retry_after is not None:
+        delay = max(delay, min(retry_after, cap))
+
+    return delay
+
+
+def _parse_reset(value: Optional[str]) -> Optional[float]:
+    """Parse a reset header such as `6m0s`, `1s` or `120ms` into seconds."""
+    if not value:
+        return None
+
+    seconds = 0.0
+    number = ""
+    index = 0
+    try:
+        while index < len(value):
+            char = value[index]
+            if char.isdigit() or char == ".":
+                number += char
+            elif value.startswith("ms", index):
+                seconds += float(number) / 1000
+                number = ""
+                index += 1
+            elif char in "hms":
+                seconds += float(number) * {"h": 3600, "m": 60, "s": 1}[char]
+                number = ""
+            index += 1
+        if number:
+            seconds += float(number)
+    except ValueError:
+        return None
+
+    return seconds
+
+
+class _Bucket:
+    """A token bucket that refills continuously up to `capacity` over a minute."""
+
+    def __init__(self, capacity: float) -> None:
+        self.capacity = float(capacity)
+        self.level = float(capacity)
+        self.updated = time.monotonic()
+
+    @property
+    def rate(self) -> float:
+        return self.capacity / 60.0
+
+    def refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_for(self, amount: float) -> float:
+        """Seconds until `amount` would be available, assuming the bucket was refilled."""
+        deficit = amount - self.level
+        return deficit / self.rate if deficit > 0 else 0.0
+
+
+class RateLimitGovernor:
+    """
+    A process-wide governor for the requests-per-minute and tokens-per-minute
+    budgets of an API.
+
+    Callers reserve a request and its estimated tokens before sending it. The
+    reservation is taken from the buckets immediately, possibly driving them
+    negative, and the caller waits until the buckets would have refilled. When
+    the queue of waiting callers is full, or the wait would exceed `max_wait`,
+    the request is shed with a RateLimitExceededError instead.
+
+    The buckets are kept in line with the server's view through the
+    `x-ratelimit-*` response headers and paused entirely after a 429.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int = OPENAI_REQUESTS_PER_MINUTE,
+        tokens_per_minute: int = OPENAI_TOKENS_PER_MINUTE,
+        max_queue_depth: int = OPENAI_MAX_QUEUE_DEPTH,
+        max_wait: float = OPENAI_MAX_QUEUE_WAIT,
+    ) -> None:
+        self._requests = _Bucket(requests_per_minute)
+        self._tokens = _Bucket(tokens_per_minute)
+        self.max_queue_depth = max_queue_depth
+        self.max_wait = max_wait
+        self._blocked_until = 0.0
+        self._queue_depth = 0
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = {
+            "requests": 0,
+            "throttled": 0,
+            "throttled_seconds": 0.0,
+            "shed": 0,
+            "rate_limited": 0,
+            "retries": 0,
+        }
+
+    def _reserve(self, tokens: int) -> float:
+        """Reserve a request and its tokens, returning the seconds to wait before sending it."""
+        with self._lock:
+            now = time.monotonic()
+            self._requests.refill(now)
+            self._tokens.refill(now)
+
+            wait = max(
+                self._blocked_until - now,
+                self._requests.wait_for(1),
+                self._tokens.wait_for(tokens),
+            )
+
+            if wait > 0 and (wait > self.max_wait or self._queue_depth >= self.max_queue_depth):
+                self._counters["shed"] += 1
+                raise RateLimitExceededError(
+                    message="The OpenAI rate limit budget is exhausted. Please try again later.",
+                    retry_after=round(wait, 2),
+                    queue_depth=self._queue_depth,
+                )
+
+            self._requests.level -= 1
+            self._tokens.level -= tokens
+            self._counters["requests"] += 1
+
+            if wait > 0:
+                self._queue_depth += 1
+                self._counters["throttled"] += 1
+                self._counters["throttled_seconds"] += wait
+
+            return wait
+
+    def _dequeue(self) -> None:
+        with self._lock:
+            self._queue_depth -= 1
+
+    async def acquire_async(self, tokens: int) -> None:
+        """
+        Wait without blocking the event loop until a request using `tokens` tokens fits in the budget.
+
+        Args:
+            tokens (int): The estimated tokens of the request, prompt and completion.
+
+        Raises:
+            RateLimitExceededError: If the request was shed.
+        """
+        wait = self._reserve(tokens)
+        if wait > 0:
+            logger.debug(f"Throttling OpenAI request for {wait:.2f}s")
+            try:
+                await asyncio.sleep(wait)
+            finally:
+                self._dequeue()
+
+    def record_usage(self, estimated_tokens: int, actual_tokens: Optional[int]) -> None:
+        """
+        Give back, or take, the difference between the estimated and the actual tokens of a request.
+
+        Args:
+            estimated_tokens (int): The tokens reserved for the request.
+            actual_tokens (int, optional): The tokens reported in the response usage.
+        """
+        if actual_tokens is None:
+            return
+
+        with self._lock:
+            self._tokens.level = min(
+                self._tokens.capacity, self._tokens.level + estimated_tokens - actual_tokens
+            )
+
+    def update_from_headers(self, headers: Mapping[str, str]) -> None:
+        """
+        Align the buckets with the rate limit headers of a response.
+
+        Args:
+            headers (Mapping[str, str]): The response headers.
+        """
+        def _number(name: str) -> Optional[float]:
+            try:
+                return float(headers[name])
+            except (KeyError, TypeError, ValueError):
+                return None
+
+        with self._lock:
+            for bucket, kind in ((self._requests, "requests"), (self._tokens, "tokens")):
+                limit = _number(f"x-ratelimit-limit-{kind}")
+                remaining = _number(f"x-ratelimit-remaining-{kind}")
+
+                if limit:
+                    bucket.capacity = limit
+                if remaining is not None:
+                    bucket.level = min(bucket.level, remaining)
+
+    def penalize(self, retry_after: Optional[float] = None, headers: Optional[Mapping[str, str]] = None) -> None:
+        """
+        Pause every request after the server answered with a 429.
+
+        Args:
+            retry_after (float, optional): The seconds the server asked to wait.
+            headers (Mapping[str, str], optional): The response headers, used for the reset time
+                when no retry_after is given.
+        """
+        if retry_after is None and headers is not None:
+            resets = [
+                _parse_reset(headers.get(f"x-ratelimit-reset-{kind}"))
+                for kind in ("requests", "tokens")
+            ]
+            resets = [reset for reset in resets if reset is not None]
+            retry_after = max(resets) if resets else None
+
+        with self._lock:
+            self._counters["rate_limited"] += 1
+            if retry_after:
+                self._blocked_until = max(self._blocked_until, time.monotonic() + retry_after)
+
+    def record_retry(self) -> None:
+        """Count a retried request."""
+        with self._lock:
+            self._counters["retries"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the governor counters, current queue depth and remaining budgets."""
+        with self._lock:
+            now = time.monotonic()
+            self._requests.refill(now)
+            self._tokens.refill(now)
+            return {
+                **self._counters,
+                "throttled_seconds": round(self._counters["throttled_seconds"], 3),
+                "queue_depth": self._queue_depth,
+                "requests_remaining": int(self._requests.level),
+                "tokens_remaining": int(self._tokens.level),
+                "blocked_for": round(max(0.0, self._blocked_until - now), 3),
+            }
+
+
+openai_governor = RateLimitGovernor()
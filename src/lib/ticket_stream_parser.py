@@ -0,0 +1,194 @@
+import json
+import re
+from typing import Any, List, Optional, Set
+
+# Characters dropped from keys so "Estimation Points", "estimation_points" and
+# "estimationPoints" all become "estimationpoints"
+KEY_SEPARATOR_PATTERN = re.compile(r"[\s_-]")
+CLOSERS = {"}": "{", "]": "["}
+# Keys that mark an object as a ticket rather than a container of tickets
+TICKET_KEYS = {"subject", "body", "title", "description"}
+
+
+def normalize_key(key: str) -> str:
+    """
+    Normalize a key of the model output to lowercase without separators.
+
+    Args:
+        key (str): The key as generated by the model.
+
+    Returns:
+        str: The normalized key.
+    """
+    return KEY_SEPARATOR_PATTERN.sub("", key.lower())
+
+
+def _find_tickets(value: Any) -> List[dict]:
+    """Find the ticket objects in a parsed document, however the model nested them."""
+    if isinstance(value, list):
+        return [ticket for item in value for ticket in _find_tickets(item)]
+
+    if not isinstance(value, dict):
+        return []
+
+    if TICKET_KEYS & value.keys():
+        return [value]
+
+    if "tickets" in value:
+        return _find_tickets(value["tickets"])
+
+    return [ticket for item in value.values() for ticket in _find_tickets(item)]
+
+
+class TicketStreamParser:
+    """
+    Incrementally extracts ticket objects from a streamed JSON completion.
+
+    The model answers with either `{"tickets": [{...}, {...}]}` or a bare
+    `[{...}, {...}]`. Text is fed in as it arrives and every ticket object is
+    returned as soon as its closing brace has been received, without waiting
+    for the rest of the document.
+
+    The parser is tolerant of the ways the output goes wrong. A truncated
+    completion still yields every ticket that was completed, trailing commas
+    and raw control characters in strings are accepted, and a stray closing
+    bracket doesn't derail the ones that follow. Keys are normalized while the
+    objects are decoded, so the tickets need no second pass.
+    """
+
+    def __init__(self, normalize_keys: bool = True) -> None:
+        self._buffer: List[str] = []
+        self._position = 0
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escaped = False
+        self._ticket_start: int = -1
+        self._last_significant: Optional[str] = None
+        self._last_comma: int = -1
+        # Positions of trailing commas, left out when an object is decoded
+        self._skipped: Set[int] = set()
+        self._emitted = 0
+        self._decoder = json.JSONDecoder(
+            object_pairs_hook=self._build_object if normalize_keys else None,
+            strict=False,
+        )
+
+    @staticmethod
+    def _build_object(pairs: List[tuple]) -> dict:
+        return {normalize_key(key): value for key, value in pairs}
+
+    @property
+    def is_complete(self) -> bool:
+        """Whether every container opened in the completion was closed."""
+        return self._position > 0 and not self._stack and not self._in_string
+
+    def _is_ticket_parent(self) -> bool:
+        # Tickets are the objects inside the top level list, or the list under the root object
+        return bool(self._stack) and self._stack[-1] == "[" and len(self._stack) <= 2
+
+    def _text(self, start: int, end: int) -> str:
+        if not self._skipped:
+            return "".join(self._buffer[start:end])
+        return "".join(
+            char for index, char in enumerate(self._buffer[start:end], start)
+            if index not in self._skipped
+        )
+
+    def _decode(self, raw: str) -> Any:
+        try:
+            return self._decoder.decode(raw)
+        except ValueError:
+            return None
+
+    def _close(self, char: str) -> bool:
+        """Pop the container a closing bracket closes. Returns whether it closed anything."""
+        opener = CLOSERS[char]
+        if opener not in self._stack:
+            # A stray closing bracket, ignore it
+            return False
+
+        # Close anything the model left open inside the container
+        while self._stack.pop() != opener:
+            pass
+        return True
+
+    def feed(self, text: str) -> List[dict]:
+        """
+        Feed the next piece of the completion.
+
+        Args:
+            text (str): The text received since the last call.
+
+        Returns:
+            List[dict]: The tickets completed by this piece of text.
+        """
+        tickets: List[dict] = []
+
+        for char in text:
+            self._buffer.append(char)
+            index = self._position
+            self._position += 1
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+
+            if char.isspace():
+                continue
+
+            if char == '"':
+                self._in_string = True
+            elif char in "{[":
+                if char == "{" and self._is_ticket_parent():
+                    self._ticket_start = index
+                self._stack.append(char)
+            elif char in "}]":
+                if self._last_significant == ",":
+                    self._skipped.add(self._last_comma)
+
+                if self._close(char) and char == "}" and self._ticket_start >= 0 and self._is_ticket_parent():
+                    ticket = self._decode(self._text(self._ticket_start, index + 1))
+                    self._ticket_start = -1
+                    if isinstance(ticket, dict):
+                        tickets.append(ticket)
+            elif char == ",":
+                self._last_comma = index
+
+            self._last_significant = char
+
+        self._emitted += len(tickets)
+        return tickets
+
+    def finish(self) -> List[dict]:
+        """
+        Recover the tickets of a completion that wasn't a list of ticket objects,
+        such as a single ticket or tickets keyed by name. Call once the whole
+        completion has been fed.
+
+        Returns:
+            List[dict]: The tickets the streaming pass couldn't return.
+        """
+        if self._emitted or not self.is_complete:
+            return []
+
+        document = self._decode(self._text(0, self._position).strip().strip("`").removeprefix("json"))
+        return _find_tickets(document)
+
+
+def parse_tickets(text: str) -> List[dict]:
+    """
+    Parse every ticket that can be recovered from a completion.
+
+    Args:
+        text (str): The content of the completion.
+
+    Returns:
+        List[dict]: The tickets with normalized keys.
+    """
+    parser = TicketStreamParser()
+    return parser.feed(text) + parser.finish()
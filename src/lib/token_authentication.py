@@ -1,13 +1,16 @@
+import hashlib
 import os
 from typing import Optional, Dict
 from logging import getLogger
 
 import jwt
-from auth0.authentication import GetToken
-from auth0.management import Auth0
 from fastapi import Depends, HTTPException
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from starlette.status import HTTP_401_UNAUTHORIZED
+
+from src.lib.cache import TTLCache
+from src.lib.jwks_cache import SigningKeyCache
+from src.models.auth0 import auth0_client
 from src.models.dynamo.user_metadata import UserMetadataModel
 
 from src.services.user import syncronous_get_user_metadata
@@ -21,6 +24,12 @@ domain = os.getenv("AUTH0_DOMAIN", "test")
 audience = os.getenv("AUTH0_AUDIENCE", "test")
 jwks_url = f"https://{domain}/.well-known/jwks.json"
 jwks_client = jwt.PyJWKClient(jwks_url, timeout=15)
+signing_key_cache = SigningKeyCache(jwks_client)
+
+# Verified JWT payloads keyed by the token hash, each kept until the token expires
+verified_token_cache = TTLCache(
+    max_size=int(os.getenv("VERIFIED_TOKEN_CACHE_SIZE", 1024)), ttl=3600
+)
 
 unauthorized_error = HTTPException(
     status_code=HTTP_401_UNAUTHORIZED,
@@ -45,44 +54,37 @@ class TokenAuthentication:
         """
         try:
             logger.debug("Getting signing key...")
-            signing_key = jwks_client.get_signing_key_from_jwt(token)
+            signing_key = signing_key_cache.get_signing_key(token)
             logger.debug("Signing key retrieved successfully")
-            return signing_key.key
+            return signing_key
         except Exception as e:
             logger.error(e)
             raise unauthorized_error
 
-    def require_any_user(
-        self, token: Optional[HTTPAuthorizationCredentials] = Depends(token_auth_scheme)
-    ) -> UserMetadataModel:
+    def verify_token(self, token: str) -> dict:
         """
-        Require the request to contain a valid Bearer token.
+        Decode the JWT and verify it using the JWKs from Auth0.
 
         Args:
-            token (Optional[HTTPAuthorizationCredentials], optional): The Bearer token. Defaults to Depends(token_auth_scheme).
+            token (str): The JWT token.
 
         Returns:
-            UserMetadataModel: The user metadata.
+            dict: The decoded JWT payload.
 
         Raises:
-            HTTPException: If the request does not contain a valid Bearer token or if the JWT cannot be decoded or verified.
+            HTTPException: If the JWT cannot be decoded or verified.
         """
-        logger.debug("Checking for valid Bearer token...")
-        if not token:
-            raise unauthorized_error
-
-        # Decode the JWT and verify it using the JWKs from Auth0
         try:
             logger.debug("Getting signing key...")
             logger.debug(
                 f"domain: {domain} and audience: {audience} and jwks_url: {jwks_url}"
             )
-            key = self.get_signing_key_from_jwt(token.credentials)
+            key = self.get_signing_key_from_jwt(token)
             logger.debug("Signing key retrieved successfully")
 
             logger.debug("Decoding JWT...")
             payload = jwt.decode(
-                token.credentials,
+                token,
                 key,
                 algorithms=["RS256"],
                 audience=audience,
@@ -93,6 +95,35 @@ class TokenAuthentication:
             logger.error(e)
             raise unauthorized_error
 
+        return payload
+
+    def require_any_user(
+        self, token: Optional[HTTPAuthorizationCredentials] = Depends(token_auth_scheme)
+    ) -> UserMetadataModel:
+        """
+        Require the request to contain a valid Bearer token.
+
+        Args:
+            token (Optional[HTTPAuthorizationCredentials], optional): The Bearer token. Defaults to Depends(token_auth_scheme).
+
+        Returns:
+            UserMetadataModel: The user metadata.
+
+        Raises:
+            HTTPException: If the request does not contain a valid Bearer token or if the JWT cannot be decoded or verified.
+        """
+        logger.debug("Checking for valid Bearer token...")
+        if not token:
+            raise unauthorized_error
+
+        # Tokens that were already verified are reused until they expire
+        token_hash: str = hashlib.sha256(token.credentials.encode()).hexdigest()
+        payload: Optional[dict] = verified_token_cache.get(token_hash)
+
+        if payload is None:
+            payload = self.verify_token(token.credentials)
+            verified_token_cache.set(token_hash, payload, expires_at=payload.get("exp"))
+
         logger.debug("Checking JWT claims...")
         if payload.get("azp") != os.getenv("AUTH0_CLIENT_ID"):
             raise unauthorized_error
@@ -129,14 +160,10 @@ class TokenAuthentication:
 
     def get_user_details(self, user_id: str) -> dict:
         """Get the user details from the auth0."""
-        get_token = GetToken(
-            domain,
-            client_id=os.getenv("AUTH0_MGMT_CLIENT_ID", "test"),
-            client_secret=os.getenv("AUTH0_MGMT_CLIENT_SECRET", "test"),
-        )
+        # Share the process-wide management token instead of exchanging a new one
+        api_token = auth0_client.token_cache.get_token()
 
-        token = get_token.client_credentials("https://{}/api/v2/".format(domain))
-        api_token = token["access_token"]
+        from auth0.management import Auth0
 
         auth0 = Auth0(domain, api_token)
 
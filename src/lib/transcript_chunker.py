@@ -0,0 +1,131 @@
+import os
+import re
+from typing import List
+
+# Rough number of characters per token for English text
+CHARS_PER_TOKEN = 4
+TRANSCRIPT_CHUNK_TOKENS = int(os.getenv("TRANSCRIPT_CHUNK_TOKENS", 6000))
+TRANSCRIPT_CHUNK_OVERLAP_TOKENS = int(os.getenv("TRANSCRIPT_CHUNK_OVERLAP_TOKENS", 400))
+
+# A new turn starts with an optional [timestamp] followed by "Speaker Name:"
+SPEAKER_TURN_PATTERN = re.compile(r"^\s*(\[[^\]]*\]\s*)?[A-Z][\w .'()-]{0,40}:\s")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens in a piece of text.
+
+    Args:
+        text (str): The text to estimate.
+
+    Returns:
+        int: The estimated number of tokens.
+    """
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def split_turns(transcript: str) -> List[str]:
+    """
+    Split a transcript into speaker turns. Lines that don't start a new turn
+    belong to the turn before them.
+
+    Args:
+        transcript (str): The transcript to split.
+
+    Returns:
+        List[str]: The turns of the transcript.
+    """
+    turns: List[str] = []
+    current: List[str] = []
+
+    for line in transcript.splitlines():
+        if SPEAKER_TURN_PATTERN.match(line) and current:
+            turns.append("\n".join(current))
+            current = []
+        current.append(line)
+
+    if current:
+        turns.append("\n".join(current))
+
+    return [turn for turn in turns if turn.strip()]
+
+
+def _split_long_turn(turn: str, max_tokens: int) -> List[str]:
+    """Split a single turn that is longer than a chunk on sentence boundaries."""
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    pieces: List[str] = []
+    current = ""
+
+    for sentence in re.split(r"(?<=[.!?])\s+", turn):
+        while len(sentence) > max_chars:
+            pieces.append(sentence[:max_chars])
+            sentence = sentence[max_chars:]
+
+        if current and len(current) + len(sentence) + 1 > max_chars:
+            pieces.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+
+    if current:
+        pieces.append(current)
+
+    return pieces
+
+
+def chunk_transcript(
+    transcript: str,
+    max_tokens: int = TRANSCRIPT_CHUNK_TOKENS,
+    overlap_tokens: int = TRANSCRIPT_CHUNK_OVERLAP_TOKENS,
+) -> List[str]:
+    """
+    Split a transcript into chunks on speaker turn boundaries.
+
+    Each chunk holds as many whole turns as fit in `max_tokens` and starts with
+    the last turns of the previous chunk, up to `overlap_tokens`, so a
+    discussion that straddles a boundary is seen in full by at least one chunk.
+
+    Args:
+        transcript (str): The transcript to chunk.
+        max_tokens (int, optional): The maximum estimated tokens per chunk.
+        overlap_tokens (int, optional): The estimated tokens carried over between chunks.
+
+    Returns:
+        List[str]: The transcript chunks.
+    """
+    turns: List[str] = []
+    for turn in split_turns(transcript):
+        if estimate_tokens(turn) > max_tokens:
+            turns.extend(_split_long_turn(turn, max_tokens))
+        else:
+            turns.append(turn)
+
+    chunks: List[str] = []
+    current: List[str] = []
+    current_tokens = 0
+
+    for turn in turns:
+        turn_tokens = estimate_tokens(turn)
+
+        if current and current_tokens + turn_tokens > max_tokens:
+            chunks.append("\n".join(current))
+
+            # Carry the tail of the chunk over as context for the next one
+            overlap: List[str] = []
+            overlap_size = 0
+            for previous in reversed(current):
+                previous_tokens = estimate_tokens(previous)
+                if overlap_size + previous_tokens > min(overlap_tokens, max_tokens - turn_tokens):
+                    break
+                overlap.insert(0, previous)
+                overlap_size += previous_tokens
+
+            current, current_tokens = overlap, overlap_size
+
+        current.append(turn)
+        current_tokens += turn_tokens
+
+    if current:
+        chunks.append("\n".join(current))
+
+    return chunks
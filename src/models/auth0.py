@@ -1,18 +1,118 @@
+import asyncio
 import os
-from typing import List, Optional
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
 import uuid
 
 import requests
-from auth0.authentication import GetToken
-from auth0.management import Auth0
 from pixelum_core.errors.custom_exceptions import ServerFailureError
 from pixelum_core.loggers.loggers import get_module_logger
 
+if TYPE_CHECKING:
+    from auth0.management import Auth0
+
 logger = get_module_logger()
 
+# Refresh the management token this many seconds before it expires
+AUTH0_TOKEN_REFRESH_MARGIN = float(os.getenv("AUTH0_TOKEN_REFRESH_MARGIN", 300))
+
+
+class ManagementTokenCache:
+    """
+    Process-wide cache of the Auth0 management API token.
+
+    The token is reused until `refresh_margin` seconds before it expires. Inside
+    that window a single caller refreshes it while everyone else keeps using the
+    still valid token, and once it has expired callers wait on the one refresh
+    in flight instead of each running their own client_credentials exchange.
+    """
+
+    def __init__(
+        self,
+        domain: str,
+        client_id: str,
+        client_secret: str,
+        refresh_margin: float = AUTH0_TOKEN_REFRESH_MARGIN,
+    ) -> None:
+        self.domain = domain
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.refresh_margin = refresh_margin
+
+        self._token: Optional[str] = None
+        self._expires_at: float = 0.0
+        self._lock = threading.Lock()
+        # The counters have their own lock, _lock is held for the whole of an exchange
+        self._counters_lock = threading.Lock()
+        self._counters: Dict[str, int] = {"hits": 0, "exchanges": 0}
+
+    def _count(self, counter: str) -> None:
+        with self._counters_lock:
+            self._counters[counter] += 1
+
+    def cached_token(self) -> Optional[str]:
+        """Get the cached token if it doesn't need refreshing yet."""
+        if self._token and time.time() < self._expires_at - self.refresh_margin:
+            self._count("hits")
+            return self._token
+        return None
+
+    def _exchange(self) -> None:
+        # The Auth0 SDK is only loaded by the requests that need a management token
+        from auth0.authentication import GetToken
+
+        get_token = GetToken(
+            self.domain,
+            self.client_id,
+            client_secret=self.client_secret,
+        )
+        token: dict = get_token.client_credentials(f"https://{self.domain}/api/v2/")
+
+        self._token = token.get("access_token")
+        self._expires_at = time.time() + token.get("expires_in", 86400)
+        self._count("exchanges")
+        logger.debug("Exchanged client credentials for a new Auth0 management token")
+
+    def get_token(self) -> Optional[str]:
+        """
+        Get the Auth0 management API token, exchanging client credentials only when
+        the cached token is missing or about to expire.
+        """
+        token = self.cached_token()
+        if token:
+            return token
+
+        if self._token and time.time() < self._expires_at:
+            # Still valid, so skip the wait if another caller is already refreshing
+            if not self._lock.acquire(blocking=False):
+                return self._token
+        else:
+            self._lock.acquire()
+
+        try:
+            token = self.cached_token()
+            if token:
+                return token
+
+            self._exchange()
+            return self._token
+        finally:
+            self._lock.release()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the token cache counters."""
+        with self._counters_lock:
+            counters = dict(self._counters)
+
+        return {
+            **counters,
+            "expires_in": round(self._expires_at - time.time()) if self._token else None,
+        }
+
 
 class Auth0Client:
-    client: Auth0
+    client: "Auth0"
     headers: dict = {
         "content-type": "application/json",
         "Authorization": "Bearer {}",
@@ -24,19 +124,19 @@ class Auth0Client:
         self.domain = domain
 
         self.base_url = f"https://{self.domain}/api/v2/"
+        self.token_cache = ManagementTokenCache(domain, client_id, client_secret)
 
     async def _get_token(self) -> Optional[str]:
         """
         Get the Auth0 management API token.
         """
-        get_token = GetToken(
-            self.domain,
-            self.client_id,
-            client_secret=self.client_secret,
-        )
+        token = self.token_cache.cached_token()
+        if token:
+            return token
+
+        # Exchanging credentials is a blocking request, keep it off the event loop
+        return await asyncio.to_thread(self.token_cache.get_token)
 
-        return get_token.client_credentials(self.base_url).get("access_token")
-    
     async def _url(self, path):
         logger.debug(f"URL path: {self.base_url}{path}")
         return f"{self.base_url}{path}"
@@ -45,12 +145,15 @@ class Auth0Client:
         logger.debug(f"[auth0] request path: {path}")
         logger.debug(f"[auth0] request body: {body}")
 
-        self.headers["Authorization"] = self.headers["Authorization"].format(await self._get_token())
+        request_headers = {
+            **self.headers,
+            "Authorization": self.headers["Authorization"].format(await self._get_token()),
+        }
 
         response = requests.request(
             method,
             await self._url(path),
-            headers=headers if headers else self.headers,
+            headers=headers if headers else request_headers,
             json=body,
             params=params,
         )
@@ -62,10 +165,12 @@ class Auth0Client:
 
         return response
 
-    async def get_client(self):
+    async def get_client(self) -> "Auth0":
         """
         Generate the Auth0 client.
         """
+        from auth0.management import Auth0
+
         return Auth0(self.domain, await self._get_token())
 
     async def create_user(self, email: str) -> dict:
@@ -0,0 +1,106 @@
+import asyncio
+import contextvars
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Type, TypeVar
+
+from pixelum_core.loggers.loggers import get_module_logger
+from pynamodb.expressions.condition import Condition
+
+logger = get_module_logger()
+
+# The most DynamoDB calls in flight per process, every model's connection pool is sized to match
+DYNAMODB_MAX_CONCURRENCY = int(os.getenv("DYNAMODB_MAX_CONCURRENCY", 32))
+# The endpoint every model talks to, set to point at DynamoDB Local when running outside of AWS
+DYNAMODB_HOST = os.getenv("DYNAMODB_HOST")
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+T = TypeVar("T")
+M = TypeVar("M", bound="AsyncModelMixin")
+
+
+def get_dynamodb_executor() -> ThreadPoolExecutor:
+    """Get the thread pool DynamoDB calls are offloaded to, created on first use."""
+    global _executor
+
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=DYNAMODB_MAX_CONCURRENCY, thread_name_prefix="dynamodb"
+        )
+    return _executor
+
+
+async def run_in_dynamodb_executor(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run a blocking PynamoDB call on the DynamoDB thread pool so a slow call never
+    stalls the event loop. The pool is separate from the default executor, which
+    bounds the calls in flight without starving S3 downloads and other
+    asyncio.to_thread work.
+
+    Args:
+        func (Callable): The blocking call.
+        *args: The positional arguments of the call.
+        **kwargs: The keyword arguments of the call.
+
+    Returns:
+        The result of the call.
+    """
+    loop = asyncio.get_running_loop()
+    # Keep the caller's context, like asyncio.to_thread does
+    call = functools.partial(contextvars.copy_context().run, func, *args, **kwargs)
+    return await loop.run_in_executor(get_dynamodb_executor(), call)
+
+
+class AsyncModelMixin:
+    """
+    Non-blocking versions of the PynamoDB model operations, offloaded to the
+    DynamoDB thread pool. Mix in ahead of BaseModel. Query results are read in
+    full on the pool, since iterating a PynamoDB result pages lazily.
+    """
+
+    @classmethod
+    async def get_async(
+        cls: Type[M], hash_key: Any, range_key: Optional[Any] = None, **kwargs: Any
+    ) -> M:
+        """
+        Get an item by its keys.
+
+        Raises:
+            DoesNotExist: If the item does not exist.
+        """
+        return await run_in_dynamodb_executor(cls.get, hash_key, range_key, **kwargs)
+
+    @classmethod
+    async def query_async(cls: Type[M], hash_key: Any, *args: Any, **kwargs: Any) -> List[M]:
+        """Query the items of a hash key, taking the arguments of Model.query."""
+        return await run_in_dynamodb_executor(lambda: list(cls.query(hash_key, *args, **kwargs)))
+
+    @classmethod
+    async def batch_get_async(cls: Type[M], keys: Iterable[Any], **kwargs: Any) -> List[M]:
+        """Get many items by their keys, in batches of 100."""
+        keys = list(keys)
+        return await run_in_dynamodb_executor(lambda: list(cls.batch_get(keys, **kwargs)))
+
+    @classmethod
+    async def batch_write_async(cls, items: Iterable[Any]) -> None:
+        """Save many items, in batches of 25."""
+        items = list(items)
+
+        def _write() -> None:
+            with cls.batch_write() as batch:
+                for item in items:
+                    batch.save(item)
+
+        await run_in_dynamodb_executor(_write)
+
+    async def update_async(
+        self, actions: List[Any], condition: Optional[Condition] = None, **kwargs: Any
+    ) -> Dict[str, Any]:
+        """Update attributes of the item, taking the arguments of Model.update."""
+        return await run_in_dynamodb_executor(self.update, actions, condition=condition, **kwargs)
+
+    async def refresh_async(self, consistent_read: bool = False) -> None:
+        """Reload the item from DynamoDB."""
+        await run_in_dynamodb_executor(self.refresh, consistent_read)
@@ -0,0 +1,191 @@
+import datetime
+import json
+import os
+from typing import Any, Dict, Optional
+
+from pixelum_core.dynamo.base_model import BaseModel
+from pixelum_core.loggers.loggers import get_module_logger
+from pynamodb.attributes import (
+    ListAttribute,
+    MapAttribute,
+    NumberAttribute,
+    UnicodeAttribute,
+)
+from pynamodb.expressions.condition import Condition
+
+from src.models.dynamo.async_model import (
+    DYNAMODB_HOST,
+    DYNAMODB_MAX_CONCURRENCY,
+    AsyncModelMixin,
+    run_in_dynamodb_executor,
+)
+
+logger = get_module_logger()
+
+
+class BatchGenerationItem(MapAttribute):
+    """
+    A single ticket generation of a batch.
+
+    fields:
+        custom_id (str): The ID of the request in the batch input file
+        document_id (str): The document the tickets are generated from
+        number_of_tickets (int): The number of tickets requested
+        platform (str): The platform the tickets are generated for
+        generation_datetime (str): The range key of the Ticket item the results are written to
+        status (str): pending, succeeded or failed
+        error (str): Why the generation failed
+    """
+
+    custom_id = UnicodeAttribute()
+    document_id = UnicodeAttribute()
+    number_of_tickets = NumberAttribute()
+    platform = UnicodeAttribute()
+    generation_datetime = UnicodeAttribute()
+    status = UnicodeAttribute(default="pending")
+    error = UnicodeAttribute(null=True)
+
+    async def to_serializable_dict(self) -> dict:
+        """
+        Convert the batch generation item to a serializable dictionary.
+        """
+        return {
+            "document_id": self.document_id,
+            "number_of_tickets": self.number_of_tickets,
+            "platform": self.platform,
+            "generation_datetime": self.generation_datetime,
+            "status": self.status,
+            "error": self.error,
+        }
+
+
+class BatchGenerationModel(AsyncModelMixin, BaseModel):
+    """
+    Model tracking a bulk ticket generation submitted to the OpenAI Batch API.
+
+    fields:
+        batch_generation_id (str, hash_key): The ID of the bulk generation
+        user_id (str): The user that submitted the bulk generation
+        owner_id (str): The account the generations are charged to, the parent account for sub-users
+        status (str): The status of the OpenAI batch, or failed if it couldn't be submitted
+        openai_batch_id (str): The ID of the OpenAI batch
+        input_file_id (str): The ID of the uploaded batch input file
+        output_file_id (str): The ID of the batch output file, once the batch has completed
+        error_file_id (str): The ID of the batch error file, when requests failed
+        items (List[BatchGenerationItem]): The ticket generations of the batch
+        succeeded_count (int): The number of generations written to the Ticket table
+        failed_count (int): The number of generations that failed
+        created_datetime (str): When the bulk generation was submitted
+        updated_datetime (str): When the status was last refreshed
+    """
+
+    class Meta:
+        table_name = "BatchGeneration"
+        region = os.getenv("AWS_REGION", "us-west-2")
+        host = DYNAMODB_HOST
+        max_pool_connections = DYNAMODB_MAX_CONCURRENCY
+
+    batch_generation_id = UnicodeAttribute(hash_key=True)
+    user_id = UnicodeAttribute()
+    owner_id = UnicodeAttribute(null=True)
+    status = UnicodeAttribute()
+    openai_batch_id = UnicodeAttribute(null=True)
+    input_file_id = UnicodeAttribute(null=True)
+    output_file_id = UnicodeAttribute(null=True)
+    error_file_id = UnicodeAttribute(null=True)
+    items = ListAttribute(of=BatchGenerationItem)
+    succeeded_count = NumberAttribute(default=0)
+    failed_count = NumberAttribute(default=0)
+    created_datetime = UnicodeAttribute()
+    updated_datetime = UnicodeAttribute()
+
+    # Statuses of the OpenAI batch after which it won't change anymore
+    FINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+    @classmethod
+    async def initialize(
+        cls,
+        batch_generation_id: str,
+        user_id: str,
+        owner_id: str,
+        items: list[Dict[str, Any]],
+    ) -> "BatchGenerationModel":
+        """
+        Initialize a new BatchGenerationModel instance.
+
+        Args:
+            batch_generation_id (str): The ID of the bulk generation.
+            user_id (str): The user ID.
+            owner_id (str): The ID of the account the generations are charged to.
+            items (list[Dict[str, Any]]): The ticket generations of the batch.
+
+        Returns:
+            BatchGenerationModel: The initialized BatchGenerationModel instance.
+        """
+        now = datetime.datetime.now().isoformat()
+
+        return BatchGenerationModel(
+            batch_generation_id=batch_generation_id,
+            user_id=user_id,
+            owner_id=owner_id,
+            status="created",
+            items=[BatchGenerationItem(**item) for item in items],
+            created_datetime=now,
+            updated_datetime=now,
+        )
+
+    @property
+    def is_final(self) -> bool:
+        """Whether the batch has finished and its results have been written."""
+        return self.status in self.FINAL_STATUSES
+
+    async def save(self, condition: Optional[Condition] = None) -> Dict[str, Any]:
+        """
+        Save the batch generation to DynamoDB.
+
+        Args:
+            condition (Optional[Condition]): The condition for saving the batch generation.
+
+        Returns:
+            Dict[str, Any]: The result of the save operation.
+        """
+        self.updated_datetime = datetime.datetime.now().isoformat()
+        return await run_in_dynamodb_executor(super().save, condition)
+
+    async def delete(self, condition: Optional[Condition] = None) -> Dict[str, Any]:
+        """
+        Delete the batch generation from DynamoDB.
+
+        Args:
+            condition (Optional[Condition]): The condition for deleting the batch generation.
+
+        Returns:
+            Dict[str, Any]: The result of the delete operation.
+        """
+        return await run_in_dynamodb_executor(super().delete, condition)
+
+    async def to_serializable_dict(self) -> dict:
+        """
+        Convert the batch generation model to a serializable dictionary.
+
+        Returns:
+            dict: The serializable dictionary representation of the batch generation model.
+        """
+        return {
+            "batch_generation_id": self.batch_generation_id,
+            "status": self.status,
+            "items": [await item.to_serializable_dict() for item in self.items or []],
+            "succeeded_count": self.succeeded_count,
+            "failed_count": self.failed_count,
+            "created_datetime": self.created_datetime,
+            "updated_datetime": self.updated_datetime,
+        }
+
+    async def to_json(self) -> str:
+        """
+        Convert the batch generation model to a JSON string.
+
+        Returns:
+            str: The JSON string representation of the batch generation model.
+        """
+        return json.dumps(await self.to_serializable_dict())
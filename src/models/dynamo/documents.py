@@ -8,10 +8,17 @@ from pixelum_core.loggers.loggers import get_module_logger
 from pynamodb.attributes import NumberAttribute, UnicodeAttribute
 from pynamodb.expressions.condition import Condition
 
+from src.models.dynamo.async_model import (
+    DYNAMODB_HOST,
+    DYNAMODB_MAX_CONCURRENCY,
+    AsyncModelMixin,
+    run_in_dynamodb_executor,
+)
+
 logger = get_module_logger()
 
 
-class DocumentsModel(BaseModel):
+class DocumentsModel(AsyncModelMixin, BaseModel):
     """
     Model for storing documents.
     """
@@ -19,6 +26,8 @@ class DocumentsModel(BaseModel):
     class Meta:
         table_name = "Document"
         region = os.getenv("AWS_REGION", "us-west-2")
+        host = DYNAMODB_HOST
+        max_pool_connections = DYNAMODB_MAX_CONCURRENCY
 
     user_id = UnicodeAttribute(hash_key=True)
     document_id = UnicodeAttribute(range_key=True)
@@ -68,7 +77,7 @@ class DocumentsModel(BaseModel):
         Returns:
             Dict[str, Any]: The saved document as a dictionary.
         """
-        return super().save(condition=condition, add_version_condition=True)
+        return await run_in_dynamodb_executor(super().save, condition=condition, add_version_condition=True)
 
     async def __eq__(self, other: Any) -> bool:
         """
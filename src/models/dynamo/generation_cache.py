@@ -0,0 +1,79 @@
+import datetime
+import os
+from typing import Any, Dict, Optional
+
+from pixelum_core.dynamo.base_model import BaseModel
+from pixelum_core.loggers.loggers import get_module_logger
+from pynamodb.attributes import NumberAttribute, TTLAttribute, UnicodeAttribute
+from pynamodb.expressions.condition import Condition
+
+from src.models.dynamo.async_model import DYNAMODB_HOST, DYNAMODB_MAX_CONCURRENCY, AsyncModelMixin
+
+logger = get_module_logger()
+
+
+class GenerationCacheModel(AsyncModelMixin, BaseModel):
+    """
+    Persistent tier of the generation result cache.
+
+    fields:
+        cache_key (str, hash_key): Hash of the prompt template version, transcript and generation parameters
+        tickets (str): The generated tickets as a JSON string
+        number_of_tickets (int): The number of tickets requested
+        platform (str): The platform the tickets were generated for
+        created_datetime (str): When the result was cached
+        expires_at (datetime): When the cached result expires, also used as the table TTL
+    """
+
+    class Meta:
+        table_name = "GenerationCache"
+        region = os.getenv("AWS_REGION", "us-west-2")
+        host = DYNAMODB_HOST
+        max_pool_connections = DYNAMODB_MAX_CONCURRENCY
+
+    cache_key = UnicodeAttribute(hash_key=True)
+    tickets = UnicodeAttribute()
+    number_of_tickets = NumberAttribute()
+    platform = UnicodeAttribute()
+    created_datetime = UnicodeAttribute()
+    expires_at = TTLAttribute()
+
+    @classmethod
+    def initialize(
+        cls,
+        cache_key: str,
+        tickets: str,
+        number_of_tickets: int,
+        platform: str,
+        ttl_seconds: int,
+    ) -> "GenerationCacheModel":
+        """
+        Initialize a new GenerationCacheModel instance.
+
+        Args:
+            cache_key (str): The hash identifying the generation.
+            tickets (str): The generated tickets as a JSON string.
+            number_of_tickets (int): The number of tickets requested.
+            platform (str): The platform the tickets were generated for.
+            ttl_seconds (int): How long the result is cached for.
+
+        Returns:
+            GenerationCacheModel: The initialized GenerationCacheModel instance.
+        """
+        return GenerationCacheModel(
+            cache_key=cache_key,
+            tickets=tickets,
+            number_of_tickets=number_of_tickets,
+            platform=platform,
+            created_datetime=datetime.datetime.now().isoformat(),
+            expires_at=datetime.timedelta(seconds=ttl_seconds),
+        )
+
+    @property
+    def is_expired(self) -> bool:
+        """Whether the cached result has expired but not been removed by the table TTL yet."""
+        return self.expires_at <= datetime.datetime.now(datetime.timezone.utc)
+
+    def save(self, condition: Optional[Condition] = None, **kwargs: Any) -> Dict[str, Any]:
+        """Save the cached result to DynamoDB."""
+        return super().save(condition, **kwargs)
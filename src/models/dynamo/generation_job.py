@@ -0,0 +1,158 @@
+import datetime
+import os
+from typing import Any, Dict, Optional
+
+from pixelum_core.dynamo.base_model import BaseModel
+from pixelum_core.loggers.loggers import get_module_logger
+from pynamodb.attributes import (
+    MapAttribute,
+    NumberAttribute,
+    TTLAttribute,
+    UnicodeAttribute,
+)
+from pynamodb.expressions.condition import Condition
+
+from src.models.dynamo.async_model import (
+    DYNAMODB_HOST,
+    DYNAMODB_MAX_CONCURRENCY,
+    AsyncModelMixin,
+    run_in_dynamodb_executor,
+)
+
+logger = get_module_logger()
+
+GENERATION_JOB_TTL = int(os.getenv("GENERATION_JOB_TTL", 7 * 24 * 60 * 60))
+
+
+class GenerationJobModel(AsyncModelMixin, BaseModel):
+    """
+    Model holding the status of a ticket generation. It shares its keys with the
+    Ticket item the generation writes, and is small enough that polling it is
+    much cheaper than reading the tickets.
+
+    fields:
+        document_id (str, hash_key): The document the tickets are generated from
+        generation_datetime (str, range_key): The datetime of the generation
+        user_id (str): The user that started the generation
+        owner_id (str): The account the generation belongs to, the parent account for sub-users
+        status (str): queued, running, succeeded or failed
+        number_of_tickets (int): The number of tickets requested
+        tickets_generated (int): The number of tickets written so far
+        token_usage (dict): The token accounting of the generation
+        error (str): Why the generation failed
+        version (int): Incremented on every change so pollers can tell what they have seen
+        created_datetime (str): When the generation was queued
+        updated_datetime (str): When the status last changed
+        expires_at (datetime): When the status is removed by the table TTL
+    """
+
+    class Meta:
+        table_name = "GenerationJob"
+        region = os.getenv("AWS_REGION", "us-west-2")
+        host = DYNAMODB_HOST
+        max_pool_connections = DYNAMODB_MAX_CONCURRENCY
+
+    document_id = UnicodeAttribute(hash_key=True)
+    generation_datetime = UnicodeAttribute(range_key=True)
+    user_id = UnicodeAttribute()
+    owner_id = UnicodeAttribute(null=True)
+    status = UnicodeAttribute()
+    number_of_tickets = NumberAttribute()
+    tickets_generated = NumberAttribute(default=0)
+    token_usage = MapAttribute(null=True)
+    error = UnicodeAttribute(null=True)
+    version = NumberAttribute(default=0)
+    created_datetime = UnicodeAttribute()
+    updated_datetime = UnicodeAttribute()
+    expires_at = TTLAttribute()
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    FINAL_STATUSES = (SUCCEEDED, FAILED)
+
+    @classmethod
+    async def initialize(
+        cls,
+        document_id: str,
+        generation_datetime: str,
+        user_id: str,
+        owner_id: str,
+        number_of_tickets: int,
+    ) -> "GenerationJobModel":
+        """
+        Initialize a new queued GenerationJobModel instance.
+
+        Args:
+            document_id (str): The document ID.
+            generation_datetime (str): The datetime of the generation.
+            user_id (str): The user ID.
+            owner_id (str): The ID of the account the generation belongs to.
+            number_of_tickets (int): The number of tickets requested.
+
+        Returns:
+            GenerationJobModel: The initialized GenerationJobModel instance.
+        """
+        now = datetime.datetime.now().isoformat()
+
+        return GenerationJobModel(
+            document_id=document_id,
+            generation_datetime=generation_datetime,
+            user_id=user_id,
+            owner_id=owner_id,
+            status=cls.QUEUED,
+            number_of_tickets=number_of_tickets,
+            created_datetime=now,
+            updated_datetime=now,
+            expires_at=datetime.timedelta(seconds=GENERATION_JOB_TTL),
+        )
+
+    @property
+    def is_final(self) -> bool:
+        """Whether the generation has finished, successfully or not."""
+        return self.status in self.FINAL_STATUSES
+
+    async def save(self, condition: Optional[Condition] = None) -> Dict[str, Any]:
+        """
+        Save the generation job to DynamoDB.
+
+        Args:
+            condition (Optional[Condition]): The condition for saving the generation job.
+
+        Returns:
+            Dict[str, Any]: The result of the save operation.
+        """
+        return await run_in_dynamodb_executor(super().save, condition)
+
+    async def delete(self, condition: Optional[Condition] = None) -> Dict[str, Any]:
+        """
+        Delete the generation job from DynamoDB.
+
+        Args:
+            condition (Optional[Condition]): The condition for deleting the generation job.
+
+        Returns:
+            Dict[str, Any]: The result of the delete operation.
+        """
+        return await run_in_dynamodb_executor(super().delete, condition)
+
+    async def to_serializable_dict(self) -> dict:
+        """
+        Convert the generation job model to a serializable dictionary.
+
+        Returns:
+            dict: The serializable dictionary representation of the generation job model.
+        """
+        return {
+            "document_id": self.document_id,
+            "generation_datetime": self.generation_datetime,
+            "status": self.status,
+            "number_of_tickets": self.number_of_tickets,
+            "tickets_generated": self.tickets_generated,
+            "token_usage": self.token_usage.as_dict() if self.token_usage else None,
+            "error": self.error,
+            "version": self.version,
+            "created_datetime": self.created_datetime,
+            "updated_datetime": self.updated_datetime,
+        }
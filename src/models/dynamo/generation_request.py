@@ -0,0 +1,112 @@
+import datetime
+import os
+from typing import Any, Dict, Optional
+
+from pixelum_core.dynamo.base_model import BaseModel
+from pixelum_core.loggers.loggers import get_module_logger
+from pynamodb.attributes import NumberAttribute, TTLAttribute, UnicodeAttribute
+from pynamodb.expressions.condition import Condition
+
+from src.models.dynamo.async_model import (
+    DYNAMODB_HOST,
+    DYNAMODB_MAX_CONCURRENCY,
+    AsyncModelMixin,
+    run_in_dynamodb_executor,
+)
+
+logger = get_module_logger()
+
+
+class GenerationRequestModel(AsyncModelMixin, BaseModel):
+    """
+    Model tracking in-flight ticket generations so identical requests made within
+    the dedupe window share one generation instead of invoking a new one.
+
+    fields:
+        request_key (str, hash_key): Hash of the document, generation parameters and transcript content
+        document_id (str): The document the tickets are generated from
+        user_id (str): The user that started the generation
+        number_of_tickets (int): The number of tickets requested
+        platform (str): The platform the tickets are generated for
+        generation_datetime (str): The datetime of the generation the request is coalesced into
+        expires_at (datetime): When the dedupe window closes, also used as the table TTL
+    """
+
+    class Meta:
+        table_name = "GenerationRequest"
+        region = os.getenv("AWS_REGION", "us-west-2")
+        host = DYNAMODB_HOST
+        max_pool_connections = DYNAMODB_MAX_CONCURRENCY
+
+    request_key = UnicodeAttribute(hash_key=True)
+    document_id = UnicodeAttribute()
+    user_id = UnicodeAttribute()
+    number_of_tickets = NumberAttribute()
+    platform = UnicodeAttribute()
+    generation_datetime = UnicodeAttribute()
+    expires_at = TTLAttribute()
+
+    @classmethod
+    async def initialize(
+        cls,
+        request_key: str,
+        document_id: str,
+        user_id: str,
+        number_of_tickets: int,
+        platform: str,
+        generation_datetime: str,
+        window_seconds: int,
+    ) -> "GenerationRequestModel":
+        """
+        Initialize a new GenerationRequestModel instance.
+
+        Args:
+            request_key (str): The hash identifying the request.
+            document_id (str): The document ID.
+            user_id (str): The user ID.
+            number_of_tickets (int): The number of tickets requested.
+            platform (str): The platform the tickets are generated for.
+            generation_datetime (str): The datetime of the generation.
+            window_seconds (int): How long identical requests are coalesced for.
+
+        Returns:
+            GenerationRequestModel: The initialized GenerationRequestModel instance.
+        """
+        return GenerationRequestModel(
+            request_key=request_key,
+            document_id=document_id,
+            user_id=user_id,
+            number_of_tickets=number_of_tickets,
+            platform=platform,
+            generation_datetime=generation_datetime,
+            expires_at=datetime.timedelta(seconds=window_seconds),
+        )
+
+    @property
+    def is_expired(self) -> bool:
+        """Whether the dedupe window of the request has closed."""
+        return self.expires_at <= datetime.datetime.now(datetime.timezone.utc)
+
+    async def save(self, condition: Optional[Condition] = None) -> Dict[str, Any]:
+        """
+        Save the generation request to DynamoDB.
+
+        Args:
+            condition (Optional[Condition]): The condition for saving the generation request.
+
+        Returns:
+            Dict[str, Any]: The result of the save operation.
+        """
+        return await run_in_dynamodb_executor(super().save, condition)
+
+    async def delete(self, condition: Optional[Condition] = None) -> Dict[str, Any]:
+        """
+        Delete the generation request from DynamoDB.
+
+        Args:
+            condition (Optional[Condition]): The condition for deleting the generation request.
+
+        Returns:
+            Dict[str, Any]: The result of the delete operation.
+        """
+        return await run_in_dynamodb_executor(super().delete, condition)
@@ -0,0 +1,148 @@
+import datetime
+import os
+import time
+import uuid
+from typing import Any, Dict, Optional
+
+from pixelum_core.dynamo.base_model import BaseModel
+from pixelum_core.loggers.loggers import get_module_logger
+from pynamodb.attributes import NumberAttribute, TTLAttribute, UnicodeAttribute
+from pynamodb.expressions.condition import Condition
+from pynamodb.indexes import AllProjection, GlobalSecondaryIndex
+
+from src.models.dynamo.async_model import (
+    DYNAMODB_HOST,
+    DYNAMODB_MAX_CONCURRENCY,
+    AsyncModelMixin,
+    run_in_dynamodb_executor,
+)
+
+logger = get_module_logger()
+
+# How long settled and reclaimed reservations are kept for auditing before the table TTL removes them
+QUOTA_RESERVATION_RETENTION = int(os.getenv("QUOTA_RESERVATION_RETENTION", 7 * 24 * 60 * 60))
+
+
+class QuotaReservationOwnerIndex(GlobalSecondaryIndex):
+    class Meta:
+        index_name = "owner-index"
+        projection = AllProjection()
+
+    owner_id = UnicodeAttribute(hash_key=True)
+    reserved_until = NumberAttribute(range_key=True)
+
+
+class QuotaReservationModel(AsyncModelMixin, BaseModel):
+    """
+    Model holding quota that has been taken from an account for work that hasn't
+    finished yet. A reservation is committed when the work succeeds and refunded
+    when it fails, and one left unsettled past reserved_until is refunded the next
+    time the account runs out of quota.
+
+    fields:
+        reservation_id (str, hash_key): The ID of the reservation
+        owner_id (str): The account the quota was taken from, the parent account for sub-users
+        user_id (str): The user the quota was reserved for
+        quota (str): The counter the quota was taken from, e.g. generations_count
+        amount (int): How much quota was taken
+        status (str): reserved, committed or refunded
+        reserved_until (int): Epoch seconds after which an unsettled reservation may be reclaimed
+        created_datetime (str): When the quota was reserved
+        settled_datetime (str): When the reservation was committed or refunded
+        document_id (str): The document of the generation the quota pays for, if any
+        generation_datetime (str): The datetime of the generation the quota pays for, if any
+        expires_at (datetime): When the reservation is removed by the table TTL
+    """
+
+    class Meta:
+        table_name = "QuotaReservation"
+        region = os.getenv("AWS_REGION", "us-west-2")
+        host = DYNAMODB_HOST
+        max_pool_connections = DYNAMODB_MAX_CONCURRENCY
+
+    reservation_id = UnicodeAttribute(hash_key=True)
+    owner_id = UnicodeAttribute()
+    user_id = UnicodeAttribute()
+    quota = UnicodeAttribute()
+    amount = NumberAttribute()
+    status = UnicodeAttribute()
+    reserved_until = NumberAttribute()
+    created_datetime = UnicodeAttribute()
+    settled_datetime = UnicodeAttribute(null=True)
+    document_id = UnicodeAttribute(null=True)
+    generation_datetime = UnicodeAttribute(null=True)
+    expires_at = TTLAttribute()
+
+    owner_index = QuotaReservationOwnerIndex()
+
+    RESERVED = "reserved"
+    COMMITTED = "committed"
+    REFUNDED = "refunded"
+
+    @classmethod
+    async def initialize(
+        cls,
+        owner_id: str,
+        user_id: str,
+        quota: str,
+        amount: int,
+        ttl: int,
+        document_id: Optional[str] = None,
+        generation_datetime: Optional[str] = None,
+    ) -> "QuotaReservationModel":
+        """
+        Initialize a new QuotaReservationModel instance.
+
+        Args:
+            owner_id (str): The ID of the account the quota is taken from.
+            user_id (str): The ID of the user the quota is reserved for.
+            quota (str): The counter the quota is taken from.
+            amount (int): How much quota is taken.
+            ttl (int): How many seconds the work has to settle the reservation.
+            document_id (Optional[str]): The document of the generation the quota pays for.
+            generation_datetime (Optional[str]): The datetime of the generation the quota pays for.
+
+        Returns:
+            QuotaReservationModel: The initialized QuotaReservationModel instance.
+        """
+        reserved_until = int(time.time()) + ttl
+
+        return QuotaReservationModel(
+            reservation_id=str(uuid.uuid4()),
+            owner_id=owner_id,
+            user_id=user_id,
+            quota=quota,
+            amount=amount,
+            status=cls.RESERVED,
+            reserved_until=reserved_until,
+            created_datetime=datetime.datetime.now().isoformat(),
+            document_id=document_id,
+            generation_datetime=generation_datetime,
+            expires_at=datetime.datetime.fromtimestamp(
+                reserved_until + QUOTA_RESERVATION_RETENTION, tz=datetime.timezone.utc
+            ),
+        )
+
+    async def save(self, condition: Optional[Condition] = None) -> Dict[str, Any]:
+        """
+        Save the quota reservation to DynamoDB.
+
+        Args:
+            condition (Optional[Condition]): The condition for saving the quota reservation.
+
+        Returns:
+            Dict[str, Any]: The result of the save operation.
+        """
+        return await run_in_dynamodb_executor(super().save, condition)
+
+    async def delete(self, condition: Optional[Condition] = None) -> Dict[str, Any]:
+        """
+        Delete the quota reservation from DynamoDB.
+
+        Args:
+            condition (Optional[Condition]): The condition for deleting the quota reservation.
+
+        Returns:
+            Dict[str, Any]: The result of the delete operation.
+        """
+        return await run_in_dynamodb_executor(super().delete, condition)
@@ -6,6 +6,7 @@ from typing import Any, Dict, Optional
 from pixelum_core.dynamo.base_model import BaseModel
 from pixelum_core.loggers.loggers import get_module_logger
 from pynamodb.attributes import (
+    BooleanAttribute,
     ListAttribute,
     MapAttribute,
     NumberAttribute,
@@ -13,6 +14,12 @@ from pynamodb.attributes import (
 )
 from pynamodb.expressions.condition import Condition
 
+from src.models.dynamo.async_model import (
+    DYNAMODB_HOST,
+    DYNAMODB_MAX_CONCURRENCY,
+    AsyncModelMixin,
+    run_in_dynamodb_executor,
+)
 
 logger = get_module_logger()
 
@@ -37,7 +44,7 @@ class Ticket(MapAttribute):
         }
 
 
-class SubTicket(BaseModel):
+class SubTicket(AsyncModelMixin, BaseModel):
     """
     Sub-ticket model used as an expansion of a higher level ticket. For example, the tech story to a story.
     """
@@ -45,6 +52,8 @@ class SubTicket(BaseModel):
     class Meta:
         table_name = "SubTicket"
         region = os.getenv("AWS_REGION", "us-west-2")
+        host = DYNAMODB_HOST
+        max_pool_connections = DYNAMODB_MAX_CONCURRENCY
 
     user_id = UnicodeAttribute(hash_key=True)
     sub_ticket_id = UnicodeAttribute(range_key=True)
@@ -82,7 +91,7 @@ class SubTicket(BaseModel):
         Returns:
             Dict[str, Any]: The result of the save operation.
         """
-        return super().save(condition)
+        return await run_in_dynamodb_executor(super().save, condition)
 
     async def delete(self, condition: Optional[Condition] = None) -> Dict[str, Any]:
         """
@@ -94,7 +103,7 @@ class SubTicket(BaseModel):
         Returns:
             Dict[str, Any]: The result of the delete operation.
         """
-        return super().delete(condition)
+        return await run_in_dynamodb_executor(super().delete, condition)
 
     async def __eq__(self, __value: object) -> bool:
         """
@@ -136,7 +145,7 @@ class SubTicket(BaseModel):
         return json.dumps(await self.to_serializable_dict())
 
 
-class Ticket(BaseModel):
+class Ticket(AsyncModelMixin, BaseModel):
     """
     Model for storing tickets.
     """
@@ -144,11 +153,15 @@ class Ticket(BaseModel):
     class Meta:
         table_name = "Ticket"
         region = os.getenv("AWS_REGION", "us-west-2")
+        host = DYNAMODB_HOST
+        max_pool_connections = DYNAMODB_MAX_CONCURRENCY
 
     document_id = UnicodeAttribute(hash_key=True)
     created_datetime = UnicodeAttribute(range_key=True)
     tickets = ListAttribute(of=Ticket)
     original_prompt = UnicodeAttribute()
+    # False while tickets are still being streamed in, None for generations written in one piece
+    is_complete = BooleanAttribute(null=True)
 
     @classmethod
     async def initialize(
@@ -186,7 +199,7 @@ class Ticket(BaseModel):
         Returns:
             Dict[str, Any]: The result of the save operation.
         """
-        return super().save(condition)
+        return await run_in_dynamodb_executor(super().save, condition)
 
     async def delete(self, condition: Optional[Condition] = None) -> Dict[str, Any]:
         """
@@ -198,7 +211,7 @@ class Ticket(BaseModel):
         Returns:
             Dict[str, Any]: The result of the delete operation.
         """
-        return super().delete(condition)
+        return await run_in_dynamodb_executor(super().delete, condition)
 
     async def __eq__(self, __value: object) -> bool:
         """
@@ -228,6 +241,7 @@ class Ticket(BaseModel):
                 else []
             ),
             "original_prompt": self.original_prompt,
+            "is_complete": self.is_complete is not False,
         }
 
     async def to_json(self) -> str:
@@ -11,11 +11,17 @@ from pynamodb.attributes import (
 )
 from pynamodb.expressions.condition import Condition
 
+from src.models.dynamo.async_model import (
+    DYNAMODB_HOST,
+    DYNAMODB_MAX_CONCURRENCY,
+    AsyncModelMixin,
+    run_in_dynamodb_executor,
+)
 
 logger = get_module_logger()
 
 
-class Transaction(BaseModel):
+class Transaction(AsyncModelMixin, BaseModel):
     """
     Represents a transaction in the system.
     """
@@ -23,6 +29,8 @@ class Transaction(BaseModel):
     class Meta:
         table_name = "Transaction"
         region = os.getenv("AWS_REGION", "us-west-2")
+        host = DYNAMODB_HOST
+        max_pool_connections = DYNAMODB_MAX_CONCURRENCY
 
     user_id = UnicodeAttribute(hash_key=True)
     transaction_id = UnicodeAttribute(range_key=True)
@@ -54,7 +62,7 @@ class Transaction(BaseModel):
         return transaction
 
     async def save(self, condition: Condition | None = None, *, add_version_condition: bool = True) -> Dict[str, Any]:
-        return super().save(condition, add_version_condition=add_version_condition)
+        return await run_in_dynamodb_executor(super().save, condition, add_version_condition=add_version_condition)
 
     async def __eq__(self, __value: object) -> bool:
         return super().__eq__(__value)
@@ -1,22 +1,52 @@
 import datetime
 import json
 import os
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from pixelum_core.errors.custom_exceptions import PlatformLinkError
 from pixelum_core.dynamo.base_model import BaseModel
 from pixelum_core.loggers.loggers import get_module_logger
 from pynamodb.attributes import ListAttribute, NumberAttribute, UnicodeAttribute
 from pynamodb.expressions.condition import Condition
+from pynamodb.indexes import GlobalSecondaryIndex, IncludeProjection
 
+from src.lib.cache import TTLCache
 from src.lib.enums import PlatformEnum
+from src.models.dynamo.async_model import (
+    DYNAMODB_HOST,
+    DYNAMODB_MAX_CONCURRENCY,
+    AsyncModelMixin,
+    run_in_dynamodb_executor,
+)
 from src.services.clients import PlatformClient
 
 
 logger = get_module_logger()
 
+# Writes only invalidate the cache of the container making them, so this bounds how long a
+# permission or quota change made elsewhere takes to be seen. Quota is always spent with
+# conditional updates, never from the cached balance.
+USER_METADATA_CACHE_TTL = float(os.getenv("USER_METADATA_CACHE_TTL", 5))
+USER_METADATA_CACHE_SIZE = int(os.getenv("USER_METADATA_CACHE_SIZE", 1024))
 
-class UserMetadataModel(BaseModel):
+# Serialized user metadata records keyed by user_id, invalidated on every write
+user_metadata_cache = TTLCache(max_size=USER_METADATA_CACHE_SIZE, ttl=USER_METADATA_CACHE_TTL)
+
+# The attributes of sub-users listed by team management, the only ones copied to the parent user index
+SUB_ACCOUNT_ATTRIBUTES = ["email", "name", "signup_method", "subscription_tier", "permissions"]
+
+
+class ParentUserIndex(GlobalSecondaryIndex):
+    """Sparse index of sub-users by their parent account, holding only what team management lists."""
+
+    class Meta:
+        index_name = "parent-user-index"
+        projection = IncludeProjection(SUB_ACCOUNT_ATTRIBUTES)
+
+    parent_user_id = UnicodeAttribute(hash_key=True)
+
+
+class UserMetadataModel(AsyncModelMixin, BaseModel):
     """Model representing a User and their metadata.
 
     fields:
@@ -36,6 +66,7 @@ class UserMetadataModel(BaseModel):
         file_uploads_count (int): Number of file uploads remaining
         renew_datetime (str): Datetime when the user's credentials need to be renewed
         subscription_tier (str): The user's subscription tier
+        version (int): Incremented by every save_changes, for optimistic locking
 
         name (str): Auth0 user store field
 
@@ -44,6 +75,8 @@ class UserMetadataModel(BaseModel):
     class Meta:
         table_name = "UserMetadata"
         region = os.getenv("AWS_REGION", "us-west-2")
+        host = DYNAMODB_HOST
+        max_pool_connections = DYNAMODB_MAX_CONCURRENCY
 
     user_id = UnicodeAttribute(hash_key=True)
     email = UnicodeAttribute(null=True)
@@ -65,10 +98,16 @@ class UserMetadataModel(BaseModel):
     file_uploads_count = NumberAttribute(null=True, default=3)
     renew_datetime = UnicodeAttribute(null=True)
     subscription_tier = UnicodeAttribute(null=True, default="free")
+    version = NumberAttribute(null=True)
 
     # Auth0 user store fields
     name = UnicodeAttribute(null=True)
 
+    parent_user_index = ParentUserIndex()
+
+    # The serialized attributes as last read from or written to DynamoDB, None for new records
+    _persisted_values: Optional[Dict[str, Any]] = None
+
     @classmethod
     async def initialize(
         cls,
@@ -175,6 +214,24 @@ class UserMetadataModel(BaseModel):
 
         return user_metadata
 
+    @classmethod
+    def get_cached(cls, user_id: str) -> "UserMetadataModel":
+        """Get a UserMetadataModel, served from the in-process cache when possible.
+
+        A fresh instance is returned on every call so callers can mutate it freely.
+
+        Raises:
+            UserMetadataModel.DoesNotExist: If the user does not exist.
+        """
+        raw_data: Optional[dict] = user_metadata_cache.get(user_id)
+
+        if raw_data is not None:
+            return cls.from_raw_data(raw_data)
+
+        user_metadata = cls.get(user_id)
+        user_metadata_cache.set(user_id, user_metadata.serialize())
+        return user_metadata
+
     async def find_subscription_tier(self) -> str:
         """Find the subscription tier of the user from the permissions."""
         for permission in self.permissions:
@@ -236,7 +293,7 @@ class UserMetadataModel(BaseModel):
             return None
 
         try:
-            return await UserMetadataModel.get(self.parent_user_id)
+            return await UserMetadataModel.get_async(self.parent_user_id)
         except UserMetadataModel.DoesNotExist:
             logger.info(f"Parent user with ID {self.parent_user_id} not found.")
             return None
@@ -263,23 +320,130 @@ class UserMetadataModel(BaseModel):
         return "free"
 
     async def get_sub_accounts(self) -> list:
-        """Get the sub accounts of the user."""
-        try:
-            users_iterator = await UserMetadataModel.query(
-                UserMetadataModel.parent_user_id == self.user_id
+        """Get the sub accounts of the user, with only the SUB_ACCOUNT_ATTRIBUTES loaded."""
+        return await run_in_dynamodb_executor(
+            lambda: list(UserMetadataModel.parent_user_index.query(self.user_id))
+        )
+
+    async def get_sub_accounts_page(
+        self, limit: int, last_evaluated_key: Optional[Dict[str, Any]] = None
+    ) -> Tuple[List["UserMetadataModel"], Optional[Dict[str, Any]]]:
+        """
+        Get a page of the sub accounts of the user from the parent user index, with
+        only the SUB_ACCOUNT_ATTRIBUTES loaded.
+
+        Args:
+            limit (int): The most sub accounts to return.
+            last_evaluated_key (Optional[Dict[str, Any]]): Where the previous page ended.
+
+        Returns:
+            Tuple[List[UserMetadataModel], Optional[Dict[str, Any]]]: The sub accounts and
+                where the page ended, None on the last page.
+        """
+
+        def _query() -> Tuple[List["UserMetadataModel"], Optional[Dict[str, Any]]]:
+            results = UserMetadataModel.parent_user_index.query(
+                self.user_id, limit=limit, last_evaluated_key=last_evaluated_key
             )
-        except UserMetadataModel.DoesNotExist:
-            return []
+            sub_accounts = list(results)
+            return sub_accounts, results.last_evaluated_key
 
-        return [user for user in users_iterator]
+        return await run_in_dynamodb_executor(_query)
+
+    @classmethod
+    def from_raw_data(cls, data: Dict[str, Any]) -> "UserMetadataModel":
+        """Build a UserMetadataModel from a DynamoDB item, remembering it as persisted."""
+        user_metadata = super().from_raw_data(data)
+        user_metadata._mark_persisted()
+        return user_metadata
+
+    def _mark_persisted(self) -> None:
+        self._persisted_values = self.serialize(null_check=False)
+
+    def get_changed_attributes(self) -> List[str]:
+        """Get the names of the attributes changed since the record was last read or written."""
+        current: Dict[str, Any] = self.serialize(null_check=False)
+        persisted: Dict[str, Any] = self._persisted_values or {}
+
+        return [
+            name
+            for name, attribute in self.get_attributes().items()
+            if not attribute.is_hash_key and current.get(attribute.attr_name) != persisted.get(attribute.attr_name)
+        ]
+
+    def _save_changes(
+        self, condition: Optional[Condition] = None, check_version: bool = False
+    ) -> Optional[Dict[str, Any]]:
+        changed: List[str] = self.get_changed_attributes()
+        if not changed:
+            return None
+
+        attributes = self.get_attributes()
+        actions: list = [UserMetadataModel.version.add(1)]
+        for name in changed:
+            if name == "version":
+                continue
+            value = getattr(self, name)
+            actions.append(attributes[name].remove() if value is None else attributes[name].set(value))
+
+        if check_version:
+            version_condition = (
+                UserMetadataModel.version.does_not_exist()
+                if self.version is None
+                else UserMetadataModel.version == self.version
+            )
+            condition = version_condition if condition is None else condition & version_condition
+
+        # The update reads the record back, so the instance is persisted afterwards
+        return self.update(actions, condition=condition)
+
+    async def save_changes(
+        self, condition: Optional[Condition] = None, check_version: bool = False
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Write only the attributes changed since the record was last read or written
+        in a single UpdateItem instead of putting the whole item. Attributes other
+        writers change concurrently, like the quota counters, are left alone. A
+        record that was never read is written in full, creating it.
+
+        Args:
+            condition (Optional[Condition]): The condition for updating the user metadata.
+            check_version (bool, optional): Only update if nobody has saved changes since the
+                record was read, raising UpdateError otherwise. Defaults to False.
+
+        Returns:
+            Optional[Dict[str, Any]]: The result of the update, None when nothing changed.
+        """
+        return await run_in_dynamodb_executor(self._save_changes, condition, check_version)
 
     async def save(self, condition: Optional[Condition] = None) -> Dict[str, Any]:
         """Save the user metadata to DynamoDB."""
-        return super().save(condition)
+        return await run_in_dynamodb_executor(self.synchronous_save, condition)
 
     def synchronous_save(self, condition: Optional[Condition] = None) -> Dict[str, Any]:
         """Save the user metadata to DynamoDB synchronously."""
-        return super().save(condition)
+        user_metadata_cache.invalidate(self.user_id)
+        response = super().save(condition)
+        self._mark_persisted()
+        return response
+
+    def update(self, actions: list, condition: Optional[Condition] = None, **kwargs: Any) -> Dict[str, Any]:
+        """Update attributes of the user metadata in DynamoDB."""
+        user_metadata_cache.invalidate(self.user_id)
+        response = super().update(actions, condition=condition, **kwargs)
+        self._mark_persisted()
+        return response
+
+    def refresh(self, consistent_read: bool = False, **kwargs: Any) -> None:
+        """Reload the user metadata from DynamoDB."""
+        super().refresh(consistent_read, **kwargs)
+        self._mark_persisted()
+        user_metadata_cache.set(self.user_id, self.serialize())
+
+    def delete(self, condition: Optional[Condition] = None, **kwargs: Any) -> Dict[str, Any]:
+        """Delete the user metadata from DynamoDB."""
+        user_metadata_cache.invalidate(self.user_id)
+        return super().delete(condition=condition, **kwargs)
 
     async def __eq__(self, other: Any) -> bool:
         """Check if two UserMetadataModels are equal."""
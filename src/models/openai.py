@@ -1,17 +1,48 @@
+import asyncio
+import json
 import os
-from typing import Optional
+from typing import Any, AsyncIterator, List, Optional
 
-from openai import OpenAI
-from openai.types.chat.chat_completion_message import ChatCompletionMessage
+import httpx
+from openai import (
+    APIConnectionError,
+    AsyncOpenAI,
+    InternalServerError,
+    RateLimitError,
+)
+from openai.types.chat.chat_completion import ChatCompletion
 
 from src.lib.enums import PlatformEnum
+from src.lib.prompt_builder import MAX_OUTPUT_TOKENS, TicketPrompt, count_tokens
+from src.lib.rate_limiter import backoff_delay, openai_governor
+from src.lib.transcript_chunker import estimate_tokens
 from pixelum_core.loggers.loggers import get_module_logger
 
 
 logger = get_module_logger()
 
+OPENAI_MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", 64))
+OPENAI_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("OPENAI_MAX_KEEPALIVE_CONNECTIONS", 32))
+OPENAI_TIMEOUT = float(os.getenv("OPENAI_TIMEOUT", 120.0))
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", 4))
+OPENAI_BATCH_COMPLETION_WINDOW = os.getenv("OPENAI_BATCH_COMPLETION_WINDOW", "24h")
 
-class OpenAIClient(OpenAI):
+# Errors worth retrying: 429s, 5xx responses, timeouts and dropped connections
+RETRYABLE_ERRORS = (RateLimitError, InternalServerError, APIConnectionError)
+
+
+class TicketPrompts:
+    """
+    Prompts and request parameters of the OpenAI client.
+    """
+
+    model: str = "gpt-4-turbo-preview"
+    # Default completion budget; ticket generations size their own with TicketPrompt
+    max_tokens: int = 1024
+    context_tokens: int = 128000
+    max_output_tokens: int = MAX_OUTPUT_TOKENS
+    # Bump whenever ticket_prompt_prefix changes so cached generations are not reused
+    prompt_template_version: str = "1"
     ticket_prompt_prefix: str = (
         "Given the following transcript from a video call, please create {n} {platform} tickets with the following information in json format:\n\n \
         1. Subject: [Enter the subject of the ticket here]\n \
@@ -20,53 +51,401 @@ class OpenAIClient(OpenAI):
         Please note that the subject should be a brief summary of the ticket, the body should contain a detailed description of the work to be done, and the estimation points should be an integer representing the estimated effort required to complete the ticket."
     )
 
-    def __init__(self):
-        """
-        Initialize the OpenAIClient object.
+    merge_prompt_prefix: str = (
+        "The following json list contains candidate {platform} tickets that were created from different parts of the same video call transcript. "
+        "Some of them describe the same work. Merge the duplicates and select the {n} most important tickets, "
+        "returning them in json format as a list under the key \"tickets\" where each ticket has a Subject, Body and Estimation Points. "
+        "Keep the details from every duplicate in the merged ticket body.\n\n"
+    )
 
-        It inherits from the OpenAI class and sets the API key.
-        """
-        super().__init__(api_key=os.getenv("OPENAI_API_KEY", "test"))
+    expand_prompt_prefix: str = (
+        "The following json object is a ticket from a video call transcript. Break the work it describes down into {n} "
+        "smaller sub tickets, returning them in json format as a list under the key \"tickets\" where each ticket has "
+        "a Subject, Body and Estimation Points. Together the sub tickets should cover all of the work of the ticket.\n\n"
+    )
 
-    def create_tickets(
+    def build_ticket_prompt(
         self,
         prompt: str,
         number_of_tickets: Optional[int] = 10,
-        platform: Optional[PlatformEnum] = PlatformEnum.JIRA,
-        **kwargs
-    ) -> ChatCompletionMessage:
+        token_budget: Optional[int] = None,
+    ) -> TicketPrompt:
         """
-        Create tickets based on the given prompt.
+        Fit a transcript to the model's token budget and size the completion for the tickets.
 
         Args:
-            prompt (str): The prompt for creating the tickets.
+            prompt (str): The transcript prompt.
             number_of_tickets (int, optional): The number of tickets to create. Defaults to 10.
-            platform (PlatformEnum, optional): The platform to create the tickets on. Defaults to PlatformEnum.JIRA.
+            token_budget (int, optional): A tighter budget for the transcript than the context window.
 
         Returns:
-            ChatCompletionMessage: The completion message containing the created tickets.
+            TicketPrompt: The fitted transcript, its max_tokens and token accounting.
         """
+        return TicketPrompt(
+            prompt,
+            number_of_tickets,
+            self.model,
+            instruction_tokens=count_tokens(self.ticket_prompt_prefix, self.model),
+            context_tokens=self.context_tokens,
+            max_output_tokens=self.max_output_tokens,
+            token_budget=token_budget,
+        )
+
+    def _ticket_params(
+        self,
+        prompt: str,
+        number_of_tickets: Optional[int] = 10,
+        platform: Optional[PlatformEnum] = PlatformEnum.JIRA,
+        **kwargs
+    ) -> dict:
         ticket_prompt: str = (
             self.ticket_prompt_prefix.format(
-                n=number_of_tickets, platform=platform.value
+                n=number_of_tickets, platform=getattr(platform, "value", platform)
             )
             + prompt  # noqa
         )
         params: dict = {
-            "model": "gpt-4-turbo-preview",
+            "model": self.model,
             "messages": [{"role": "user", "content": ticket_prompt}],
-            "max_tokens": 1024,
+            "max_tokens": self.max_tokens,
+            "response_format": {"type": "json_object"},
+        }
+        if kwargs:
+            params.update(kwargs)
+
+        return params
+
+    def _merge_params(
+        self,
+        candidate_tickets: List[dict],
+        number_of_tickets: Optional[int] = 10,
+        platform: Optional[PlatformEnum] = PlatformEnum.JIRA,
+        **kwargs
+    ) -> dict:
+        merge_prompt: str = (
+            self.merge_prompt_prefix.format(
+                n=number_of_tickets, platform=getattr(platform, "value", platform)
+            )
+            + json.dumps(candidate_tickets)  # noqa
+        )
+        params: dict = {
+            "model": self.model,
+            "messages": [{"role": "user", "content": merge_prompt}],
+            "max_tokens": self.max_tokens,
             "response_format": {"type": "json_object"},
         }
         if kwargs:
             params.update(kwargs)
 
-        response = self.chat.completions.create(**params)
+        return params
+
+    def _expand_params(
+        self,
+        ticket: dict,
+        number_of_tickets: Optional[int] = 3,
+        **kwargs
+    ) -> dict:
+        expand_prompt: str = self.expand_prompt_prefix.format(n=number_of_tickets) + json.dumps(ticket)
+        params: dict = {
+            "model": self.model,
+            "messages": [{"role": "user", "content": expand_prompt}],
+            "max_tokens": self.max_tokens,
+            "response_format": {"type": "json_object"},
+        }
+        if kwargs:
+            params.update(kwargs)
+
+        return params
+
+    def batch_request(
+        self,
+        custom_id: str,
+        ticket_prompt: TicketPrompt,
+        platform: Optional[PlatformEnum] = PlatformEnum.JIRA,
+    ) -> dict:
+        """
+        Build the line of a Batch API input file that creates tickets for a prompt.
+
+        Args:
+            custom_id (str): The ID the result of the request is returned under.
+            ticket_prompt (TicketPrompt): The fitted transcript and its max_tokens.
+            platform (PlatformEnum, optional): The platform to create the tickets on. Defaults to PlatformEnum.JIRA.
+
+        Returns:
+            dict: The batch request.
+        """
+        return {
+            "custom_id": custom_id,
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": self._ticket_params(
+                ticket_prompt.transcript,
+                ticket_prompt.number_of_tickets,
+                platform,
+                max_tokens=ticket_prompt.max_tokens,
+            ),
+        }
+
+    @staticmethod
+    def _estimate_request_tokens(params: dict) -> int:
+        # The rate limit counts the prompt plus the max_tokens the completion may use
+        prompt_tokens = sum(estimate_tokens(message["content"]) for message in params["messages"])
+        return prompt_tokens + params.get("max_tokens", 0)
+
+    @staticmethod
+    def _retry_delay(error: Exception, attempt: int) -> float:
+        """
+        Get the delay before retrying a failed request, or re-raise the error once
+        the retries are exhausted.
+        """
+        if attempt >= OPENAI_MAX_RETRIES:
+            raise error
+
+        retry_after: Optional[float] = None
+        response: Optional[httpx.Response] = getattr(error, "response", None)
+        if response is not None:
+            try:
+                retry_after = float(response.headers.get("retry-after"))
+            except (TypeError, ValueError):
+                retry_after = None
+
+        if isinstance(error, RateLimitError):
+            openai_governor.penalize(retry_after, response.headers if response is not None else None)
+
+        openai_governor.record_retry()
+        delay = backoff_delay(attempt, retry_after=retry_after)
+        logger.warning(f"OpenAI request failed with {error!r}, retrying in {delay:.2f}s")
+        return delay
+
+    @staticmethod
+    def _record_response(headers: httpx.Headers, response: Any, estimated_tokens: int) -> None:
+        openai_governor.update_from_headers(headers)
+        usage = getattr(response, "usage", None)
+        if usage is not None:
+            openai_governor.record_usage(estimated_tokens, usage.total_tokens)
+
+
+class AsyncOpenAIClient(TicketPrompts, AsyncOpenAI):
+    def __init__(self, http_client: Optional[httpx.AsyncClient] = None):
+        """
+        Initialize the AsyncOpenAIClient object.
+
+        It inherits from the AsyncOpenAI class and sets the API key.
+        """
+        # Retries are handled by _complete so they go through the rate limit governor
+        super().__init__(
+            api_key=os.getenv("OPENAI_API_KEY", "test"),
+            http_client=http_client,
+            max_retries=0,
+        )
+
+    async def _complete(self, params: dict) -> Any:
+        """
+        Send a chat completion within the rate limit budget, retrying 429s and
+        transient errors with jittered exponential backoff.
+        """
+        estimated_tokens = self._estimate_request_tokens(params)
+
+        for attempt in range(OPENAI_MAX_RETRIES + 1):
+            await openai_governor.acquire_async(estimated_tokens)
+            try:
+                raw_response = await self.chat.completions.with_raw_response.create(**params)
+            except RETRYABLE_ERRORS as e:
+                await asyncio.sleep(self._retry_delay(e, attempt))
+                continue
+
+            response = raw_response.parse()
+            self._record_response(raw_response.headers, response, estimated_tokens)
+            return response
+
+    async def create_tickets(
+        self,
+        prompt: str,
+        number_of_tickets: Optional[int] = 10,
+        platform: Optional[PlatformEnum] = PlatformEnum.JIRA,
+        **kwargs
+    ) -> ChatCompletion:
+        """
+        Create tickets based on the given prompt.
+
+        Args:
+            prompt (str): The prompt for creating the tickets.
+            number_of_tickets (int, optional): The number of tickets to create. Defaults to 10.
+            platform (PlatformEnum, optional): The platform to create the tickets on. Defaults to PlatformEnum.JIRA.
+
+        Returns:
+            ChatCompletion: The completion containing the created tickets and its usage.
+        """
+        params: dict = self._ticket_params(prompt, number_of_tickets, platform, **kwargs)
+
+        response = await self._complete(params)
+        logger.info(response)
+        return response
+
+    async def stream_tickets(
+        self,
+        prompt: str,
+        number_of_tickets: Optional[int] = 10,
+        platform: Optional[PlatformEnum] = PlatformEnum.JIRA,
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """
+        Create tickets based on the given prompt, streaming the completion as it is generated.
+
+        Args:
+            prompt (str): The prompt for creating the tickets.
+            number_of_tickets (int, optional): The number of tickets to create. Defaults to 10.
+            platform (PlatformEnum, optional): The platform to create the tickets on. Defaults to PlatformEnum.JIRA.
+
+        Yields:
+            str: The pieces of the completion content as they arrive.
+        """
+        params: dict = self._ticket_params(
+            prompt, number_of_tickets, platform, stream=True, **kwargs
+        )
+
+        async for chunk in await self._complete(params):
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+    async def merge_tickets(
+        self,
+        candidate_tickets: List[dict],
+        number_of_tickets: Optional[int] = 10,
+        platform: Optional[PlatformEnum] = PlatformEnum.JIRA,
+        **kwargs
+    ) -> ChatCompletion:
+        """
+        Merge and deduplicate candidate tickets generated from chunks of a transcript.
+
+        Args:
+            candidate_tickets (List[dict]): The candidate tickets of every chunk.
+            number_of_tickets (int, optional): The number of tickets to keep. Defaults to 10.
+            platform (PlatformEnum, optional): The platform the tickets are for. Defaults to PlatformEnum.JIRA.
+
+        Returns:
+            ChatCompletion: The completion containing the merged tickets and its usage.
+        """
+        params: dict = self._merge_params(candidate_tickets, number_of_tickets, platform, **kwargs)
+
+        response = await self._complete(params)
+        logger.info(response)
+        return response
+
+    async def expand_ticket(
+        self,
+        ticket: dict,
+        number_of_tickets: Optional[int] = 3,
+        **kwargs
+    ) -> ChatCompletion:
+        """
+        Break a ticket down into smaller sub tickets.
+
+        Args:
+            ticket (dict): The ticket to expand.
+            number_of_tickets (int, optional): The number of sub tickets to create. Defaults to 3.
+
+        Returns:
+            ChatCompletion: The completion containing the sub tickets and its usage.
+        """
+        params: dict = self._expand_params(ticket, number_of_tickets, **kwargs)
+
+        response = await self._complete(params)
         logger.info(response)
-        return response.choices[0].message
+        return response
+
+    async def create_batch(self, requests: List[dict], metadata: Optional[dict] = None) -> dict:
+        """
+        Upload the requests as a batch input file and submit them to the Batch API.
+
+        Args:
+            requests (List[dict]): The requests built with batch_request.
+            metadata (dict, optional): Metadata to attach to the batch.
+
+        Returns:
+            dict: The created batch.
+        """
+        input_file = "\n".join(json.dumps(request) for request in requests).encode("utf-8")
+        uploaded = await self.files.create(
+            file=("batch_input.jsonl", input_file),
+            purpose="batch",  # type: ignore[arg-type]
+        )
+
+        # The SDK version in use has no batches resource, call the endpoint directly
+        response: httpx.Response = await self.post(
+            "/batches",
+            body={
+                "input_file_id": uploaded.id,
+                "endpoint": "/v1/chat/completions",
+                "completion_window": OPENAI_BATCH_COMPLETION_WINDOW,
+                "metadata": metadata,
+            },
+            cast_to=httpx.Response,
+        )
+        return response.json()
+
+    async def retrieve_batch(self, batch_id: str) -> dict:
+        """
+        Get the status of a batch.
+
+        Args:
+            batch_id (str): The ID of the batch.
+
+        Returns:
+            dict: The batch.
+        """
+        response: httpx.Response = await self.get(f"/batches/{batch_id}", cast_to=httpx.Response)
+        return response.json()
+
+    async def read_file(self, file_id: str) -> str:
+        """
+        Get the content of a file, such as the output file of a batch.
+
+        Args:
+            file_id (str): The ID of the file.
+
+        Returns:
+            str: The content of the file.
+        """
+        content = await self.files.content(file_id)
+        return content.text
+
+
+_async_openai_client: Optional[AsyncOpenAIClient] = None
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=OPENAI_MAX_CONNECTIONS,
+        max_keepalive_connections=OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+    )
+
+
+def get_async_openai_client() -> AsyncOpenAIClient:
+    """
+    Get the process-wide AsyncOpenAIClient so concurrent generations on the event
+    loop share one connection pool.
+    """
+    global _async_openai_client
+
+    if _async_openai_client is None:
+        _async_openai_client = AsyncOpenAIClient(
+            http_client=httpx.AsyncClient(limits=_limits(), timeout=OPENAI_TIMEOUT)
+        )
+
+    return _async_openai_client
+
+
+async def close_openai_clients() -> None:
+    """Close the shared OpenAI client and release its connections."""
+    global _async_openai_client
+
+    if _async_openai_client is not None:
+        await _async_openai_client.close()
+        _async_openai_client = None
 
 
 # Example usage
-# client = OpenAIClient()
-# completion = client.create_tickets("Once upon a time")
+# client = get_async_openai_client()
+# completion = await client.create_tickets("Once upon a time")
 # print(completion)
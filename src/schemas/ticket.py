@@ -4,6 +4,8 @@ from pixelum_core.loggers.loggers import get_module_logger
 
 from pydantic import BaseModel, Field
 
+from src.lib.enums import PlatformEnum
+
 
 logger = get_module_logger()
 
@@ -46,3 +48,92 @@ class TicketParamsSchema(BaseModel):
     name: str
     description: Optional[str]
     estimate: Optional[int]
+
+
+class BulkTicketPushSchema(BaseModel):
+    """
+    Represents the schema for pushing many tickets to a platform at once. Either a
+    stored generation (document_id and generation_datetime) or a list of tickets
+    must be given.
+    """
+    document_id: Optional[str] = None
+    generation_datetime: Optional[str] = None
+    tickets: Optional[List[TicketParamsSchema]] = None
+
+
+class TicketPushResultSchema(BaseModel):
+    """
+    Represents the outcome of pushing a single ticket to a platform.
+    """
+    index: int
+    name: str
+    created: bool
+    ticket: Optional[dict] = None
+    error: Optional[str] = None
+
+
+class BulkTicketPushResultSchema(BaseModel):
+    """
+    Represents the outcome of a bulk ticket push.
+    """
+    results: List[TicketPushResultSchema]
+    created_count: int
+    failed_count: int
+
+
+class BatchGenerationJobSchema(BaseModel):
+    """
+    Represents a single ticket generation of a bulk generation.
+    """
+    document_id: str
+    number_of_tickets: int = Field(10, ge=1)
+    platform: PlatformEnum = PlatformEnum.JIRA
+
+
+class BatchGenerationSchema(BaseModel):
+    """
+    Represents the schema for generating tickets for many transcripts at once.
+    """
+    jobs: List[BatchGenerationJobSchema] = Field(..., min_length=1)
+
+
+class BatchGenerationItemSchema(BaseModel):
+    """
+    Represents the outcome of a single ticket generation of a bulk generation.
+    """
+    document_id: str
+    number_of_tickets: int
+    platform: str
+    generation_datetime: str
+    status: str
+    error: Optional[str] = None
+
+
+class BatchGenerationStatusSchema(BaseModel):
+    """
+    Represents the status of a bulk generation.
+    """
+    batch_generation_id: str
+    status: str
+    items: List[BatchGenerationItemSchema]
+    succeeded_count: int
+    failed_count: int
+    created_datetime: str
+    updated_datetime: str
+
+
+class GenerationJobStatusSchema(BaseModel):
+    """
+    Represents the status of a ticket generation. Pass version back as
+    since_version to wait for the next change.
+    """
+    document_id: str
+    generation_datetime: str
+    status: str
+    number_of_tickets: int
+    tickets_generated: int
+    token_usage: Optional[dict] = None
+    error: Optional[str] = None
+    version: int
+    created_datetime: str
+    updated_datetime: str
@@ -85,3 +85,24 @@ class PlatformParamsSchema(BaseModel):
     project_id: Optional[str]
     personal_access_token: Optional[str]
     workspace_id: Optional[str]
+
+
+class SubAccountSchema(BaseModel):
+    """
+    Represents a sub-user listed by team management.
+    """
+    user_id: str  # Sub-user's ID
+    email: Optional[str] = None  # Sub-user's email address
+    name: Optional[str] = None  # Sub-user's name
+    signup_method: Optional[str] = None  # Signup method
+    subscription_tier: Optional[str] = None  # Subscription tier
+    permissions: Optional[List[str]] = None  # Sub-user's permissions
+
+
+class SubAccountPageSchema(BaseModel):
+    """
+    Represents a page of sub-users. Pass cursor back to get the next page, it is
+    None on the last page.
+    """
+    sub_accounts: List[SubAccountSchema]
+    cursor: Optional[str] = None
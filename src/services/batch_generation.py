@@ -0,0 +1,302 @@
+import asyncio
+import datetime
+import json
+import os
+import time
+import uuid
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+from pixelum_core.errors.custom_exceptions import ResourceNotFoundException
+from pixelum_core.loggers.loggers import get_module_logger
+from pynamodb.exceptions import PutError
+
+from src.lib.prompt_builder import TicketPrompt
+from src.lib.ticket_stream_parser import parse_tickets
+from src.models.dynamo.batch_generation import BatchGenerationItem, BatchGenerationModel
+from src.models.dynamo.ticket import Ticket
+from src.services.file_management import download_file_from_s3
+from src.services.quota import GENERATIONS, refund_owner_quota
+from src.services.ticket import normalize_ticket
+
+if TYPE_CHECKING:
+    from src.models.openai import AsyncOpenAIClient
+
+logger = get_module_logger()
+
+BATCH_GENERATION_MAX_JOBS = int(os.getenv("BATCH_GENERATION_MAX_JOBS", 500))
+BATCH_GENERATION_DOWNLOAD_CONCURRENCY = int(os.getenv("BATCH_GENERATION_DOWNLOAD_CONCURRENCY", 16))
+BATCH_GENERATION_POLL_INTERVAL = float(os.getenv("BATCH_GENERATION_POLL_INTERVAL", 60.0))
+
+
+async def _download_transcripts(document_ids: List[str], required: bool = True) -> Dict[str, str]:
+    """
+    Download the transcripts of the documents concurrently. Missing transcripts
+    raise when required and are left empty otherwise.
+    """
+    semaphore = asyncio.Semaphore(BATCH_GENERATION_DOWNLOAD_CONCURRENCY)
+
+    async def _download(document_id: str) -> Optional[str]:
+        async with semaphore:
+            return await asyncio.to_thread(download_file_from_s3, document_id)
+
+    unique_ids: List[str] = list(dict.fromkeys(document_ids))
+    transcripts = await asyncio.gather(*(_download(document_id) for document_id in unique_ids))
+
+    missing: List[str] = [
+        document_id for document_id, transcript in zip(unique_ids, transcripts) if transcript is None
+    ]
+    if missing and required:
+        raise ResourceNotFoundException(
+            "Transcript not found.", resource_name="file", resource_identifier=", ".join(missing)
+        )
+
+    return {
+        document_id: transcript or "" for document_id, transcript in zip(unique_ids, transcripts)
+    }
+
+
+async def create_batch_generation(user_id: str, owner_id: str, jobs: List[dict]) -> BatchGenerationModel:
+    """
+    Package many ticket generations into one OpenAI batch and submit it. The
+    batch is processed off-peak at a lower price and its results are written to
+    the Ticket table by refresh_batch_generation once it has completed.
+
+    Point OPENAI_BASE_URL at benchmarks/openai_batch_stand_in.py to run bulk
+    generations without OpenAI.
+
+    Args:
+        user_id (str): The ID of the user submitting the generations.
+        owner_id (str): The ID of the account the generations are charged to.
+        jobs (List[dict]): The document_id, number_of_tickets and platform of each generation.
+
+    Returns:
+        BatchGenerationModel: The submitted bulk generation.
+    """
+    from src.models.openai import get_async_openai_client
+
+    client: AsyncOpenAIClient = get_async_openai_client()
+    batch_generation_id = str(uuid.uuid4())
+    transcripts: Dict[str, str] = await _download_transcripts([job["document_id"] for job in jobs])
+
+    items: List[dict] = []
+    requests: List[dict] = []
+    for index, job in enumerate(jobs):
+        platform: str = getattr(job["platform"], "value", job["platform"])
+        custom_id = f"{batch_generation_id}-{index}"
+        # Batched requests can't be chunked, only fitted to the context window
+        ticket_prompt: TicketPrompt = client.build_ticket_prompt(
+            transcripts[job["document_id"]], job["number_of_tickets"]
+        )
+
+        requests.append(client.batch_request(custom_id, ticket_prompt, platform))
+        items.append(
+            {
+                "custom_id": custom_id,
+                "document_id": job["document_id"],
+                "number_of_tickets": job["number_of_tickets"],
+                "platform": platform,
+                "generation_datetime": datetime.datetime.now().isoformat(),
+            }
+        )
+
+    batch_generation = await BatchGenerationModel.initialize(batch_generation_id, user_id, owner_id, items)
+    await batch_generation.save()
+
+    try:
+        batch: dict = await client.create_batch(
+            requests, metadata={"batch_generation_id": batch_generation_id}
+        )
+    except Exception as e:
+        logger.error(e)
+        batch_generation.status = "failed"
+        await batch_generation.save()
+        raise
+
+    batch_generation.openai_batch_id = batch["id"]
+    batch_generation.input_file_id = batch.get("input_file_id")
+    batch_generation.status = batch["status"]
+    await batch_generation.save()
+    logger.info(f"Submitted batch {batch['id']} with {len(requests)} ticket generations")
+
+    return batch_generation
+
+
+def _result_error(result: dict) -> str:
+    """Describe why a request of a batch failed."""
+    error = result.get("error") or (result.get("response") or {}).get("body", {}).get("error")
+    return json.dumps(error) if error else "The request failed."
+
+
+async def _fan_out_results(
+    client: "AsyncOpenAIClient", batch_generation: BatchGenerationModel
+) -> None:
+    """
+    Write the tickets of every successful request of a finished batch to the
+    Ticket table and record the outcome of each request.
+    """
+    items: Dict[str, BatchGenerationItem] = {
+        item.custom_id: item for item in batch_generation.items
+    }
+    results: List[dict] = []
+
+    for file_id in (batch_generation.output_file_id, batch_generation.error_file_id):
+        if file_id:
+            content: str = await client.read_file(file_id)
+            results.extend(json.loads(line) for line in content.splitlines() if line.strip())
+
+    transcripts: Dict[str, str] = await _download_transcripts(
+        [items[result["custom_id"]].document_id for result in results if result.get("custom_id") in items],
+        required=False,
+    )
+
+    ticket_items: List[Ticket] = []
+    for result in results:
+        item: Optional[BatchGenerationItem] = items.get(result.get("custom_id"))
+        if item is None:
+            continue
+
+        response: dict = result.get("response") or {}
+        if response.get("status_code") != 200:
+            item.status, item.error = "failed", _result_error(result)
+            continue
+
+        content = response["body"]["choices"][0]["message"]["content"] or ""
+        tickets: List[dict] = [
+            ticket for ticket in map(normalize_ticket, parse_tickets(content)) if ticket is not None
+        ]
+        if not tickets:
+            item.status, item.error = "failed", "No tickets could be parsed from the completion."
+            continue
+
+        ticket_items.append(
+            Ticket(
+                document_id=item.document_id,
+                created_datetime=item.generation_datetime,
+                tickets=tickets,
+                original_prompt=transcripts[item.document_id],
+            )
+        )
+        item.status = "succeeded"
+
+    for item in batch_generation.items:
+        if item.status == "pending":
+            item.status, item.error = "failed", f"The batch {batch_generation.status} before the request finished."
+
+    await Ticket.batch_write_async(ticket_items)
+
+    batch_generation.succeeded_count = sum(1 for item in batch_generation.items if item.status == "succeeded")
+    batch_generation.failed_count = len(batch_generation.items) - batch_generation.succeeded_count
+    logger.info(
+        f"Wrote {batch_generation.succeeded_count} of {len(batch_generation.items)} batch generations to the Ticket table"
+    )
+
+
+async def refresh_batch_generation(batch_generation: BatchGenerationModel) -> BatchGenerationModel:
+    """
+    Refresh the status of a bulk generation from its OpenAI batch, writing the
+    results to the Ticket table and refunding the generations that failed once
+    the batch has finished.
+
+    Args:
+        batch_generation (BatchGenerationModel): The bulk generation to refresh.
+
+    Returns:
+        BatchGenerationModel: The refreshed bulk generation.
+    """
+    if batch_generation.is_final or not batch_generation.openai_batch_id:
+        return batch_generation
+
+    from src.models.openai import get_async_openai_client
+
+    client: AsyncOpenAIClient = get_async_openai_client()
+    batch: dict = await client.retrieve_batch(batch_generation.openai_batch_id)
+
+    if batch["status"] == batch_generation.status:
+        return batch_generation
+
+    batch_generation.status = batch["status"]
+    batch_generation.output_file_id = batch.get("output_file_id")
+    batch_generation.error_file_id = batch.get("error_file_id")
+
+    # Expired and cancelled batches still return the requests that did finish
+    if not batch_generation.is_final:
+        await batch_generation.save()
+        return batch_generation
+
+    await _fan_out_results(client, batch_generation)
+
+    # Only the refresh that records the final status refunds the generations that failed
+    try:
+        await batch_generation.save(
+            condition=~BatchGenerationModel.status.is_in(*BatchGenerationModel.FINAL_STATUSES)
+        )
+    except PutError as e:
+        if e.cause_response_code != "ConditionalCheckFailedException":
+            raise
+        return await BatchGenerationModel.get_async(batch_generation.batch_generation_id, consistent_read=True)
+
+    if batch_generation.failed_count:
+        await refund_owner_quota(
+            batch_generation.owner_id or batch_generation.user_id, GENERATIONS, batch_generation.failed_count
+        )
+
+    return batch_generation
+
+
+async def get_batch_generation(batch_generation_id: str, user_id: str) -> BatchGenerationModel:
+    """
+    Get a bulk generation of a user with its status refreshed.
+
+    Args:
+        batch_generation_id (str): The ID of the bulk generation.
+        user_id (str): The ID of the user that submitted it.
+
+    Returns:
+        BatchGenerationModel: The bulk generation.
+
+    Raises:
+        ResourceNotFoundException: If the user has no bulk generation with the ID.
+    """
+    try:
+        batch_generation = await BatchGenerationModel.get_async(batch_generation_id)
+    except BatchGenerationModel.DoesNotExist:
+        batch_generation = None
+
+    if batch_generation is None or batch_generation.user_id != user_id:
+        raise ResourceNotFoundException(
+            "Batch generation not found.",
+            resource_name="BatchGeneration",
+            resource_identifier=batch_generation_id,
+        )
+
+    return await refresh_batch_generation(batch_generation)
+
+
+async def wait_for_batch_generation(
+    batch_generation_id: str,
+    user_id: str,
+    poll_interval: float = BATCH_GENERATION_POLL_INTERVAL,
+    timeout: Optional[float] = None,
+) -> BatchGenerationModel:
+    """
+    Poll a bulk generation until its batch has finished and its results are written.
+    Meant for backfill scripts, requests should use get_batch_generation.
+
+    Args:
+        batch_generation_id (str): The ID of the bulk generation.
+        user_id (str): The ID of the user that submitted it.
+        poll_interval (float, optional): Seconds between polls.
+        timeout (float, optional): Seconds to wait before returning an unfinished generation.
+
+    Returns:
+        BatchGenerationModel: The bulk generation.
+    """
+    deadline: Optional[float] = time.monotonic() + timeout if timeout is not None else None
+
+    while True:
+        batch_generation = await get_batch_generation(batch_generation_id, user_id)
+        if batch_generation.is_final or (deadline is not None and time.monotonic() >= deadline):
+            return batch_generation
+
+        logger.info(f"Batch generation {batch_generation_id} is {batch_generation.status}")
+        await asyncio.sleep(poll_interval)
@@ -1,8 +1,11 @@
+import asyncio
+from abc import ABC, abstractmethod
 from typing import List, Tuple
-import requests
-from requests.auth import HTTPBasicAuth
+
+import httpx
 
 from src.lib.enums import PlatformEnum
+from src.lib.http_transport import get_async_client
 
 from pixelum_core.loggers.loggers import get_module_logger
 
@@ -10,16 +13,21 @@ from pixelum_core.loggers.loggers import get_module_logger
 logger = get_module_logger()
 
 
-class BaseClient:
+class BaseClient(ABC):
     headers = {
         "Accept": "application/json",
         "Content-Type": "application/json"
     }
     auth = None
     base_url = "test"
+    http2 = False
+    # Maximum number of concurrent requests when creating stories in bulk
+    max_concurrency = 5
 
     def __init__(self, client: str = None) -> None:
         self.client = client
+        # Copy the class headers so per-user credentials never leak between instances
+        self.headers = dict(self.headers)
 
     async def _url(self, path):
         logger.debug(f"URL path: {self.base_url}{path}")
@@ -30,9 +38,12 @@ class BaseClient:
         logger.debug(f"[{self.client}] request body: {body}")
         logger.info(f"[{self.client}] sending request to {method} {path}...")
 
-        response = requests.request(
+        url = await self._url(path)
+        http_client = get_async_client(url, http2=self.http2)
+
+        response = await http_client.request(
             method,
-            await self._url(path),
+            url,
             headers=headers if headers else self.headers,
             json=body,
             auth=auth if auth else self.auth
@@ -45,15 +56,55 @@ class BaseClient:
 
         return response
 
+    @abstractmethod
+    async def create_story(self, ticket_params: dict) -> dict:
+        """
+        Create a single story on the platform.
+
+        Args:
+            ticket_params (dict): The parameters of the story to create.
+
+        Returns:
+            dict: The platform's response for the created story.
+        """
+
+    async def create_stories(self, tickets_params: List[dict]) -> List[dict]:
+        """
+        Create several stories concurrently, at most `max_concurrency` at a time.
+
+        Args:
+            tickets_params (List[dict]): The parameters of each story to create.
+
+        Returns:
+            List[dict]: One result per story in the same order, either {"ticket": <response>}
+                or {"error": <message>} if that story failed.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def _create(ticket_params: dict) -> dict:
+            async with semaphore:
+                try:
+                    return {"ticket": await self.create_story(ticket_params)}
+                except Exception as e:
+                    logger.error(f"[{self.client}] Error creating story {ticket_params.get('name')}: {e}")
+                    return {"error": str(e)}
+
+        return await asyncio.gather(*[_create(params) for params in tickets_params])
+
 
 class Jira(BaseClient):
+    http2 = True
+    max_concurrency = 2
+    # Jira accepts at most 50 issues per bulk create request
+    bulk_create_limit = 50
+
     def __init__(self, **kwargs):
         super().__init__()
         self.client = "Jira"
         self.base_url = f"{kwargs.get('server')}/rest/api/2/"
         self.email = kwargs.get("email")
         self.token_auth = kwargs.get("token_auth")
-        self.auth = HTTPBasicAuth(self.email, self.token_auth)
+        self.auth = httpx.BasicAuth(self.email, self.token_auth)
 
     async def get_projects(self) -> List[Tuple[str, str]]:
         """
@@ -72,10 +123,8 @@ class Jira(BaseClient):
             "projects": await self.get_projects()
         }
 
-    async def create_story(self, ticket_params: dict) -> dict:
-        """Create a ticket in Jira."""
-        logger.info(f"Creating ticket in Jira: {ticket_params}")
-        fields = {
+    async def _issue_fields(self, ticket_params: dict) -> dict:
+        return {
             "fields": {
                 "project": {
                     "key": "TRAN"
@@ -90,6 +139,11 @@ class Jira(BaseClient):
                 "description": str(ticket_params["description"]) if ticket_params["description"] else "",
             }
         }
+
+    async def create_story(self, ticket_params: dict) -> dict:
+        """Create a ticket in Jira."""
+        logger.info(f"Creating ticket in Jira: {ticket_params}")
+        fields = await self._issue_fields(ticket_params)
         try:
             resp = await self._request("POST", "issue", fields, auth=self.auth)
         except Exception as e:
@@ -98,6 +152,56 @@ class Jira(BaseClient):
 
         return resp.json()
 
+    async def create_stories(self, tickets_params: List[dict]) -> List[dict]:
+        """
+        Create several tickets in Jira using the bulk issue endpoint.
+
+        Jira reports failures per issue, so a partially failed batch still returns
+        the issues that were created.
+        """
+        batches = [
+            tickets_params[i:i + self.bulk_create_limit]
+            for i in range(0, len(tickets_params), self.bulk_create_limit)
+        ]
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def _create_batch(batch: List[dict]) -> List[dict]:
+            issue_updates = [await self._issue_fields(params) for params in batch]
+            async with semaphore:
+                try:
+                    resp = await self._request("POST", "issue/bulk", {"issueUpdates": issue_updates})
+                    resp_json: dict = resp.json()
+                except httpx.HTTPStatusError as e:
+                    # Jira answers 400 when every issue in the batch failed
+                    try:
+                        resp_json = e.response.json()
+                    except ValueError:
+                        return [{"error": str(e)} for _ in batch]
+                except Exception as e:
+                    logger.error(f"Error creating tickets in Jira: {e}")
+                    return [{"error": str(e)} for _ in batch]
+
+            results: List[dict] = [None] * len(batch)
+            for error in resp_json.get("errors", []):
+                element_errors: dict = error.get("elementErrors", {})
+                messages: List[str] = list(element_errors.get("errorMessages", []))
+                messages.extend(f"{k}: {v}" for k, v in element_errors.get("errors", {}).items())
+                message = "; ".join(messages)
+                results[error["failedElementNumber"]] = {"error": message or "Failed to create issue"}
+
+            # Created issues are returned in request order, skipping the failed elements
+            created = iter(resp_json.get("issues", []))
+            for index, result in enumerate(results):
+                if result is None:
+                    issue = next(created, None)
+                    results[index] = {"ticket": issue} if issue else {"error": "Issue missing from Jira response"}
+
+            return results
+
+        batch_results = await asyncio.gather(*[_create_batch(batch) for batch in batches])
+
+        return [result for results in batch_results for result in results]
+
 
 class Shortcut(BaseClient):
     headers = {
@@ -106,6 +210,7 @@ class Shortcut(BaseClient):
         "Shortcut-Token": ""
     }
     base_url = "https://api.app.shortcut.com/api/v3/"
+    max_concurrency = 10
 
     def __init__(self, **kwargs):
         super().__init__()
@@ -192,6 +297,7 @@ class Asana(BaseClient):
         "Authorization": ""
     }
     base_url = "https://app.asana.com/api/1.0/"
+    http2 = True
 
     def __init__(self, **kwargs):
         super().__init__()
@@ -259,6 +365,9 @@ class PlatformClient:
     async def create_story(self, **kwargs):
         return await self.platform.create_story(kwargs)
 
+    async def create_stories(self, tickets_params: List[dict]) -> List[dict]:
+        return await self.platform.create_stories(tickets_params)
+
     async def get_story(self, *args, **kwargs):
         return await self.platform.get_story(*args, **kwargs)
 
@@ -2,24 +2,36 @@ import datetime
 import os
 from typing import List, Optional
 
-import boto3
 import botocore
 from fastapi import UploadFile
 from pixelum_core.loggers.loggers import get_module_logger
 from pixelum_core.errors.custom_exceptions import ResourceNotFoundException
 
+from src.lib.aws_clients import get_aws_resource
+from src.lib.multipart_upload import DEFAULT_MULTIPART_THRESHOLD, MultipartUpload
 from src.models.dynamo.documents import DocumentsModel
 
 logger = get_module_logger()
 
 AWS_REGION = os.getenv("AWS_REGION", "us-west-2")
-s3 = boto3.resource("s3", region_name=AWS_REGION)
-bucket = s3.Bucket(os.environ.get("ARTIST_IMAGES_BUCKET", "dev-transcriptions-ai"))
+BUCKET_NAME = os.environ.get("ARTIST_IMAGES_BUCKET", "dev-transcriptions-ai")
+
+
+def get_bucket():
+    """
+    Get the transcripts bucket. The S3 resource is created on first use instead of
+    at import so routes that never touch S3 don't pay for it on a cold start.
+    """
+    return get_aws_resource("s3").Bucket(BUCKET_NAME)
 
 
 def upload_file_to_s3(file_object: UploadFile) -> dict:
     """
-    Uploads a file to an S3 bucket.
+    Uploads a file to an S3 bucket. Files larger than the multipart threshold are
+    streamed to S3 in parts so they are never held in memory in one piece.
+
+    This function blocks while the upload runs, call it from a worker thread when
+    inside the event loop.
 
     Args:
         file_object (UploadFile): The file object to be uploaded.
@@ -31,11 +43,18 @@ def upload_file_to_s3(file_object: UploadFile) -> dict:
         Exception: If the file fails to upload to the S3 bucket.
     """
     try:
+        bucket = get_bucket()
+
         # Append current datetime to the filename before the file extension
         file_name, file_extension = os.path.splitext(file_object.filename)
         filename = f"{file_name}_{datetime.datetime.now().strftime('%Y%m%d%H%M%S')}{file_extension}"
 
-        bucket.put_object(Key=filename, Body=file_object.file)
+        if file_object.size is None or file_object.size > DEFAULT_MULTIPART_THRESHOLD:
+            MultipartUpload(bucket.meta.client, bucket.name, filename).upload(
+                file_object.file
+            )
+        else:
+            bucket.put_object(Key=filename, Body=file_object.file)
         print(
             f"Successfully uploaded file to S3 bucket with key {file_object.filename}"
         )
@@ -69,14 +88,14 @@ def get_file_details_from_s3(s3_key, return_content: Optional[bool] = False):
         botocore.exceptions.ClientError: If the file is not found in the S3 bucket.
     """
     try:
-        obj = s3.Object(bucket.name, s3_key)
+        obj = get_bucket().Object(s3_key)
         logger.info("Loading file...")
         obj.load()
         logger.info("File loaded")
         response: dict = {
-            "bucket_name": bucket.name,
+            "bucket_name": BUCKET_NAME,
             "filename": obj.key,
-            "url": f"https://{bucket.name}.s3.amazonaws.com/{obj.key}",
+            "url": f"https://{BUCKET_NAME}.s3.amazonaws.com/{obj.key}",
         }
 
         if return_content:
@@ -94,6 +113,29 @@ def get_file_details_from_s3(s3_key, return_content: Optional[bool] = False):
             raise
 
 
+def get_file_content_hash(s3_key: str) -> str:
+    """
+    Gets a hash of a file's content from its S3 ETag without downloading it.
+
+    Args:
+        s3_key (str): The S3 key of the file.
+
+    Returns:
+        str: The ETag of the file.
+
+    Raises:
+        ResourceNotFoundException: If the file is not found in the S3 bucket.
+    """
+    try:
+        response: dict = get_bucket().meta.client.head_object(Bucket=BUCKET_NAME, Key=s3_key)
+        return response["ETag"].strip('"')
+    except botocore.exceptions.ClientError as e:
+        if e.response["Error"]["Code"] == "404":
+            raise ResourceNotFoundException("File not found.", resource_identifier=s3_key, resource_type="file")
+        else:
+            raise
+
+
 def download_file_from_s3(s3_key) -> Optional[str]:
     """
     Downloads a file from an S3 bucket and returns its contents.
@@ -108,7 +150,7 @@ def download_file_from_s3(s3_key) -> Optional[str]:
         botocore.exceptions.ClientError: If the file is not found in the S3 bucket.
     """
     try:
-        obj = s3.Object(bucket.name, s3_key)
+        obj = get_bucket().Object(s3_key)
         logger.info("Loading file...")
         obj.load()
         logger.info("File loaded")
@@ -131,13 +173,11 @@ async def get_all_files_from_documents(user_id: str) -> List[DocumentsModel]:
         List[DocumentsModel]: A list of DocumentsModel objects representing the user's uploaded files.
     """
     try:
-        documents = DocumentsModel.query(hash_key=user_id)
+        return await DocumentsModel.query_async(user_id)
     except Exception as e:
         logger.error(f"Failed to retrieve files from DynamoDB: {str(e)}")
         raise e
 
-    return [document for document in documents]
-
 
 if __name__ == "__main__":
     try:
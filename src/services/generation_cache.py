@@ -0,0 +1,135 @@
+import copy
+import hashlib
+import json
+import os
+from typing import Any, Dict, Optional
+
+from pixelum_core.loggers.loggers import get_module_logger
+
+from src.lib.cache import TTLCache
+from src.models.dynamo.generation_cache import GenerationCacheModel
+
+logger = get_module_logger()
+
+GENERATION_CACHE_TTL = int(os.getenv("GENERATION_CACHE_TTL", 7 * 24 * 60 * 60))
+GENERATION_CACHE_MEMORY_SIZE = int(os.getenv("GENERATION_CACHE_MEMORY_SIZE", 128))
+GENERATION_CACHE_PERSISTENT = os.getenv("GENERATION_CACHE_PERSISTENT", "true").lower() == "true"
+
+generation_memory_cache = TTLCache(
+    max_size=GENERATION_CACHE_MEMORY_SIZE, ttl=GENERATION_CACHE_TTL
+)
+_counters: Dict[str, int] = {
+    "memory_hits": 0,
+    "persistent_hits": 0,
+    "misses": 0,
+    "bypasses": 0,
+    "errors": 0,
+}
+
+
+def build_generation_cache_key(
+    prompt_template_version: str,
+    transcript: str,
+    number_of_tickets: int,
+    platform: str,
+    model: str,
+    max_tokens: int,
+) -> str:
+    """
+    Build the content-addressed key of a generation.
+
+    Args:
+        prompt_template_version (str): The version of the ticket prompt template.
+        transcript (str): The transcript the tickets are generated from.
+        number_of_tickets (int): The number of tickets to generate.
+        platform (str): The platform the tickets are generated for.
+        model (str): The model used for the generation.
+        max_tokens (int): The completion token limit of the generation.
+
+    Returns:
+        str: The cache key.
+    """
+    transcript_hash = hashlib.sha256(transcript.encode("utf-8")).hexdigest()
+    key_parts = [prompt_template_version, transcript_hash, number_of_tickets, platform, model, max_tokens]
+    return hashlib.sha256(json.dumps(key_parts).encode("utf-8")).hexdigest()
+
+
+def get_cached_generation(cache_key: str) -> Optional[dict]:
+    """
+    Get a cached generation result, checking memory before DynamoDB.
+
+    Args:
+        cache_key (str): The cache key of the generation.
+
+    Returns:
+        Optional[dict]: The cached tickets or None on a miss.
+    """
+    tickets: Optional[dict] = generation_memory_cache.get(cache_key)
+    if tickets is not None:
+        _counters["memory_hits"] += 1
+        # Callers own the result, don't hand out the cached object itself
+        return copy.deepcopy(tickets)
+
+    if GENERATION_CACHE_PERSISTENT:
+        try:
+            cached = GenerationCacheModel.get(cache_key)
+            if not cached.is_expired:
+                tickets = json.loads(cached.tickets)
+                generation_memory_cache.set(cache_key, copy.deepcopy(tickets))
+                _counters["persistent_hits"] += 1
+                return tickets
+        except GenerationCacheModel.DoesNotExist:
+            pass
+        except Exception as e:
+            # The cache must never fail a generation
+            _counters["errors"] += 1
+            logger.error(f"Failed to read generation cache: {e}")
+
+    _counters["misses"] += 1
+    return None
+
+
+def set_cached_generation(
+    cache_key: str, tickets: dict, number_of_tickets: int, platform: str
+) -> None:
+    """
+    Store a generation result in both cache tiers.
+
+    Args:
+        cache_key (str): The cache key of the generation.
+        tickets (dict): The generated tickets.
+        number_of_tickets (int): The number of tickets requested.
+        platform (str): The platform the tickets were generated for.
+    """
+    generation_memory_cache.set(cache_key, copy.deepcopy(tickets))
+
+    if not GENERATION_CACHE_PERSISTENT:
+        return
+
+    try:
+        GenerationCacheModel.initialize(
+            cache_key=cache_key,
+            tickets=json.dumps(tickets),
+            number_of_tickets=number_of_tickets,
+            platform=platform,
+            ttl_seconds=GENERATION_CACHE_TTL,
+        ).save()
+    except Exception as e:
+        _counters["errors"] += 1
+        logger.error(f"Failed to write generation cache: {e}")
+
+
+def record_generation_cache_bypass() -> None:
+    """Count a generation that skipped the cache at the caller's request."""
+    _counters["bypasses"] += 1
+
+
+def generation_cache_stats() -> Dict[str, Any]:
+    """Get the hit-rate metrics of the generation cache."""
+    hits = _counters["memory_hits"] + _counters["persistent_hits"]
+    lookups = hits + _counters["misses"]
+    return {
+        **_counters,
+        "hit_rate": round(hits / lookups, 3) if lookups else None,
+        "memory": generation_memory_cache.stats(),
+    }
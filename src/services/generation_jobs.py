@@ -0,0 +1,186 @@
+import asyncio
+import datetime
+import os
+import time
+from typing import List, Optional
+
+from pixelum_core.errors.custom_exceptions import ResourceNotFoundException
+from pixelum_core.loggers.loggers import get_module_logger
+from pynamodb.exceptions import UpdateError
+
+from src.models.dynamo.async_model import run_in_dynamodb_executor
+from src.models.dynamo.generation_job import GenerationJobModel
+
+logger = get_module_logger()
+
+# How often a long poll re-reads the status, and the longest it may wait (API Gateway times out at 29s)
+GENERATION_JOB_POLL_INTERVAL = float(os.getenv("GENERATION_JOB_POLL_INTERVAL", 1.0))
+GENERATION_JOB_MAX_WAIT = float(os.getenv("GENERATION_JOB_MAX_WAIT", 25.0))
+
+
+async def create_generation_job(
+    document_id: str,
+    generation_datetime: str,
+    user_id: str,
+    owner_id: str,
+    number_of_tickets: int,
+) -> GenerationJobModel:
+    """
+    Record a queued ticket generation.
+
+    Args:
+        document_id (str): The ID of the document.
+        generation_datetime (str): The datetime of the generation.
+        user_id (str): The ID of the user that started the generation.
+        owner_id (str): The ID of the account the generation belongs to, the parent account for sub-users.
+        number_of_tickets (int): The number of tickets requested.
+
+    Returns:
+        GenerationJobModel: The queued generation job.
+    """
+    generation_job = await GenerationJobModel.initialize(
+        document_id=document_id,
+        generation_datetime=generation_datetime,
+        user_id=user_id,
+        owner_id=owner_id,
+        number_of_tickets=number_of_tickets,
+    )
+    await generation_job.save()
+    return generation_job
+
+
+def _update_generation_job(
+    document_id: str,
+    generation_datetime: str,
+    status: Optional[str] = None,
+    tickets_generated: Optional[int] = None,
+    token_usage: Optional[dict] = None,
+    error: Optional[str] = None,
+) -> None:
+    actions: List = [
+        GenerationJobModel.version.add(1),
+        GenerationJobModel.updated_datetime.set(datetime.datetime.now().isoformat()),
+    ]
+    if status is not None:
+        actions.append(GenerationJobModel.status.set(status))
+    if tickets_generated is not None:
+        actions.append(GenerationJobModel.tickets_generated.set(tickets_generated))
+    if token_usage is not None:
+        actions.append(GenerationJobModel.token_usage.set(token_usage))
+    if error is not None:
+        actions.append(GenerationJobModel.error.set(error))
+
+    GenerationJobModel(document_id, generation_datetime).update(
+        actions=actions,
+        # Don't create a partial record for generations queued without one
+        condition=GenerationJobModel.document_id.exists(),
+    )
+
+
+async def update_generation_job(
+    document_id: str,
+    generation_datetime: str,
+    status: Optional[str] = None,
+    tickets_generated: Optional[int] = None,
+    token_usage: Optional[dict] = None,
+    error: Optional[str] = None,
+) -> None:
+    """
+    Update the status of a generation and bump its version so long polls return.
+    The status is informational, so a failed update is logged instead of failing
+    the generation.
+
+    Args:
+        document_id (str): The ID of the document.
+        generation_datetime (str): The datetime of the generation.
+        status (str, optional): The new status.
+        tickets_generated (int, optional): The number of tickets written so far.
+        token_usage (dict, optional): The token accounting of the generation.
+        error (str, optional): Why the generation failed.
+    """
+    try:
+        await run_in_dynamodb_executor(
+            _update_generation_job,
+            document_id,
+            generation_datetime,
+            status,
+            tickets_generated,
+            token_usage,
+            error,
+        )
+    except UpdateError as e:
+        if e.cause_response_code == "ConditionalCheckFailedException":
+            logger.warning(f"Generation {document_id}/{generation_datetime} has no status record")
+        else:
+            logger.error(f"Failed to update the status of generation {document_id}/{generation_datetime}: {e}")
+
+
+async def get_generation_job(
+    document_id: str, generation_datetime: str, owner_id: str
+) -> GenerationJobModel:
+    """
+    Get the status of a generation of an account. Identical requests of the users
+    of an account share one generation, so every one of them may follow it.
+
+    Args:
+        document_id (str): The ID of the document.
+        generation_datetime (str): The datetime of the generation.
+        owner_id (str): The ID of the account, the parent account for sub-users.
+
+    Returns:
+        GenerationJobModel: The generation job.
+
+    Raises:
+        ResourceNotFoundException: If the account has no generation with the keys.
+    """
+    try:
+        generation_job = await GenerationJobModel.get_async(document_id, generation_datetime)
+    except GenerationJobModel.DoesNotExist:
+        generation_job = None
+
+    # Generations queued before owner_id was recorded belong to the user that started them
+    if generation_job is None or (generation_job.owner_id or generation_job.user_id) != owner_id:
+        raise ResourceNotFoundException(
+            "Generation not found.",
+            resource_name="GenerationJob",
+            resource_identifier=f"{document_id}/{generation_datetime}",
+        )
+
+    return generation_job
+
+
+async def wait_for_generation_job(
+    document_id: str,
+    generation_datetime: str,
+    owner_id: str,
+    since_version: Optional[int] = None,
+    wait: float = 0,
+) -> GenerationJobModel:
+    """
+    Long poll the status of a generation. Returns as soon as the generation has
+    changed since the version the client last saw, or has finished, or once wait
+    seconds have passed. The status record is a fraction of the size of the
+    Ticket item, so re-reading it server-side is far cheaper than clients polling
+    the tickets.
+
+    Args:
+        document_id (str): The ID of the document.
+        generation_datetime (str): The datetime of the generation.
+        owner_id (str): The ID of the account, the parent account for sub-users.
+        since_version (int, optional): The last version the client saw. Defaults to the current version.
+        wait (float, optional): The most seconds to wait for a change, capped at GENERATION_JOB_MAX_WAIT.
+
+    Returns:
+        GenerationJobModel: The generation job.
+    """
+    generation_job = await get_generation_job(document_id, generation_datetime, owner_id)
+    if since_version is None:
+        since_version = generation_job.version
+
+    deadline = time.monotonic() + min(max(wait, 0), GENERATION_JOB_MAX_WAIT)
+
+    while generation_job.version <= since_version and not generation_job.is_final and time.monotonic() < deadline:
+        await asyncio.sleep(min(GENERATION_JOB_POLL_INTERVAL, max(deadline - time.monotonic(), 0)))
+        generation_job = await get_generation_job(document_id, generation_datetime, owner_id)
+
+    return generation_job
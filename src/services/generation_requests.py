@@ -0,0 +1,147 @@
+import asyncio
+import datetime
+import hashlib
+import json
+import os
+from typing import Optional, Tuple
+
+from pixelum_core.loggers.loggers import get_module_logger
+from pynamodb.exceptions import PutError
+
+from src.lib.enums import PlatformEnum
+from src.models.dynamo.generation_request import GenerationRequestModel
+from src.services.file_management import get_file_content_hash
+
+logger = get_module_logger()
+
+# Identical generation requests made within this many seconds share one generation
+GENERATION_DEDUPE_WINDOW_SECONDS = int(os.getenv("GENERATION_DEDUPE_WINDOW_SECONDS", 120))
+
+
+def build_generation_request_key(
+    owner_id: str, document_id: str, number_of_tickets: int, platform: PlatformEnum, content_hash: str
+) -> str:
+    """
+    Build the key identifying a generation request. The key is scoped to the
+    account paying for the generation, so one account never joins a generation
+    charged to another.
+
+    Args:
+        owner_id (str): The ID of the account the generation is charged to.
+        document_id (str): The ID of the document.
+        number_of_tickets (int): The number of tickets requested.
+        platform (PlatformEnum): The platform the tickets are generated for.
+        content_hash (str): A hash of the transcript content.
+
+    Returns:
+        str: The request key.
+    """
+    key_parts = [owner_id, document_id, number_of_tickets, platform.value, content_hash]
+    return hashlib.sha256(json.dumps(key_parts).encode("utf-8")).hexdigest()
+
+
+async def claim_generation_request(
+    document_id: str,
+    user_id: str,
+    owner_id: str,
+    number_of_tickets: int,
+    platform: PlatformEnum,
+    window_seconds: int = GENERATION_DEDUPE_WINDOW_SECONDS,
+    take_over: bool = False,
+) -> Tuple[GenerationRequestModel, bool]:
+    """
+    Claim a generation for the request, or join the one already in flight.
+
+    The claim is a conditional write, so only one caller across every container
+    wins it within the dedupe window. Everyone else gets the winner's request
+    back and should reuse its generation_datetime instead of invoking a new
+    generation. A caller taking over always claims the request, replacing the
+    generation in flight, so the identical requests after it join its generation.
+
+    Args:
+        document_id (str): The ID of the document.
+        user_id (str): The ID of the user.
+        owner_id (str): The ID of the account the generation is charged to, the parent account for sub-users.
+        number_of_tickets (int): The number of tickets requested.
+        platform (PlatformEnum): The platform the tickets are generated for.
+        window_seconds (int, optional): How long identical requests are coalesced for.
+        take_over (bool, optional): Whether to start a new generation even if one is in flight,
+            e.g. when the generation cache is bypassed. Defaults to False.
+
+    Returns:
+        Tuple[GenerationRequestModel, bool]: The generation request and whether this caller claimed it.
+    """
+    content_hash: str = await asyncio.to_thread(get_file_content_hash, document_id)
+    request_key: str = build_generation_request_key(
+        owner_id, document_id, number_of_tickets, platform, content_hash
+    )
+
+    generation_request = await GenerationRequestModel.initialize(
+        request_key=request_key,
+        document_id=document_id,
+        user_id=user_id,
+        number_of_tickets=number_of_tickets,
+        platform=platform.value,
+        generation_datetime=datetime.datetime.now().isoformat(),
+        window_seconds=window_seconds,
+    )
+
+    while True:
+        # Only take over an existing request once its dedupe window has closed, unless asked to
+        now = datetime.datetime.now(datetime.timezone.utc)
+        condition = None if take_over else GenerationRequestModel.request_key.does_not_exist() | (
+            GenerationRequestModel.expires_at <= now
+        )
+
+        try:
+            await generation_request.save(condition=condition)
+            return generation_request, True
+        except PutError as e:
+            if e.cause_response_code != "ConditionalCheckFailedException":
+                raise
+
+        try:
+            existing = await GenerationRequestModel.get_async(request_key, consistent_read=True)
+            break
+        except GenerationRequestModel.DoesNotExist:
+            # The in-flight request was released in the meantime, race for the claim again
+            continue
+
+    logger.info(
+        f"Coalescing generation request for {document_id} into generation {existing.generation_datetime}"
+    )
+    return existing, False
+
+
+async def release_generation_request(generation_request: GenerationRequestModel) -> None:
+    """
+    Release a claimed generation request so the next identical request starts a
+    new generation, e.g. when invoking the generation failed. A request claimed
+    by a newer generation since is left alone.
+
+    Args:
+        generation_request (GenerationRequestModel): The claimed generation request.
+    """
+    try:
+        await generation_request.delete(
+            condition=GenerationRequestModel.generation_datetime == generation_request.generation_datetime
+        )
+    except Exception as e:
+        logger.error(f"Failed to release generation request {generation_request.request_key}: {e}")
+
+
+async def release_generation_request_key(request_key: Optional[str], generation_datetime: str) -> None:
+    """
+    Release the generation request claimed for a generation by its key, e.g. when
+    the worker gives up on the generation. A missing key is ignored.
+
+    Args:
+        request_key (str, optional): The key of the claimed generation request.
+        generation_datetime (str): The datetime of the generation that claimed it.
+    """
+    if request_key is None:
+        return
+
+    await release_generation_request(
+        GenerationRequestModel(request_key=request_key, generation_datetime=generation_datetime)
+    )
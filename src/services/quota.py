@@ -0,0 +1,380 @@
+import datetime
+import os
+import time
+from typing import List, Optional
+
+from pixelum_core.errors.custom_exceptions import (
+    FileUploadLimitReachedError,
+    TicketGenerationLimitReachedError,
+)
+from pixelum_core.loggers.loggers import get_module_logger
+from pynamodb.attributes import NumberAttribute
+from pynamodb.connection import Connection
+from pynamodb.exceptions import TransactWriteError, UpdateError
+from pynamodb.transactions import TransactWrite
+
+from src.models.dynamo.async_model import DYNAMODB_MAX_CONCURRENCY, run_in_dynamodb_executor
+from src.models.dynamo.quota_reservation import QuotaReservationModel
+from src.models.dynamo.ticket import Ticket
+from src.models.dynamo.user_metadata import UserMetadataModel, user_metadata_cache
+
+logger = get_module_logger()
+
+# How long queued work has to commit or refund its reservation before it may be reclaimed
+QUOTA_RESERVATION_TTL = int(os.getenv("QUOTA_RESERVATION_TTL", 60 * 60))
+
+_transaction_connection: Optional[Connection] = None
+
+GENERATIONS = "generations_count"
+FILE_UPLOADS = "file_uploads_count"
+
+QUOTA_ERRORS = {
+    GENERATIONS: (TicketGenerationLimitReachedError, "User has reached the maximum number of ticket generations."),
+    FILE_UPLOADS: (FileUploadLimitReachedError, "User has reached the maximum number of file uploads."),
+}
+
+
+def get_quota_owner_id(user: UserMetadataModel) -> str:
+    """Get the ID of the account a user's quota is charged to, the parent account for sub-users."""
+    return user.parent_user_id or user.user_id
+
+
+def _quota_attribute(quota: str) -> NumberAttribute:
+    if quota not in QUOTA_ERRORS:
+        raise ValueError(f"Unknown quota {quota}.")
+    return getattr(UserMetadataModel, quota)
+
+
+async def consume_quota(user: UserMetadataModel, quota: str, amount: int = 1) -> int:
+    """
+    Spend quota of a user in a single conditional UpdateItem, charging the parent
+    account directly for sub-users. The ADD only applies while the balance covers
+    the amount, so concurrent requests can never spend more than is left, and only
+    the counter is written instead of the whole item.
+
+    Args:
+        user (UserMetadataModel): The user spending the quota.
+        quota (str): GENERATIONS or FILE_UPLOADS.
+        amount (int, optional): How much to spend. Defaults to 1.
+
+    Returns:
+        int: The quota left on the charged account.
+
+    Raises:
+        TicketGenerationLimitReachedError: If there aren't enough generations left.
+        FileUploadLimitReachedError: If there aren't enough file uploads left.
+    """
+    attribute = _quota_attribute(quota)
+    owner_id = get_quota_owner_id(user)
+    owner = UserMetadataModel(owner_id) if owner_id != user.user_id else user
+
+    try:
+        await owner.update_async(
+            [attribute.add(-amount)],
+            condition=attribute >= amount,
+        )
+    except UpdateError as e:
+        if e.cause_response_code != "ConditionalCheckFailedException":
+            raise
+
+        error_type, message = QUOTA_ERRORS[quota]
+        logger.error(message)
+        raise error_type(message=message)
+
+    remaining: int = getattr(owner, quota)
+    logger.info(f"Charged {amount} {quota} to {owner_id}, {remaining} remaining")
+    return remaining
+
+
+async def refund_quota(user: UserMetadataModel, quota: str, amount: int = 1) -> None:
+    """
+    Give back quota spent by consume_quota, e.g. when the work it paid for failed.
+
+    Args:
+        user (UserMetadataModel): The user that spent the quota.
+        quota (str): GENERATIONS or FILE_UPLOADS.
+        amount (int, optional): How much to give back. Defaults to 1.
+    """
+    owner_id = get_quota_owner_id(user)
+    await _give_back(UserMetadataModel(owner_id) if owner_id != user.user_id else user, quota, amount)
+
+
+async def refund_owner_quota(owner_id: str, quota: str, amount: int = 1) -> None:
+    """
+    Give back quota spent by consume_quota to the account it was charged to, for
+    work settled without the user at hand, e.g. a bulk generation once it finishes.
+
+    Args:
+        owner_id (str): The ID of the account the quota was charged to.
+        quota (str): GENERATIONS or FILE_UPLOADS.
+        amount (int, optional): How much to give back. Defaults to 1.
+    """
+    await _give_back(UserMetadataModel(owner_id), quota, amount)
+
+
+async def _give_back(owner: UserMetadataModel, quota: str, amount: int) -> None:
+    attribute = _quota_attribute(quota)
+
+    try:
+        await owner.update_async([attribute.add(amount)], condition=UserMetadataModel.user_id.exists())
+        logger.info(f"Refunded {amount} {quota} to {owner.user_id}")
+    except Exception as e:
+        logger.error(f"Failed to refund {amount} {quota} to {owner.user_id}: {e}")
+
+
+def _get_transaction_connection() -> Connection:
+    """Get the connection quota transactions are written with, created on first use."""
+    global _transaction_connection
+
+    if _transaction_connection is None:
+        _transaction_connection = Connection(
+            region=UserMetadataModel.Meta.region,
+            host=UserMetadataModel.Meta.host,
+            max_pool_connections=DYNAMODB_MAX_CONCURRENCY,
+        )
+    return _transaction_connection
+
+
+# Positions of the items in the transactions, PynamoDB sends puts ahead of updates
+_RESERVE_QUOTA_ITEM = 1
+_REFUND_RESERVATION_ITEM = 0
+
+
+def _condition_failed(error: TransactWriteError, item: int) -> bool:
+    """Whether a transaction was cancelled because the condition of one of its items failed."""
+    reasons = error.cancellation_reasons or []
+    return item < len(reasons) and reasons[item] is not None and reasons[item].code == "ConditionalCheckFailed"
+
+
+def _reserve(reservation: QuotaReservationModel) -> None:
+    attribute = _quota_attribute(reservation.quota)
+
+    with TransactWrite(connection=_get_transaction_connection()) as transaction:
+        transaction.update(
+            UserMetadataModel(reservation.owner_id),
+            actions=[attribute.add(-reservation.amount)],
+            condition=attribute >= reservation.amount,
+        )
+        transaction.save(
+            reservation,
+            condition=QuotaReservationModel.reservation_id.does_not_exist(),
+        )
+
+    user_metadata_cache.invalidate(reservation.owner_id)
+
+
+def _refund(reservation: QuotaReservationModel) -> None:
+    attribute = _quota_attribute(reservation.quota)
+
+    # Flip the reservation and give the quota back together, so it is refunded exactly once
+    with TransactWrite(connection=_get_transaction_connection()) as transaction:
+        transaction.update(
+            reservation,
+            actions=[
+                QuotaReservationModel.status.set(QuotaReservationModel.REFUNDED),
+                QuotaReservationModel.settled_datetime.set(datetime.datetime.now().isoformat()),
+            ],
+            condition=QuotaReservationModel.status == QuotaReservationModel.RESERVED,
+        )
+        transaction.update(
+            UserMetadataModel(reservation.owner_id),
+            actions=[attribute.add(reservation.amount)],
+            condition=UserMetadataModel.user_id.exists(),
+        )
+
+    user_metadata_cache.invalidate(reservation.owner_id)
+
+
+async def reserve_quota(
+    user: UserMetadataModel,
+    quota: str,
+    amount: int = 1,
+    ttl: int = QUOTA_RESERVATION_TTL,
+    document_id: Optional[str] = None,
+    generation_datetime: Optional[str] = None,
+) -> QuotaReservationModel:
+    """
+    Take quota from a user for work that finishes later, charging the parent
+    account directly for sub-users. The quota is taken and the reservation
+    recorded in one transaction, and the work then commits the reservation when
+    it succeeds or refunds it when it fails. When the account is out of quota,
+    reservations left unsettled past their TTL are reclaimed before refusing.
+
+    Args:
+        user (UserMetadataModel): The user reserving the quota.
+        quota (str): GENERATIONS or FILE_UPLOADS.
+        amount (int, optional): How much to reserve. Defaults to 1.
+        ttl (int, optional): How many seconds the work has to settle the reservation.
+            Defaults to QUOTA_RESERVATION_TTL.
+        document_id (str, optional): The document of the generation the quota pays for.
+        generation_datetime (str, optional): The datetime of the generation the quota pays for.
+            Reclaiming commits instead of refunding the reservation once its tickets are written.
+
+    Returns:
+        QuotaReservationModel: The reservation.
+
+    Raises:
+        TicketGenerationLimitReachedError: If there aren't enough generations left.
+        FileUploadLimitReachedError: If there aren't enough file uploads left.
+    """
+    _quota_attribute(quota)
+    owner_id = get_quota_owner_id(user)
+
+    reservation = await QuotaReservationModel.initialize(
+        owner_id=owner_id,
+        user_id=user.user_id,
+        quota=quota,
+        amount=amount,
+        ttl=ttl,
+        document_id=document_id,
+        generation_datetime=generation_datetime,
+    )
+
+    for attempt in range(2):
+        try:
+            await run_in_dynamodb_executor(_reserve, reservation)
+            logger.info(f"Reserved {amount} {quota} of {owner_id} as {reservation.reservation_id}")
+            return reservation
+        except TransactWriteError as e:
+            if not _condition_failed(e, _RESERVE_QUOTA_ITEM):
+                raise
+
+        # Only retry if reclaiming stale reservations gave quota back
+        if attempt or not await reclaim_expired_reservations(owner_id):
+            break
+
+    error_type, message = QUOTA_ERRORS[quota]
+    logger.error(message)
+    raise error_type(message=message)
+
+
+async def commit_quota_reservation(reservation_id: Optional[str]) -> bool:
+    """
+    Keep the quota of a reservation once the work it paid for has succeeded. Jobs
+    queued without a reservation are ignored, and a failed commit is logged
+    rather than failing the finished work.
+
+    Args:
+        reservation_id (str, optional): The ID of the reservation.
+
+    Returns:
+        bool: Whether the reservation was committed.
+    """
+    if not reservation_id:
+        return False
+
+    try:
+        await QuotaReservationModel(reservation_id).update_async(
+            [
+                QuotaReservationModel.status.set(QuotaReservationModel.COMMITTED),
+                QuotaReservationModel.settled_datetime.set(datetime.datetime.now().isoformat()),
+            ],
+            condition=QuotaReservationModel.status == QuotaReservationModel.RESERVED,
+        )
+    except UpdateError as e:
+        if e.cause_response_code == "ConditionalCheckFailedException":
+            logger.warning(f"Quota reservation {reservation_id} was already settled")
+        else:
+            logger.error(f"Failed to commit quota reservation {reservation_id}: {e}")
+        return False
+
+    logger.info(f"Committed quota reservation {reservation_id}")
+    return True
+
+
+async def refund_quota_reservation(reservation_id: Optional[str]) -> bool:
+    """
+    Give back the quota of a reservation whose work has failed. Reservations that
+    are already settled are left alone, and a failed refund is logged, since
+    reclaiming gives the quota back once the reservation expires.
+
+    Args:
+        reservation_id (str, optional): The ID of the reservation.
+
+    Returns:
+        bool: Whether the quota was given back.
+    """
+    if not reservation_id:
+        return False
+
+    try:
+        reservation = await QuotaReservationModel.get_async(reservation_id, consistent_read=True)
+    except QuotaReservationModel.DoesNotExist:
+        logger.warning(f"Quota reservation {reservation_id} not found")
+        return False
+
+    return await _refund_reservation(reservation)
+
+
+async def _refund_reservation(reservation: QuotaReservationModel) -> bool:
+    if reservation.status != QuotaReservationModel.RESERVED:
+        logger.warning(f"Quota reservation {reservation.reservation_id} was already {reservation.status}")
+        return False
+
+    try:
+        await run_in_dynamodb_executor(_refund, reservation)
+    except TransactWriteError as e:
+        if _condition_failed(e, _REFUND_RESERVATION_ITEM):
+            # Settled since it was read, e.g. by a concurrent reclaim
+            logger.warning(f"Quota reservation {reservation.reservation_id} was already settled")
+        else:
+            logger.error(f"Failed to refund quota reservation {reservation.reservation_id}: {e}")
+        return False
+
+    logger.info(
+        f"Refunded {reservation.amount} {reservation.quota} to {reservation.owner_id} "
+        f"from quota reservation {reservation.reservation_id}"
+    )
+    return True
+
+
+async def _generation_completed(reservation: QuotaReservationModel) -> bool:
+    """Whether every ticket of the generation a reservation pays for has been written."""
+    if not reservation.document_id or not reservation.generation_datetime:
+        return False
+
+    try:
+        ticket_item: Ticket = await Ticket.get_async(
+            reservation.document_id, reservation.generation_datetime, consistent_read=True
+        )
+    except Ticket.DoesNotExist:
+        return False
+
+    # Streamed generations are incomplete until the last ticket is written
+    return ticket_item.is_complete is not False
+
+
+async def reclaim_expired_reservations(owner_id: str) -> int:
+    """
+    Refund the reservations of an account that are past their TTL without being
+    committed or refunded, e.g. because the worker running the job died. A
+    reservation whose generation was written anyway is committed instead, so a
+    commit that never happened doesn't hand out a free generation.
+
+    Args:
+        owner_id (str): The ID of the account the quota was taken from.
+
+    Returns:
+        int: The number of reservations refunded.
+    """
+    expired: List[QuotaReservationModel] = await run_in_dynamodb_executor(
+        lambda: list(
+            QuotaReservationModel.owner_index.query(
+                owner_id,
+                QuotaReservationModel.reserved_until < int(time.time()),
+                filter_condition=QuotaReservationModel.status == QuotaReservationModel.RESERVED,
+            )
+        )
+    )
+
+    reclaimed = 0
+    for reservation in expired:
+        if await _generation_completed(reservation):
+            await commit_quota_reservation(reservation.reservation_id)
+            continue
+
+        reclaimed += await _refund_reservation(reservation)
+
+    if reclaimed:
+        logger.info(f"Reclaimed {reclaimed} expired quota reservations of {owner_id}")
+    return reclaimed
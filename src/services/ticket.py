@@ -1,70 +1,463 @@
+import asyncio
 import datetime
 import json
+import math
 import os
-from typing import Optional
+import time
+from typing import TYPE_CHECKING, List, Optional, Tuple
 import uuid
 
-import boto3
-from openai.types.chat.chat_completion_message import ChatCompletionMessage
+from pixelum_core.errors.custom_exceptions import InvalidInput
 from pixelum_core.loggers.loggers import get_module_logger
 
+from src.lib.aws_clients import get_aws_client
+from src.lib.cache import TTLCache
 from src.lib.enums import EventEnum, PlatformEnum
+from src.lib.job_queue import JobQueue, create_job_queue
+from src.lib.prompt_builder import (
+    TicketPrompt,
+    TokenAccounting,
+    max_tickets_per_completion,
+    size_max_tokens,
+)
+from src.lib.rate_limiter import RateLimitExceededError
+from src.lib.ticket_stream_parser import TicketStreamParser, parse_tickets
+from src.lib.transcript_chunker import chunk_transcript
+from src.models.dynamo.generation_job import GenerationJobModel
 from src.models.dynamo.ticket import SubTicket, Ticket
-from src.models.openai import OpenAIClient
+from src.services.clients import PlatformClient
+from src.services.generation_cache import (
+    build_generation_cache_key,
+    get_cached_generation,
+    record_generation_cache_bypass,
+    set_cached_generation,
+)
+from src.services.generation_jobs import update_generation_job
+from src.services.quota import commit_quota_reservation
+
+if TYPE_CHECKING:
+    from openai.types.chat.chat_completion import ChatCompletion
+
+    from src.models.openai import AsyncOpenAIClient
 
 logger = get_module_logger()
 
+# Transcripts longer than this are generated chunk by chunk and merged
+CHUNKED_GENERATION_THRESHOLD_TOKENS = int(os.getenv("CHUNKED_GENERATION_THRESHOLD_TOKENS", 8000))
+CHUNKED_GENERATION_CONCURRENCY = int(os.getenv("CHUNKED_GENERATION_CONCURRENCY", 4))
+# Streamed tickets are written once this many are pending or this many seconds after the last write
+TICKET_WRITE_BATCH_SIZE = int(os.getenv("TICKET_WRITE_BATCH_SIZE", 3))
+TICKET_WRITE_INTERVAL = float(os.getenv("TICKET_WRITE_INTERVAL", 2.0))
+
+TICKET_JOBS_QUEUE_URL = os.getenv("TICKET_JOBS_QUEUE_URL")
+# New jobs are shed once this many are queued or in flight, 0 disables the limit
+TICKET_JOBS_MAX_DEPTH = int(os.getenv("TICKET_JOBS_MAX_DEPTH", 1000))
+# The queue depth is only looked up every few seconds
+ticket_job_depth_cache = TTLCache(max_size=1, ttl=float(os.getenv("TICKET_JOBS_DEPTH_CACHE_TTL", 5)))
+_ticket_job_queue: Optional[JobQueue] = None
+
+
+def _generation_cache_key(
+    client: "AsyncOpenAIClient",
+    prompt: str,
+    number_of_tickets: int,
+    platform_name: str,
+    max_tokens: int,
+) -> str:
+    # max_tokens is the sized budget the completion is sent with, not the client default
+    return build_generation_cache_key(
+        client.prompt_template_version,
+        prompt,
+        number_of_tickets,
+        platform_name,
+        client.model,
+        max_tokens,
+    )
+
 
-def modify_keys(data: dict) -> dict:
+def parse_completion(completion: "ChatCompletion") -> dict:
     """
-    Recursively modifies the keys of a dictionary to be lowercase and remove spaces.
+    Parse the tickets of a completion with normalized keys. Every complete ticket
+    is recovered from a truncated or slightly malformed completion.
 
     Args:
-        data (dict): The dictionary to modify.
+        completion (ChatCompletion): The completion returned by the model.
 
     Returns:
-        dict: The modified dictionary.
+        dict: The parsed tickets under the `tickets` key.
+
+    Raises:
+        ValueError: If no ticket could be recovered from the completion.
     """
-    if isinstance(data, dict):
-        return {
-            key.lower().replace(" ", ""): modify_keys(value)
-            for key, value in data.items()
-        }
-    elif isinstance(data, list):
-        return [modify_keys(item) for item in data]
-    else:
-        return data
+    choice = completion.choices[0]
+    tickets: List[dict] = parse_tickets(choice.message.content or "")
+
+    if choice.finish_reason == "length":
+        logger.warning(f"Completion was truncated, recovered {len(tickets)} tickets")
+    if not tickets:
+        raise ValueError("No tickets could be parsed from the completion.")
+
+    return {"tickets": tickets}
 
 
-def generate_tickets(prompt: str, number_of_tickets: int, platform: str) -> dict:
+def extract_ticket_list(tickets_dict: dict) -> List[dict]:
     """
-    Given a transcript prompt, generate a number of tickets for a given platform.
+    Get the list of tickets out of a generation, whatever key the model put it under.
 
     Args:
+        tickets_dict (dict): The generation returned by the model.
+
+    Returns:
+        List[dict]: The tickets.
+    """
+    if "tickets" in tickets_dict:
+        return tickets_dict["tickets"]
+
+    for value in tickets_dict.values():
+        if isinstance(value, list):
+            return value
+
+    return []
+
+
+def _tickets_per_chunk(number_of_tickets: int, number_of_chunks: int) -> int:
+    # Ask every chunk for a share of the tickets plus headroom for the merge to choose from
+    return min(number_of_tickets, max(2, math.ceil(2 * number_of_tickets / number_of_chunks)))
+
+
+async def generate_tickets_chunked_async(
+    client: "AsyncOpenAIClient",
+    prompt: str,
+    number_of_tickets: int,
+    platform: str,
+    ticket_prompt: Optional[TicketPrompt] = None,
+) -> dict:
+    """
+    Generate tickets for a long transcript with a map-reduce pass. Candidate tickets
+    are generated for every chunk of the transcript as concurrent requests on the
+    event loop and then merged and deduplicated down to the requested number of tickets.
+
+    Args:
+        client (AsyncOpenAIClient): The OpenAI client to generate with.
         prompt (str): The transcript prompt as a string.
         number_of_tickets (int): The number of tickets to generate.
         platform (str): The platform to generate the tickets for.
+        ticket_prompt (TicketPrompt, optional): The prompt of the generation, to record token usage on.
 
     Returns:
-        dict: The generated tickets or an error message as a dictionary.
+        dict: The generated tickets.
     """
-    client = OpenAIClient()
+    chunks: List[str] = chunk_transcript(prompt)
+    tickets_per_chunk: int = _tickets_per_chunk(number_of_tickets, len(chunks))
+    chunk_max_tokens: int = size_max_tokens(tickets_per_chunk, client.max_output_tokens)
+    logger.info(
+        f"Generating {tickets_per_chunk} candidate tickets for each of {len(chunks)} transcript chunks..."
+    )
+    semaphore = asyncio.Semaphore(CHUNKED_GENERATION_CONCURRENCY)
+
+    async def _generate_chunk(chunk: str) -> List[dict]:
+        async with semaphore:
+            completion: ChatCompletion = await client.create_tickets(
+                chunk, tickets_per_chunk, platform, max_tokens=chunk_max_tokens
+            )
+        chunk_tickets: List[dict] = extract_ticket_list(parse_completion(completion))
+        if ticket_prompt is not None:
+            ticket_prompt.record_usage(completion.usage, len(chunk_tickets))
+        return chunk_tickets
+
+    candidate_tickets: List[dict] = [
+        ticket
+        for chunk_tickets in await asyncio.gather(*(_generate_chunk(chunk) for chunk in chunks))
+        for ticket in chunk_tickets
+    ]
+
+    if len(candidate_tickets) <= number_of_tickets:
+        return {"tickets": candidate_tickets}
+
+    logger.info(f"Merging {len(candidate_tickets)} candidate tickets...")
+    completion: ChatCompletion = await client.merge_tickets(
+        candidate_tickets,
+        number_of_tickets,
+        platform,
+        max_tokens=(
+            ticket_prompt.max_tokens if ticket_prompt is not None
+            else size_max_tokens(number_of_tickets, client.max_output_tokens)
+        ),
+    )
+    merged_tickets: List[dict] = extract_ticket_list(parse_completion(completion))
+    if ticket_prompt is not None:
+        ticket_prompt.record_usage(completion.usage, len(merged_tickets))
+
+    return {"tickets": merged_tickets}
+
+
+def normalize_ticket(ticket: dict) -> Optional[dict]:
+    """
+    Normalize a ticket generated by the model into the shape stored in the Ticket table.
+
+    Args:
+        ticket (dict): The ticket as generated by the model, with keys normalized by the parser.
+
+    Returns:
+        Optional[dict]: The normalized ticket or None if it is missing a subject or body.
+    """
+    if not ticket.get("subject") or not ticket.get("body"):
+        return None
+
     try:
-        logger.info("Generating tickets from transcript...")
-        completion: ChatCompletionMessage = client.create_tickets(
-            prompt, number_of_tickets, platform
+        estimation_points = int(ticket.get("estimationpoints") or 0)
+    except (TypeError, ValueError):
+        estimation_points = 0
+
+    return {
+        "subject": str(ticket["subject"]),
+        "body": str(ticket["body"]),
+        "estimationpoints": estimation_points,
+    }
+
+
+async def stream_tickets_to_table(
+    document_id: str,
+    generation_datetime: str,
+    prompt: str,
+    number_of_tickets: int,
+    platform: str,
+    use_cache: bool = True,
+    quota_reservation_id: Optional[str] = None,
+) -> Ticket:
+    """
+    Generate tickets with a streamed completion, appending the tickets to the
+    Ticket item in small batches as they are generated so clients can show the
+    first tickets while the rest are still being written. Each batch is one
+    UpdateItem on the Ticket item and one on the generation's status record,
+    at most TICKET_WRITE_BATCH_SIZE tickets or TICKET_WRITE_INTERVAL seconds
+    apart. Transcripts longer than
+    CHUNKED_GENERATION_THRESHOLD_TOKENS are generated chunk by chunk and merged
+    instead, and their tickets written once the merge is done, as is a cached
+    generation of the same transcript. The progress and token usage are recorded
+    on the generation's status record as the tickets are written, and the quota
+    reservation of the generation is committed once every ticket is.
+
+    Args:
+        document_id (str): The ID of the document.
+        generation_datetime (str): The datetime of the generation, the range key of the Ticket item.
+        prompt (str): The transcript prompt as a string.
+        number_of_tickets (int): The number of tickets to generate.
+        platform (str): The platform to generate the tickets for.
+        use_cache (bool, optional): Whether to reuse a cached generation. Defaults to True.
+        quota_reservation_id (str, optional): The quota reservation paying for the generation.
+
+    Returns:
+        Ticket: The Ticket item holding every generated ticket.
+    """
+    from src.models.openai import get_async_openai_client
+
+    client: AsyncOpenAIClient = get_async_openai_client()
+    platform_name: str = getattr(platform, "value", platform)
+    # Trim filler before deciding whether the transcript needs chunking
+    ticket_prompt: TicketPrompt = client.build_ticket_prompt(
+        prompt, number_of_tickets, token_budget=CHUNKED_GENERATION_THRESHOLD_TOKENS
+    )
+    cache_key: str = _generation_cache_key(
+        client, prompt, number_of_tickets, platform_name, ticket_prompt.max_tokens
+    )
+
+    if not use_cache:
+        record_generation_cache_bypass()
+    else:
+        cached_tickets: Optional[dict] = await asyncio.to_thread(get_cached_generation, cache_key)
+        if cached_tickets is not None:
+            logger.info("Tickets served from the generation cache")
+            ticket_item = Ticket(
+                document_id=document_id,
+                created_datetime=generation_datetime,
+                tickets=[
+                    ticket
+                    for ticket in map(normalize_ticket, extract_ticket_list(cached_tickets))
+                    if ticket is not None
+                ],
+                original_prompt=prompt,
+            )
+            await ticket_item.save()
+            await update_generation_job(
+                document_id,
+                generation_datetime,
+                status=GenerationJobModel.SUCCEEDED,
+                tickets_generated=len(ticket_item.tickets),
+            )
+            await commit_quota_reservation(quota_reservation_id)
+            return ticket_item
+
+    ticket_item = Ticket(
+        document_id=document_id,
+        created_datetime=generation_datetime,
+        tickets=[],
+        original_prompt=prompt,
+        is_complete=False,
+    )
+    await ticket_item.save()
+
+    stored_tickets: List[dict] = []
+    pending_tickets: List[dict] = []
+    last_write: float = time.monotonic()
+
+    async def _write(is_complete: bool = False) -> None:
+        nonlocal last_write
+
+        actions = [Ticket.tickets.set(Ticket.tickets.append(list(pending_tickets)))] if pending_tickets else []
+        if is_complete:
+            actions.append(Ticket.is_complete.set(True))
+        if not actions:
+            return
+
+        await ticket_item.update_async(actions)
+        stored_tickets.extend(pending_tickets)
+        pending_tickets.clear()
+        last_write = time.monotonic()
+        logger.debug(f"Stored {len(stored_tickets)} tickets of generation {generation_datetime}")
+
+        # The final count is recorded with the status of the generation
+        if not is_complete:
+            await update_generation_job(
+                document_id, generation_datetime, tickets_generated=len(stored_tickets)
+            )
+
+    async def _store(generated_tickets: List[dict]) -> None:
+        pending_tickets.extend(
+            ticket for ticket in map(normalize_ticket, generated_tickets) if ticket is not None
+        )
+        if len(pending_tickets) >= TICKET_WRITE_BATCH_SIZE or (
+            pending_tickets and time.monotonic() - last_write >= TICKET_WRITE_INTERVAL
+        ):
+            await _write()
+
+    if ticket_prompt.fitted_tokens > CHUNKED_GENERATION_THRESHOLD_TOKENS:
+        logger.info("Generating tickets from transcript chunk by chunk...")
+        tickets_dict: dict = await generate_tickets_chunked_async(
+            client, ticket_prompt.transcript, number_of_tickets, platform, ticket_prompt
         )
+        await _store(extract_ticket_list(tickets_dict))
+        await _write(is_complete=True)
+        token_usage: TokenAccounting = ticket_prompt.accounting
+    else:
+        parser = TicketStreamParser()
+        completion: List[str] = []
 
-        tickets_dict: dict = json.loads(completion.content)
+        logger.info("Streaming tickets from transcript...")
+        async for content in client.stream_tickets(
+            ticket_prompt.transcript, number_of_tickets, platform, max_tokens=ticket_prompt.max_tokens
+        ):
+            completion.append(content)
+            await _store(parser.feed(content))
+
+        # Pick up tickets the model didn't return as a list
+        await _store(parser.finish())
+        await _write(is_complete=True)
+        if not parser.is_complete:
+            logger.warning(f"Streamed completion was truncated after {len(stored_tickets)} tickets")
+        token_usage = ticket_prompt.record_completion_text("".join(completion), len(stored_tickets))
+
+    logger.info(f"Generated {len(stored_tickets)} tickets from transcript")
+
+    await update_generation_job(
+        document_id,
+        generation_datetime,
+        status=GenerationJobModel.SUCCEEDED,
+        tickets_generated=len(stored_tickets),
+        token_usage=dict(token_usage),
+    )
+    await commit_quota_reservation(quota_reservation_id)
+
+    if stored_tickets:
+        await asyncio.to_thread(
+            set_cached_generation,
+            cache_key,
+            {"tickets": stored_tickets},
+            number_of_tickets,
+            platform_name,
+        )
+
+    return ticket_item
+
+
+async def expand_ticket_to_table(
+    user_id: str,
+    sub_ticket_id: str,
+    ticket: dict,
+    number_of_tickets: int,
+    quota_reservation_id: Optional[str] = None,
+) -> SubTicket:
+    """
+    Break a ticket down into sub tickets and store them under the sub ticket ID
+    the expansion was queued with, then commit the quota reservation of the expansion.
+
+    Args:
+        user_id (str): The ID of the user who asked for the expansion.
+        sub_ticket_id (str): The ID the sub tickets are stored under.
+        ticket (dict): The ticket to expand.
+        number_of_tickets (int): The number of sub tickets to generate.
+        quota_reservation_id (str, optional): The quota reservation paying for the expansion.
+
+    Returns:
+        SubTicket: The stored sub tickets.
+    """
+    from src.models.openai import get_async_openai_client
+
+    client: AsyncOpenAIClient = get_async_openai_client()
+
+    logger.info(f"Expanding ticket into {number_of_tickets} sub tickets...")
+    completion: ChatCompletion = await client.expand_ticket(
+        ticket,
+        number_of_tickets,
+        max_tokens=size_max_tokens(number_of_tickets, client.max_output_tokens),
+    )
+    sub_ticket = SubTicket(
+        user_id=user_id,
+        sub_ticket_id=sub_ticket_id,
+        sub_ticket_prompt=json.dumps(ticket),
+        tickets=[
+            sub_ticket
+            for sub_ticket in map(normalize_ticket, extract_ticket_list(parse_completion(completion)))
+            if sub_ticket is not None
+        ],
+    )
+    await sub_ticket.save()
+    logger.info(f"Stored {len(sub_ticket.tickets)} sub tickets under {sub_ticket_id}")
+    await commit_quota_reservation(quota_reservation_id)
+
+    return sub_ticket
 
-        logger.info("Tickets generated from transcript")
-        return modify_keys(tickets_dict)
-    except Exception as e:
-        logger.error(e)
-        raise e("Error generating tickets from transcript. Please try again.")
 
+def get_ticket_job_queue() -> JobQueue:
+    """Get the queue ticket generation jobs are sent to."""
+    global _ticket_job_queue
 
-async def invoke_ticket_generation_lambda(
+    if _ticket_job_queue is None:
+        _ticket_job_queue = create_job_queue(
+            TICKET_JOBS_QUEUE_URL,
+            get_aws_client("sqs"),
+        )
+
+    return _ticket_job_queue
+
+
+def check_number_of_tickets(number_of_tickets: int) -> None:
+    """
+    Refuse a generation of more tickets than a single completion can hold, before
+    any quota is spent on it, instead of truncating the completion.
+
+    Args:
+        number_of_tickets (int): The number of tickets requested.
+
+    Raises:
+        InvalidInput: If the number of tickets is out of range.
+    """
+    max_tickets: int = max_tickets_per_completion()
+    if not 1 <= number_of_tickets <= max_tickets:
+        raise InvalidInput(f"number_of_tickets must be between 1 and {max_tickets}.")
+
+
+def build_ticket_job(
     document_id: str,
     user_id: str,
     event: EventEnum,
@@ -72,63 +465,156 @@ async def invoke_ticket_generation_lambda(
     platform: Optional[PlatformEnum] = PlatformEnum.JIRA,
     generation_datetime: str = None,
     ticket: dict = None,
-) -> None:
+    bypass_cache: bool = False,
+    quota_reservation_id: Optional[str] = None,
+    generation_request_key: Optional[str] = None,
+) -> Tuple[dict, str]:
     """
-    Invoke the ticket generation lambda function.
+    Build the payload of a ticket generation or expansion job.
 
     Args:
         document_id (str): The ID of the document.
         user_id (str): The ID of the user.
+        event (EventEnum): TICKET_GENERATION or TICKET_EXPANSION.
         number_of_tickets (int, optional): The number of tickets to generate. Defaults to 10.
         platform (PlatformEnum, optional): The platform to generate the tickets for. Defaults to PlatformEnum.JIRA.
+        generation_datetime (str, optional): The datetime of the generation. Defaults to now.
+        ticket (dict, optional): The ticket to expand, required for ticket expansion.
+        bypass_cache (bool, optional): Whether to skip the generation cache. Defaults to False.
+        quota_reservation_id (str, optional): The quota reservation the worker settles once the job finishes.
+        generation_request_key (str, optional): The generation request the worker releases if the job gives up.
+
+    Returns:
+        Tuple[dict, str]: The payload and the ID the results will be stored under.
     """
-    try:
-        payload = dict()
-        response_id = str()
-
-        if generation_datetime is None:
-            generation_datetime: str = datetime.datetime.now().isoformat()
-        match event:
-            case EventEnum.TICKET_GENERATION:
-                payload = {
-                    "document_id": document_id,
-                    "user_id": user_id,
-                    "number_of_tickets": number_of_tickets,
-                    "platform": platform.value,
-                    "generation_datetime": generation_datetime,
-                    "event": event.value,
-                }
-                response_id = generation_datetime
-            case EventEnum.TICKET_EXPANSION:
-                if ticket is None:
-                    raise ValueError("Ticket is required for ticket expansion.")
+    if generation_datetime is None:
+        generation_datetime = datetime.datetime.now().isoformat()
+
+    match event:
+        case EventEnum.TICKET_GENERATION:
+            payload = {
+                "document_id": document_id,
+                "user_id": user_id,
+                "number_of_tickets": number_of_tickets,
+                "platform": platform.value,
+                "generation_datetime": generation_datetime,
+                "event": event.value,
+                "bypass_cache": bypass_cache,
+                "quota_reservation_id": quota_reservation_id,
+                "generation_request_key": generation_request_key,
+            }
+            return payload, generation_datetime
+        case EventEnum.TICKET_EXPANSION:
+            if ticket is None:
+                raise ValueError("Ticket is required for ticket expansion.")
+
+            sub_ticket_id = str(uuid.uuid4())
+            payload = {
+                "document_id": document_id,
+                "user_id": user_id,
+                "number_of_tickets": number_of_tickets,
+                "generation_datetime": generation_datetime,
+                "event": event.value,
+                "ticket": ticket,
+                "sub_ticket_id": sub_ticket_id,
+                "quota_reservation_id": quota_reservation_id,
+            }
+            return payload, sub_ticket_id
+        case _:
+            raise ValueError(f"Unsupported ticket job event {event}.")
+
 
-                sub_ticket_id = str(uuid.uuid4())
+def _check_ticket_job_backlog(new_jobs: int) -> None:
+    """Shed new jobs while the backlog of the queue is at its limit."""
+    if not TICKET_JOBS_MAX_DEPTH:
+        return
 
-                payload = {
+    depth: Optional[int] = ticket_job_depth_cache.get("depth")
+    if depth is None:
+        depth = get_ticket_job_queue().depth()
+        ticket_job_depth_cache.set("depth", depth)
+
+    if depth + new_jobs > TICKET_JOBS_MAX_DEPTH:
+        raise RateLimitExceededError(
+            message="Too many ticket generations are queued. Please try again later.",
+            retry_after=ticket_job_depth_cache.ttl,
+            queue_depth=depth,
+        )
+
+
+async def enqueue_ticket_jobs(jobs: List[dict]) -> List[str]:
+    """
+    Queue many ticket generation or expansion jobs at once.
+
+    Args:
+        jobs (List[dict]): The keyword arguments of build_ticket_job for every job.
+
+    Returns:
+        List[str]: The ID the results of each job will be stored under.
+
+    Raises:
+        RateLimitExceededError: If the queue backlog is at TICKET_JOBS_MAX_DEPTH.
+    """
+    payloads, response_ids = zip(*(build_ticket_job(**job) for job in jobs)) if jobs else ((), ())
+
+    await asyncio.to_thread(_check_ticket_job_backlog, len(payloads))
+    await asyncio.to_thread(get_ticket_job_queue().enqueue_batch, list(payloads))
+    logger.info(f"Queued {len(payloads)} ticket jobs")
+
+    return list(response_ids)
+
+
+async def enqueue_ticket_job(
+    document_id: str,
+    user_id: str,
+    event: EventEnum,
+    number_of_tickets: Optional[int] = 10,
+    platform: Optional[PlatformEnum] = PlatformEnum.JIRA,
+    generation_datetime: str = None,
+    ticket: dict = None,
+    bypass_cache: bool = False,
+    quota_reservation_id: Optional[str] = None,
+    generation_request_key: Optional[str] = None,
+) -> str:
+    """
+    Queue a ticket generation or expansion job for the ticket generation worker.
+
+    Args:
+        document_id (str): The ID of the document.
+        user_id (str): The ID of the user.
+        event (EventEnum): TICKET_GENERATION or TICKET_EXPANSION.
+        number_of_tickets (int, optional): The number of tickets to generate. Defaults to 10.
+        platform (PlatformEnum, optional): The platform to generate the tickets for. Defaults to PlatformEnum.JIRA.
+        generation_datetime (str, optional): The datetime of the generation. Defaults to now.
+        ticket (dict, optional): The ticket to expand, required for ticket expansion.
+        bypass_cache (bool, optional): Whether to skip the generation cache. Defaults to False.
+        quota_reservation_id (str, optional): The quota reservation the worker settles once the job finishes.
+        generation_request_key (str, optional): The generation request the worker releases if the job gives up.
+
+    Returns:
+        str: The generation datetime or sub ticket ID the results will be stored under.
+    """
+    try:
+        response_ids: List[str] = await enqueue_ticket_jobs(
+            [
+                {
                     "document_id": document_id,
                     "user_id": user_id,
+                    "event": event,
                     "number_of_tickets": number_of_tickets,
+                    "platform": platform,
                     "generation_datetime": generation_datetime,
-                    "event": event.value,
                     "ticket": ticket,
-                    "sub_ticket_id": sub_ticket_id,
+                    "bypass_cache": bypass_cache,
+                    "quota_reservation_id": quota_reservation_id,
+                    "generation_request_key": generation_request_key,
                 }
-                response_id = sub_ticket_id
-
-        lambda_client = boto3.client(
-            "lambda", region_name=os.getenv("AWS_REGION", "us-west-2")
+            ]
         )
-
-        lambda_client.invoke(
-            FunctionName=f'TRANSCRIBER-LAMBDA-{os.getenv("STAGE_NAME", "dev")}',
-            InvocationType="Event",
-            Payload=json.dumps(payload),
-        )
-        return response_id
+        return response_ids[0]
     except Exception as e:
-        logger.error(e)
-        raise e("Error invoking ticket generation lambda function. Please try again.")
+        logger.error(f"Error queueing ticket job: {e}")
+        raise
 
 
 async def get_tickets(
@@ -145,7 +631,7 @@ async def get_tickets(
         Optional[TicketModel]: The generated tickets or None if not found.
     """
     try:
-        ticket = Ticket.get(hash_key=document_id, range_key=generation_datetime)
+        ticket = await Ticket.get_async(document_id, generation_datetime)
 
         if not ticket:
             return None
@@ -172,7 +658,7 @@ async def get_subticket(
     """
     try:
         logger.info(f"Getting sub ticket {subticket_id} for user {user_id}")
-        sub_ticket = SubTicket.get(hash_key=user_id, range_key=subticket_id)
+        sub_ticket = await SubTicket.get_async(user_id, subticket_id)
 
         if not sub_ticket:
             return None
@@ -180,3 +666,70 @@ async def get_subticket(
     except SubTicket.DoesNotExist:
         logger.error("Sub ticket not found")
         return None
+
+
+async def get_generation_ticket_params(
+    document_id: str, generation_datetime: str
+) -> Optional[List[dict]]:
+    """
+    Get the tickets of a stored generation as platform ticket parameters.
+
+    Args:
+        document_id (str): The ID of the document.
+        generation_datetime (str): The datetime when the tickets were generated.
+
+    Returns:
+        Optional[List[dict]]: The ticket parameters or None if the generation was not found.
+    """
+    ticket: Optional[Ticket] = await get_tickets(document_id, generation_datetime)
+
+    if not ticket:
+        return None
+
+    return [
+        {
+            "name": t.subject,
+            "description": t.body,
+            "estimate": t.estimationpoints,
+        }
+        for t in ticket.tickets or []
+    ]
+
+
+async def push_tickets_to_platform(
+    platform_client: PlatformClient, tickets_params: List[dict]
+) -> dict:
+    """
+    Create many tickets in a platform at once, reporting the outcome of each one.
+
+    Args:
+        platform_client (PlatformClient): The client of the platform to create the tickets in.
+        tickets_params (List[dict]): The parameters of each ticket.
+
+    Returns:
+        dict: The per-ticket results along with the created and failed counts.
+    """
+    logger.info(f"Pushing {len(tickets_params)} tickets to platform...")
+    # Platform clients may add fields to the params, keep the caller's copy intact
+    outcomes: List[dict] = await platform_client.create_stories(
+        [dict(params) for params in tickets_params]
+    )
+
+    results = [
+        {
+            "index": index,
+            "name": params.get("name"),
+            "created": "error" not in outcome,
+            "ticket": outcome.get("ticket"),
+            "error": outcome.get("error"),
+        }
+        for index, (params, outcome) in enumerate(zip(tickets_params, outcomes))
+    ]
+    created_count = sum(1 for result in results if result["created"])
+    logger.info(f"Pushed {created_count} of {len(results)} tickets to platform")
+
+    return {
+        "results": results,
+        "created_count": created_count,
+        "failed_count": len(results) - created_count,
+    }
@@ -0,0 +1,120 @@
+import asyncio
+import os
+from typing import Optional
+
+from pixelum_core.errors.custom_exceptions import ResourceNotFoundException
+from pixelum_core.loggers.loggers import get_module_logger
+
+from src.lib.aws_clients import get_aws_client
+from src.lib.enums import EventEnum
+from src.lib.job_queue import JobQueue, JobWorker, create_job_queue
+from src.models.dynamo.generation_job import GenerationJobModel
+from src.services.file_management import download_file_from_s3
+from src.services.generation_jobs import update_generation_job
+from src.services.generation_requests import release_generation_request_key
+from src.services.quota import refund_quota_reservation
+from src.services.ticket import expand_ticket_to_table, get_ticket_job_queue, stream_tickets_to_table
+
+logger = get_module_logger()
+
+# Without a dead-letter queue URL failing jobs are left to the SQS redrive policy
+TICKET_JOBS_DEAD_LETTER_QUEUE_URL = os.getenv("TICKET_JOBS_DEAD_LETTER_QUEUE_URL")
+
+
+async def handle_ticket_job(body: dict) -> None:
+    """
+    Run a queued ticket job. Raising makes the job retry and eventually land in
+    the dead-letter queue.
+
+    Args:
+        body (dict): The payload of the job, as built by build_ticket_job.
+    """
+    match body.get("event"):
+        case EventEnum.TICKET_GENERATION.value:
+            await update_generation_job(
+                body["document_id"], body["generation_datetime"], status=GenerationJobModel.RUNNING
+            )
+
+            transcript: Optional[str] = await asyncio.to_thread(
+                download_file_from_s3, body["document_id"]
+            )
+            if transcript is None:
+                raise ResourceNotFoundException(
+                    "Transcript not found.", resource_name="file", resource_identifier=body["document_id"]
+                )
+
+            await stream_tickets_to_table(
+                document_id=body["document_id"],
+                generation_datetime=body["generation_datetime"],
+                prompt=transcript,
+                number_of_tickets=body["number_of_tickets"],
+                platform=body["platform"],
+                use_cache=not body.get("bypass_cache", False),
+                quota_reservation_id=body.get("quota_reservation_id"),
+            )
+        case EventEnum.TICKET_EXPANSION.value:
+            await expand_ticket_to_table(
+                user_id=body["user_id"],
+                sub_ticket_id=body["sub_ticket_id"],
+                ticket=body["ticket"],
+                number_of_tickets=body["number_of_tickets"],
+                quota_reservation_id=body.get("quota_reservation_id"),
+            )
+        case event:
+            raise ValueError(f"The ticket worker can't handle {event} jobs.")
+
+
+async def give_up_ticket_job(body: dict, error: Exception) -> None:
+    """
+    Mark the generation of a ticket job that has run out of attempts as failed,
+    give back the quota reserved for the job and release its generation request
+    so identical requests start a new generation instead of joining the failed one.
+
+    Args:
+        body (dict): The payload of the job.
+        error (Exception): The error of the last attempt.
+    """
+    if body.get("event") == EventEnum.TICKET_GENERATION.value:
+        await update_generation_job(
+            body["document_id"],
+            body["generation_datetime"],
+            status=GenerationJobModel.FAILED,
+            error=str(error) or type(error).__name__,
+        )
+        await release_generation_request_key(body.get("generation_request_key"), body["generation_datetime"])
+
+    await refund_quota_reservation(body.get("quota_reservation_id"))
+
+
+def create_ticket_worker(
+    queue: Optional[JobQueue] = None,
+    dead_letter_queue: Optional[JobQueue] = None,
+    **kwargs,
+) -> JobWorker:
+    """
+    Create a worker for the ticket job queue.
+
+    Args:
+        queue (JobQueue, optional): The queue to pull from. Defaults to the ticket job queue.
+        dead_letter_queue (JobQueue, optional): Where failing jobs are moved. Defaults to
+            TICKET_JOBS_DEAD_LETTER_QUEUE_URL when it is set.
+        **kwargs: The concurrency, batch_size and max_attempts of the worker.
+
+    Returns:
+        JobWorker: The worker.
+    """
+    queue = queue or get_ticket_job_queue()
+
+    if dead_letter_queue is None and TICKET_JOBS_DEAD_LETTER_QUEUE_URL:
+        dead_letter_queue = create_job_queue(
+            TICKET_JOBS_DEAD_LETTER_QUEUE_URL,
+            get_aws_client("sqs"),
+        )
+
+    return JobWorker(
+        queue,
+        handle_ticket_job,
+        dead_letter_queue=dead_letter_queue,
+        on_give_up=give_up_ticket_job,
+        **kwargs,
+    )
@@ -1,17 +1,23 @@
+import base64
+import binascii
+import json
 import os
 from typing import List, Optional
 
-import boto3
-from pixelum_core.errors.custom_exceptions import ServerFailureError
+from pixelum_core.errors.custom_exceptions import InvalidInput, ServerFailureError
 from pixelum_core.loggers.loggers import get_module_logger
 from pynamodb.exceptions import DoesNotExist
 
+from src.lib.aws_clients import get_aws_client
 from src.models.auth0 import auth0_client
 from src.models.dynamo.user import UserManagementModel
 from src.models.dynamo.user_metadata import UserMetadataModel
 
 logger = get_module_logger()
 
+SUB_ACCOUNTS_PAGE_SIZE = int(os.getenv("SUB_ACCOUNTS_PAGE_SIZE", 50))
+SUB_ACCOUNTS_MAX_PAGE_SIZE = int(os.getenv("SUB_ACCOUNTS_MAX_PAGE_SIZE", 100))
+
 
 def check_user_exists(email: str) -> bool:
     """Checks if a user account exists.
@@ -30,7 +36,8 @@ def check_user_exists(email: str) -> bool:
 
 
 def syncronous_get_user_metadata(user_id: str) -> Optional[UserMetadataModel]:
-    """Gets user from User Metadata DynamoDB.
+    """Gets user from User Metadata DynamoDB, served from the short lived
+    in-process cache when possible.
 
     Args:
         user_id (str): auth0 id of user
@@ -38,7 +45,7 @@ def syncronous_get_user_metadata(user_id: str) -> Optional[UserMetadataModel]:
         UserMetadataModel or None
     """
     try:
-        user_metadata = UserMetadataModel.get(user_id)
+        user_metadata = UserMetadataModel.get_cached(user_id)
     except (DoesNotExist, TypeError):
         return None
     return user_metadata
@@ -53,7 +60,7 @@ async def get_user_metadata(user_id: str) -> Optional[UserMetadataModel]:
         UserMetadataModel or None
     """
     try:
-        user_metadata = UserMetadataModel.get(user_id)
+        user_metadata = await UserMetadataModel.get_async(user_id)
     except (DoesNotExist, TypeError):
         return None
     return user_metadata
@@ -243,7 +250,7 @@ async def update_users_permissions(
             for permission in permissions
         ]
         user.subscription_tier = await user.find_subscription_tier()
-        await user.save()
+        await user.save_changes()
 
         return user
     except Exception as e:
@@ -252,9 +259,8 @@ async def update_users_permissions(
 
 
 async def create_and_send_user_invitation_email_ses(email: str, invitation_link: str):
-    ses_client = boto3.client(
+    ses_client = get_aws_client(
         "ses",
-        region_name=os.getenv("AWS_REGION", "us-west-2"),
         aws_access_key_id=os.getenv("SES_ACCESS_KEY_ID"),
         aws_secret_access_key=os.getenv("SES_SECRET_ACCESS_KEY"),
     )
@@ -271,3 +277,64 @@ async def create_and_send_user_invitation_email_ses(email: str, invitation_link:
 
     logger.info(f"Invitation email sent to {email}")
     return response
+
+
+def _encode_sub_accounts_cursor(last_evaluated_key: Optional[dict]) -> Optional[str]:
+    if last_evaluated_key is None:
+        return None
+    return base64.urlsafe_b64encode(json.dumps(last_evaluated_key).encode()).decode()
+
+
+def _decode_sub_accounts_cursor(cursor: Optional[str], parent_user_id: str) -> Optional[dict]:
+    if not cursor:
+        return None
+
+    try:
+        last_evaluated_key = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, ValueError):
+        raise InvalidInput("Invalid sub accounts cursor.")
+
+    # A cursor only continues the listing of the account it was issued to
+    if not isinstance(last_evaluated_key, dict) or last_evaluated_key.get("parent_user_id") != {"S": parent_user_id}:
+        raise InvalidInput("Invalid sub accounts cursor.")
+
+    return last_evaluated_key
+
+
+async def get_sub_accounts_page(
+    user: UserMetadataModel, limit: int = SUB_ACCOUNTS_PAGE_SIZE, cursor: Optional[str] = None
+) -> dict:
+    """
+    Get a page of the sub-users of a user for team management.
+
+    Args:
+        user (UserMetadataModel): The parent user.
+        limit (int, optional): The most sub-users to return, capped at SUB_ACCOUNTS_MAX_PAGE_SIZE.
+            Defaults to SUB_ACCOUNTS_PAGE_SIZE.
+        cursor (str, optional): The cursor of the previous page. Defaults to the first page.
+
+    Returns:
+        dict: The sub-users and the cursor of the next page, None on the last page.
+
+    Raises:
+        InvalidInput: If the cursor is malformed or belongs to another user.
+    """
+    sub_accounts, last_evaluated_key = await user.get_sub_accounts_page(
+        limit=min(max(limit, 1), SUB_ACCOUNTS_MAX_PAGE_SIZE),
+        last_evaluated_key=_decode_sub_accounts_cursor(cursor, user.user_id),
+    )
+
+    return {
+        "sub_accounts": [
+            {
+                "user_id": sub_account.user_id,
+                "email": sub_account.email,
+                "name": sub_account.name,
+                "signup_method": sub_account.signup_method,
+                "subscription_tier": sub_account.subscription_tier,
+                "permissions": sub_account.permissions,
+            }
+            for sub_account in sub_accounts
+        ],
+        "cursor": _encode_sub_accounts_cursor(last_evaluated_key),
+    }
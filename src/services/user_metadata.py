@@ -30,7 +30,7 @@ async def add_or_update_user_metadata(user_id: str, **kwargs) -> UserMetadataMod
     # Check if the user metadata record already exists
     metadata: dict = kwargs
     try:
-        user_metadata = UserMetadataModel.get(user_id)
+        user_metadata = await UserMetadataModel.get_async(user_id)
     except UserMetadataModel.DoesNotExist:
         # Create a new user metadata record if it doesn't exist
         user_metadata = await UserMetadataModel.initialize(user_id=user_id)
@@ -40,8 +40,8 @@ async def add_or_update_user_metadata(user_id: str, **kwargs) -> UserMetadataMod
         if key != "user_id":
             setattr(user_metadata, key, value)
 
-    # Save the user metadata record
-    await user_metadata.save()
+    # Write only the fields that changed, or the whole record if it is new
+    await user_metadata.save_changes()
 
     return user_metadata
 
@@ -51,7 +51,7 @@ async def link_jira(user: UserMetadataModel, email: str, server: str, api_key: s
     user.jira_email = email
     user.jira_domain = server
     user.jira_api_key = api_key
-    await user.save()
+    await user.save_changes()
     return user
 
 
@@ -59,7 +59,7 @@ async def link_shortcut(user: UserMetadataModel, api_key: str, workspace_id: str
     """Link a Shortcut account to a user."""
     user.shortcut_api_key = api_key
     user.shortcut_workspace_id = workspace_id
-    await user.save()
+    await user.save_changes()
     return user
 
 
@@ -68,14 +68,14 @@ async def link_asana(user: UserMetadataModel, personal_access_token: str, worksp
     user.asana_personal_access_token = personal_access_token
     user.asana_workspace_id = workspace_id
     user.asana_project_id = project_id
-    await user.save()
+    await user.save_changes()
     return user
 
 
 async def get_user_metadata_by_user_id(user_id: str) -> Optional[UserMetadataModel]:
     """Get user metadata by user ID."""
     try:
-        user_metadata = UserMetadataModel.get(hash_key=user_id)
+        user_metadata = await UserMetadataModel.get_async(user_id)
         return user_metadata
     except UserMetadataModel.DoesNotExist:
         return None
@@ -0,0 +1,107 @@
+import argparse
+import json
+import random
+import string
+import sys
+from typing import List
+
+from src.lib.ticket_stream_parser import TicketStreamParser, normalize_key, parse_tickets
+
+KEYS = ["subject", "Subject", "body", "estimationPoints", "Estimation Points", "estimation_points"]
+# Characters that exercise the string and bracket handling of the parser
+NOISE = '{}[]",:\\\n\t `' + string.ascii_letters + string.digits
+
+
+def random_ticket(rng: random.Random) -> dict:
+    text = "".join(rng.choice(NOISE) for _ in range(rng.randint(0, 40)))
+    return {
+        rng.choice(KEYS[:2]): f"Ticket {rng.randint(0, 999)}",
+        "body": text,
+        rng.choice(KEYS[3:]): rng.randint(1, 13),
+    }
+
+
+def random_completion(rng: random.Random) -> tuple:
+    """Generate a completion the way the model answers, and the tickets it holds."""
+    tickets = [random_ticket(rng) for _ in range(rng.randint(0, 8))]
+    document = {"tickets": tickets} if rng.random() < 0.7 else tickets
+    text = json.dumps(document, indent=rng.choice([None, 2]))
+    if rng.random() < 0.2:
+        text = f"```json\n{text}\n```"
+    return text, [{normalize_key(key): value for key, value in ticket.items()} for ticket in tickets]
+
+
+def corrupt(rng: random.Random, text: str) -> str:
+    """Insert, drop or replace a few characters of a completion."""
+    chars = list(text)
+    for _ in range(rng.randint(1, 5)):
+        position = rng.randint(0, len(chars))
+        operation = rng.choice(["insert", "drop", "replace"])
+        if operation == "insert" or not chars:
+            chars.insert(position, rng.choice(NOISE))
+        elif operation == "drop":
+            del chars[min(position, len(chars) - 1)]
+        else:
+            chars[min(position, len(chars) - 1)] = rng.choice(NOISE)
+    return "".join(chars)
+
+
+def parse_in_chunks(rng: random.Random, text: str) -> List[dict]:
+    parser = TicketStreamParser()
+    tickets: List[dict] = []
+    position = 0
+    while position < len(text):
+        size = rng.randint(1, 16)
+        tickets += parser.feed(text[position:position + size])
+        position += size
+    return tickets + parser.finish()
+
+
+def check(seed: int) -> None:
+    """Run every invariant on one random completion. Raises AssertionError when one doesn't hold."""
+    rng = random.Random(seed)
+    text, expected = random_completion(rng)
+
+    # A well formed completion yields every ticket, however it is chunked
+    assert parse_tickets(text) == expected, "well formed completion"
+    assert parse_in_chunks(rng, text) == expected, "chunked well formed completion"
+
+    # A truncated completion yields the tickets completed before the cut, in order
+    truncated = text[:rng.randint(0, len(text))]
+    recovered = parse_tickets(truncated)
+    assert recovered == expected[:len(recovered)], "truncated completion"
+
+    # A corrupted completion never raises, yields only objects and doesn't depend on chunking
+    corrupted = corrupt(rng, text)
+    tickets = parse_tickets(corrupted)
+    assert all(isinstance(ticket, dict) for ticket in tickets), "corrupted completion"
+    assert parse_in_chunks(rng, corrupted) == tickets, "chunked corrupted completion"
+
+
+def test_ticket_stream_parser():
+    for seed in range(1000):
+        check(seed)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Fuzz the ticket stream parser with truncated, corrupted and arbitrarily chunked completions."
+    )
+    parser.add_argument("--iterations", type=int, default=10000, help="The number of completions to try")
+    parser.add_argument("--seed", type=int, default=0, help="The seed of the first completion")
+    args = parser.parse_args()
+
+    failures = 0
+    for seed in range(args.seed, args.seed + args.iterations):
+        try:
+            check(seed)
+        except Exception as e:
+            failures += 1
+            print(f"seed {seed}: {type(e).__name__}: {e}")
+
+    print(f"{args.iterations - failures}/{args.iterations} completions passed")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+import asyncio
+from typing import Optional
+
+from pixelum_core.loggers.loggers import get_module_logger
+
+from src.config import config
+from src.lib.job_queue import JobWorker
+from src.services.ticket_worker import create_ticket_worker
+
+config.LOGGER = get_module_logger()
+logger = config.LOGGER
+
+# Reused across the invocations of an execution environment, so the shared clients
+# bound to the event loop keep their connections between batches
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_worker: Optional[JobWorker] = None
+
+
+def handler(event, context):
+    """Run a batch of ticket jobs delivered by the SQS event source mapping of the worker function."""
+    global _loop, _worker
+
+    if _worker is None:
+        _loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(_loop)
+        _worker = create_ticket_worker()
+
+    return _loop.run_until_complete(_worker.run_event_source_batch(event.get("Records", [])))
+
+
+if __name__ == "__main__":
+    logger.info("Starting ticket worker...")
+    asyncio.run(create_ticket_worker().run())